@@ -1,8 +1,122 @@
 # Register your models here.
 from django.contrib import admin
-from .models import Station, WeatherData, SystemStatus,MinMaxData
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from .models import Station, WeatherData, SystemStatus, MinMaxData, AlertRule, Alert, StationHealth
 
-admin.site.register(Station)
-admin.site.register(WeatherData)
-admin.site.register(SystemStatus)
-admin.site.register(MinMaxData)
\ No newline at end of file
+
+# Below this many rows an exact COUNT(*) is cheap enough to keep
+ESTIMATE_THRESHOLD = 10000
+
+
+def estimated_row_count(model, using="default"):
+    """ Return a cheap row count estimate for `model`'s table, or None if the backend has none """
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [model._meta.db_table])
+        elif connection.vendor == "sqlite":
+            # Append-only tables: the highest rowid is an O(log n) upper bound of the row count
+            pk = connection.ops.quote_name(model._meta.pk.column)
+            cursor.execute(f"SELECT MAX({pk}) FROM {table}")
+        else:
+            return None
+        row = cursor.fetchone()
+
+    if not row or not row[0] or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """ Paginator that replaces the full COUNT(*) of an unfiltered changelist with a table estimate """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        # Filtered lists (station, date drill-down) hit an index, so an exact count stays cheap
+        if queryset.query.where:
+            return super().count
+
+        estimate = estimated_row_count(queryset.model, queryset.db)
+        if estimate is None or estimate < ESTIMATE_THRESHOLD:
+            return super().count
+        return estimate
+
+
+class TimeSeriesAdmin(admin.ModelAdmin):
+    """ Shared changelist tuning for the per-station time-series tables """
+    list_select_related = ()  # No automatic JOIN on station (see get_queryset)
+    raw_id_fields = ("station",)  # No <select> listing every station on the change form
+    list_filter = ("station",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False  # Avoid the second COUNT(*) behind "x results (y total)"
+    list_per_page = 50
+
+    def get_queryset(self, request):
+        # __str__ dereferences station.station_ref: one batched lookup per page
+        # (a JOIN would not work, Station lives in the default database)
+        return super().get_queryset(request).prefetch_related("station")
+
+
+@admin.register(Station)
+class StationAdmin(admin.ModelAdmin):
+    list_display = ("station_ref", "name", "location", "http_address", "created_at")
+    search_fields = ("station_ref", "name", "location")
+
+
+@admin.register(WeatherData)
+class WeatherDataAdmin(TimeSeriesAdmin):
+    list_display = ("timestamp", "station", "temperature", "humidity")
+    date_hierarchy = "timestamp"
+    ordering = ("-timestamp",)
+
+
+@admin.register(SystemStatus)
+class SystemStatusAdmin(TimeSeriesAdmin):
+    list_display = ("timestamp", "station", "uptime_ms", "free_heap", "wifi_strength")
+    date_hierarchy = "timestamp"
+    ordering = ("-timestamp",)
+
+
+@admin.register(MinMaxData)
+class MinMaxDataAdmin(TimeSeriesAdmin):
+    list_display = ("date", "station", "min_temperature", "max_temperature", "min_humidity", "max_humidity", "mismatch")
+    list_filter = ("station", "mismatch")
+    date_hierarchy = "date"
+    ordering = ("-date",)
+
+
+@admin.register(AlertRule)
+class AlertRuleAdmin(admin.ModelAdmin):
+    list_display = ("name", "station", "metric", "operator", "threshold", "hysteresis", "min_duration", "enabled")
+    list_filter = ("metric", "enabled")
+    raw_id_fields = ("station",)
+
+
+@admin.register(Alert)
+class AlertAdmin(admin.ModelAdmin):
+    list_display = ("rule", "station", "started_at", "fired_at", "resolved_at", "value")
+    list_select_related = ()  # No JOIN: rules and stations live in the default database
+    list_filter = ("rule",)
+    raw_id_fields = ("rule", "station")
+    date_hierarchy = "started_at"
+
+    def get_queryset(self, request):
+        # Time-series database: rules and stations of the page in batched lookups
+        return super().get_queryset(request).prefetch_related("rule", "station")
+
+
+@admin.register(StationHealth)
+class StationHealthAdmin(admin.ModelAdmin):
+    list_display = ("station", "last_weather_at", "last_reading_at", "last_status_at", "free_heap", "wifi_strength", "sync_failures")
+    list_select_related = ()  # No JOIN: stations live in the default database
+    readonly_fields = ("last_weather_at", "last_reading_at", "last_status_at", "free_heap", "wifi_strength", "last_failure_at")
+    raw_id_fields = ("station",)
+
+    def get_queryset(self, request):
+        # Time-series database: stations of the page in one batched lookup, no JOIN
+        return super().get_queryset(request).prefetch_related("station")
@@ -0,0 +1,127 @@
+"""
+Threshold alerts evaluated while readings are ingested.
+
+Enabled rules are kept in a per-process index {station_id or None (fleet): {metric: [rules]}}
+so a batch only looks at the rules matching its station and metrics: evaluation
+costs O(records x matching rules) plus one query for the open alerts.
+"""
+
+import time
+
+from django.conf import settings
+from django.utils.timezone import is_naive, make_aware
+
+from .models import AlertRule, Alert
+
+
+class RuleIndex:
+    """ Enabled AlertRules grouped by station and metric, reloaded after a TTL or on rule changes """
+
+    def __init__(self):
+        self._rules = None
+        self._loaded_at = 0.0
+
+    def invalidate(self):
+        self._rules = None
+
+    def _load(self):
+        rules = {}
+        for rule in AlertRule.objects.filter(enabled=True):
+            rules.setdefault(rule.station_id, {}).setdefault(rule.metric, []).append(rule)
+        self._rules = rules
+        self._loaded_at = time.monotonic()
+
+    def rules_for(self, station_id, metrics):
+        """ {metric: [rules]} applying to a station (its own rules and the fleet-wide ones) """
+        if self._rules is None or time.monotonic() - self._loaded_at > getattr(settings, "ALERT_RULES_TTL", 60):
+            self._load()
+
+        own = self._rules.get(station_id, {})
+        fleet = self._rules.get(None, {})
+        matching = {}
+        for metric in metrics:
+            rules = own.get(metric, []) + fleet.get(metric, [])
+            if rules:
+                matching[metric] = rules
+        return matching
+
+
+rule_index = RuleIndex()  # Invalidated by api.signals when a rule changes
+
+
+def _triggered(rule, value):
+    return value > rule.threshold if rule.operator == "above" else value < rule.threshold
+
+
+def _cleared(rule, value):
+    if rule.operator == "above":
+        return value < rule.threshold - rule.hysteresis
+    return value > rule.threshold + rule.hysteresis
+
+
+def _peak(rule, a, b):
+    return max(a, b) if rule.operator == "above" else min(a, b)
+
+
+def evaluate(station, records):
+    """
+    Run the alert rules of `station` over `records`: [(timestamp, {metric: value}), ...].
+    Returns the alerts that fired during this batch.
+    """
+    if not records:
+        return []
+    matching = rule_index.rules_for(station.pk, records[0][1].keys())
+    if not matching:
+        return []
+
+    records = sorted(
+        ((make_aware(ts) if is_naive(ts) else ts, values) for ts, values in records),
+        key=lambda record: record[0]
+    )
+    rule_ids = [rule.pk for rules in matching.values() for rule in rules]
+    open_alerts = {
+        alert.rule_id: alert
+        for alert in Alert.objects.filter(station=station, rule_id__in=rule_ids, resolved_at__isnull=True)
+    }
+
+    changed, dropped, fired = {}, [], []
+    for ts, values in records:
+        for metric, rules in matching.items():
+            value = values.get(metric)
+            if value is None:
+                continue
+            for rule in rules:
+                alert = open_alerts.get(rule.pk)
+                if alert is not None and ts <= alert.last_seen:
+                    continue  # Resynced reading already evaluated
+
+                if alert is None:
+                    if not _triggered(rule, value):
+                        continue
+                    alert = Alert(rule=rule, station=station, started_at=ts, last_seen=ts, value=value)
+                    open_alerts[rule.pk] = alert
+                elif alert.fired_at is None and not _triggered(rule, value):
+                    # Pending: the condition must hold continuously for min_duration
+                    del open_alerts[rule.pk]
+                    changed.pop(id(alert), None)
+                    if alert.pk:
+                        dropped.append(alert.pk)
+                    continue
+                elif alert.fired_at is not None and _cleared(rule, value):
+                    alert.resolved_at = ts
+                    del open_alerts[rule.pk]
+
+                alert.last_seen = ts
+                alert.value = _peak(rule, alert.value, value)
+                if alert.fired_at is None and ts - alert.started_at >= rule.min_duration:
+                    alert.fired_at = ts
+                    fired.append(alert)
+                changed[id(alert)] = alert
+
+    if dropped:
+        Alert.objects.filter(pk__in=dropped).delete()
+    new = [alert for alert in changed.values() if alert.pk is None]
+    existing = [alert for alert in changed.values() if alert.pk is not None]
+    Alert.objects.bulk_create(new)
+    Alert.objects.bulk_update(existing, ["fired_at", "resolved_at", "last_seen", "value"])
+    return fired
@@ -0,0 +1,135 @@
+"""
+Vectorized derived metrics over a station's raw WeatherData series.
+
+All functions take NumPy arrays (timestamps as epoch seconds, sorted ascending)
+and never loop in Python over the readings.
+"""
+
+import math
+from datetime import datetime, timezone
+
+import numpy as np
+
+
+SECONDS_PER_DAY = 86400
+
+# Magnus coefficients (Sonntag 1990), valid from -45°C to 60°C
+MAGNUS_A = 17.62
+MAGNUS_B = 243.12
+
+
+def fetch_series(queryset):
+    """ Return (ts, tmp, hum) arrays from a WeatherData queryset with a single values_list query """
+    rows = list(queryset.order_by("timestamp").values_list("timestamp", "temperature", "humidity"))
+    if not rows:
+        empty = np.empty(0)
+        return empty, empty, empty
+
+    timestamps, temperatures, humidities = zip(*rows)
+    ts = np.fromiter((t.timestamp() for t in timestamps), dtype=np.float64, count=len(rows))
+    return ts, np.asarray(temperatures, dtype=np.float64), np.asarray(humidities, dtype=np.float64)
+
+
+def dew_point(tmp, hum):
+    """ Dew point in °C (Magnus formula) """
+    hum = np.clip(hum, 1e-3, 100.0)  # ln(0) guard
+    gamma = np.log(hum / 100.0) + MAGNUS_A * tmp / (MAGNUS_B + tmp)
+    return MAGNUS_B * gamma / (MAGNUS_A - gamma)
+
+
+def heat_index(tmp, hum):
+    """ Heat index in °C (NOAA: Steadman's simple formula, Rothfusz regression above 80°F) """
+    t = tmp * 9.0 / 5.0 + 32.0
+    simple = 0.5 * (t + 61.0 + (t - 68.0) * 1.2 + hum * 0.094)
+
+    full = (-42.379 + 2.04901523 * t + 10.14333127 * hum - 0.22475541 * t * hum
+            - 6.83783e-3 * t * t - 5.481717e-2 * hum * hum + 1.22874e-3 * t * t * hum
+            + 8.5282e-4 * t * hum * hum - 1.99e-6 * t * t * hum * hum)
+    # NOAA adjustments for dry-hot and humid-mild conditions
+    dry = (hum < 13) & (t >= 80) & (t <= 112)
+    full = np.where(dry, full - (13 - hum) / 4 * np.sqrt(np.clip((17 - np.abs(t - 95)) / 17, 0, None)), full)
+    humid = (hum > 85) & (t >= 80) & (t <= 87)
+    full = np.where(humid, full + (hum - 85) / 10 * (87 - t) / 5, full)
+
+    hi = np.where((simple + t) / 2 >= 80.0, full, simple)
+    return (hi - 32.0) * 5.0 / 9.0
+
+
+def rolling_mean(ts, values, window_s):
+    """ Trailing time-window mean: readings in (ts - window_s, ts], irregular spacing allowed """
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    right = np.arange(1, len(values) + 1)
+    left = np.searchsorted(ts, ts - window_s, side="right")
+    return (csum[right] - csum[left]) / (right - left)
+
+
+def rate_of_change(ts, values):
+    """ Change per hour relative to the previous reading (NaN for the first one and duplicate timestamps) """
+    roc = np.full(len(values), np.nan)
+    if len(values) > 1:
+        dt_h = np.diff(ts) / 3600.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            roc[1:] = np.where(dt_h > 0, np.diff(values) / dt_h, np.nan)
+    return roc
+
+
+def daily_degree_days(ts, tmp, base):
+    """ Per UTC day: (day start epoch, mean temperature, heating degree-days, cooling degree-days) """
+    day = np.floor_divide(ts, SECONDS_PER_DAY).astype(np.int64)
+    days, inverse = np.unique(day, return_inverse=True)
+    mean = np.bincount(inverse, weights=tmp) / np.bincount(inverse)
+    hdd = np.clip(base - mean, 0.0, None)
+    cdd = np.clip(mean - base, 0.0, None)
+    return days * SECONDS_PER_DAY, mean, hdd, cdd
+
+
+def to_json_list(values, digits=1):
+    """ Round to `digits` decimals, NaN becomes None (NaN is not valid JSON) """
+    rounded = np.round(values, digits)
+    return [None if math.isnan(v) else v for v in rounded.tolist()]
+
+
+def format_epochs(epochs, fmt="%Y%m%d%H%M%S"):
+    """ Epoch seconds -> API timestamp strings (UTC) """
+    return [datetime.fromtimestamp(e, timezone.utc).strftime(fmt) for e in np.asarray(epochs).tolist()]
+
+
+RESAMPLE_STEPS = {"30m": 1800, "1h": 3600, "1d": SECONDS_PER_DAY}
+FILL_METHODS = ("none", "linear", "previous")
+
+
+def resample(ts, values, start, end, step, fill="none"):
+    """
+    Align readings to a regular grid of `step` seconds covering [start, end) (epoch seconds).
+    Readings falling in the same cell are averaged (resync duplicates collapse),
+    empty cells are NaN unless filled by carrying the previous value (up to the end of the grid)
+    or interpolating linearly between neighbours. Leading gaps stay NaN with both methods,
+    trailing gaps too with `linear`.
+    Returns (grid, [resampled array for each of `values`]).
+    """
+    origin = np.floor(start / step) * step
+    n_cells = int(np.ceil((end - origin) / step))
+    grid = origin + np.arange(n_cells) * step
+
+    cell = ((ts - origin) // step).astype(np.int64)
+    inside = (cell >= 0) & (cell < n_cells)
+    cell = cell[inside]
+    counts = np.bincount(cell, minlength=n_cells)
+    filled = counts > 0
+
+    results = []
+    for series in values:
+        sums = np.bincount(cell, weights=series[inside], minlength=n_cells)
+        with np.errstate(invalid="ignore"):
+            out = np.where(filled, sums / np.maximum(counts, 1), np.nan)
+
+        if fill == "previous":
+            last = np.maximum.accumulate(np.where(filled, np.arange(n_cells), -1))
+            out = np.where(last >= 0, out[np.maximum(last, 0)], np.nan)
+        elif fill == "linear" and filled.any():
+            known = np.flatnonzero(filled)
+            interior = (np.arange(n_cells) > known[0]) & (np.arange(n_cells) < known[-1])
+            out = np.where(interior & ~filled, np.interp(grid, grid[known], out[known]), out)
+        results.append(out)
+
+    return grid, results
@@ -0,0 +1,92 @@
+"""
+Traffic capture and replay, to reproduce production load shapes locally.
+
+CaptureMiddleware appends one NDJSON line per sampled /api/ request (settings.CAPTURE_SAMPLE_RATE,
+off by default) to CAPTURE_DIR/capture-<YYYYMMDDHH>-<pid>.ndjson:
+`{"at": epoch, "m": method, "p": path, "v": view, "ip": client, "ct": type, "b": body, "s": status, "ms": time}`.
+Bodies that are not UTF-8 (compressed uploads) are stored base64 in "b64"; bodies over CAPTURE_MAX_BODY
+bytes are dropped ("cut": size) and such requests are not replayed.
+
+Only the capture side lives here: the middleware is loaded by every profile, meteo.settings_ingest
+included, whose workers must start without NumPy. Reading, replaying and comparing logs is done by
+`manage.py replay_traffic` (api/management/commands/replay_traffic.py).
+"""
+
+import base64
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.timezone import now
+
+
+PREFIX = "/api/"
+
+_lock = threading.Lock()
+
+
+def capture_dir():
+    return Path(settings.CAPTURE_DIR)
+
+
+def client_ip(request):
+    """ Same address the upload views validate (first X-Forwarded-For entry, else REMOTE_ADDR) """
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR")
+    return forwarded.split(",")[0].strip() if forwarded else request.META.get("REMOTE_ADDR")
+
+
+class CaptureMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = settings.CAPTURE_SAMPLE_RATE
+        if not rate or not request.path.startswith(PREFIX) or random.random() >= rate:
+            return self.get_response(request)
+
+        try:
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            length = 0
+        # Read before the view consumes the stream; larger bodies are left to stream to the view
+        body = request.body if length <= settings.CAPTURE_MAX_BODY else b""
+        at = time.time()
+        started = time.perf_counter()
+        response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        record = {
+            "at": round(at, 3),
+            "m": request.method,
+            "p": request.get_full_path(),
+            "v": request.resolver_match.view_name if request.resolver_match else None,
+            "ip": client_ip(request),
+            "s": response.status_code,
+            "ms": round(elapsed * 1000, 2),
+        }
+        if request.content_type and length:
+            record["ct"] = request.content_type
+        if request.META.get("HTTP_CONTENT_ENCODING"):
+            record["ce"] = request.META["HTTP_CONTENT_ENCODING"]
+        if length > settings.CAPTURE_MAX_BODY:
+            record["cut"] = length
+        elif body:
+            try:
+                record["b"] = body.decode("utf-8")
+            except UnicodeDecodeError:
+                record["b64"] = base64.b64encode(body).decode("ascii")
+        write_record(record)
+        return response
+
+
+def write_record(record):
+    directory = capture_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"capture-{now().strftime('%Y%m%d%H')}-{os.getpid()}.ndjson"
+    line = json.dumps(record, separators=(",", ":")) + "\n"
+    with _lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line)
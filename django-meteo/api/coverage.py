@@ -0,0 +1,89 @@
+"""
+Per station-day coverage bitmaps: one bit per 30-minute slot (48 per UTC day).
+
+The bitmaps are OR-ed at ingest so that gaps can be reported for any range
+from a handful of small rows instead of scanning WeatherData.
+"""
+
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.db import transaction
+from django.utils.timezone import make_aware
+
+from .models import DailyCoverage
+
+
+SLOT_MINUTES = 30
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+FULL_DAY = (1 << SLOTS_PER_DAY) - 1
+_SLOT_BITS = np.arange(SLOTS_PER_DAY, dtype=np.int64)
+
+
+def slot_of(ts):
+    """ Index of the 30-minute slot of a (UTC) datetime within its day """
+    return (ts.hour * 60 + ts.minute) // SLOT_MINUTES
+
+
+def day_bitmaps(timestamps):
+    """ {date: bitmap} of the slots hit by `timestamps` """
+    bitmaps = {}
+    for ts in timestamps:
+        day = ts.date()
+        bitmaps[day] = bitmaps.get(day, 0) | (1 << slot_of(ts))
+    return bitmaps
+
+
+def record_coverage(station, timestamps):
+    """ OR the slots of newly ingested readings into the station's daily bitmaps """
+    bitmaps = day_bitmaps(timestamps)
+    if not bitmaps:
+        return
+
+    with transaction.atomic(using=DailyCoverage.objects.db):
+        existing = DailyCoverage.objects.select_for_update().filter(station=station, date__in=list(bitmaps))
+        for day, bitmap in existing.values_list("date", "bitmap"):
+            bitmaps[day] |= bitmap
+
+        DailyCoverage.objects.bulk_create(
+            [DailyCoverage(station=station, date=day, bitmap=bitmap) for day, bitmap in bitmaps.items()],
+            update_conflicts=True,
+            unique_fields=["station", "date"],
+            update_fields=["bitmap"],
+        )
+
+
+def load_bitmaps(start, end, station=None):
+    """ {station_id: {date: bitmap}} for the days overlapping [start, end), in one query """
+    rows = DailyCoverage.objects.filter(date__gte=start.date(), date__lte=(end - timedelta(microseconds=1)).date())
+    if station is not None:
+        rows = rows.filter(station=station)
+
+    by_station = {}
+    for station_id, day, bitmap in rows.values_list("station_id", "date", "bitmap"):
+        by_station.setdefault(station_id, {})[day] = bitmap
+    return by_station
+
+
+def slot_bits(bitmaps, start, end):
+    """ Flat 0/1 array of the slots in [start, end) plus the datetime of its first slot """
+    first_day = start.date()
+    n_days = ((end - timedelta(microseconds=1)).date() - first_day).days + 1
+    days = [first_day + timedelta(days=i) for i in range(n_days)]
+
+    words = np.array([bitmaps.get(day, 0) for day in days], dtype=np.int64)
+    bits = ((words[:, None] >> _SLOT_BITS) & 1).ravel()
+
+    first = slot_of(start)
+    last = n_days * SLOTS_PER_DAY - (SLOTS_PER_DAY - slot_of(end - timedelta(microseconds=1)) - 1)
+    origin = make_aware(datetime.combine(first_day, time.min), start.tzinfo)
+    return bits[first:last], origin + timedelta(minutes=first * SLOT_MINUTES)
+
+
+def missing_intervals(bits, origin):
+    """ [(start, end), ...] of the runs of empty slots """
+    edges = np.diff(np.concatenate(([1], bits, [1])))
+    starts = np.flatnonzero(edges == -1)
+    ends = np.flatnonzero(edges == 1)
+    slot = timedelta(minutes=SLOT_MINUTES)
+    return [(origin + int(s) * slot, origin + int(e) * slot) for s, e in zip(starts, ends)]
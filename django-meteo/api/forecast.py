@@ -0,0 +1,126 @@
+"""
+Short-term temperature / humidity forecast from an incremental Holt-Winters state.
+
+Each station keeps one ForecastState row: per metric an additive, damped-trend Holt-Winters
+state (level, trend per hour, 24 hour-of-day seasonal offsets) and the smoothed squared
+one-step error. Every new reading updates it in O(1); readings older than the state
+(late resyncs) are skipped. The first batch of a station seeds the state from its last
+FORECAST_SEED_DAYS of stored readings, once. Forecasts read the state only.
+"""
+
+import math
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.timezone import is_naive, make_aware
+
+from .models import ForecastState
+from .storage import get_storage
+
+
+METRICS = {"tmp": "temperature", "hum": "humidity"}
+SEASON = 24  # Hour-of-day (UTC) seasonality
+ERR_WEIGHT = 0.05  # Weight of the newest squared one-step error in `err`
+
+
+def _params():
+    return (
+        settings.FORECAST_ALPHA, settings.FORECAST_BETA, settings.FORECAST_GAMMA, settings.FORECAST_DAMPING
+    )
+
+
+def _hour(epoch):
+    return int(epoch // 3600) % SEASON
+
+
+def damped_sum(phi, hours):
+    """ phi + phi² + … + phi^hours (trend contribution after `hours` hours) """
+    if phi == 1.0:
+        return hours
+    return phi * (1 - phi ** hours) / (1 - phi)
+
+
+def update(metric_state, hours, epoch, value):
+    """ Fold one reading, `hours` after the previous one, into `metric_state` (dict, updated in place) """
+    alpha, beta, gamma, phi = _params()
+    if not metric_state:
+        metric_state.update(level=value, trend=0.0, season=[0.0] * SEASON, err=0.0)
+        return
+
+    h = _hour(epoch)
+    level, trend, season = metric_state["level"], metric_state["trend"], metric_state["season"]
+    projected = level + trend * damped_sum(phi, hours)
+    error = value - (projected + season[h])
+
+    new_level = alpha * (value - season[h]) + (1 - alpha) * projected
+    if hours > 0:
+        trend = beta * (new_level - level) / hours + (1 - beta) * trend * phi ** hours
+    season[h] = gamma * (value - new_level) + (1 - gamma) * season[h]
+    metric_state.update(level=new_level, trend=trend, err=ERR_WEIGHT * error * error + (1 - ERR_WEIGHT) * metric_state["err"])
+
+
+def fold(state, last_epoch, readings):
+    """ Fold (epoch, {metric: value}) readings sorted by time into `state`; returns (last_epoch, folded) """
+    folded = 0
+    for epoch, values in readings:
+        if last_epoch is not None and epoch <= last_epoch:
+            continue
+        hours = (epoch - last_epoch) / 3600 if last_epoch is not None else 0.0
+        for metric, value in values.items():
+            update(state.setdefault(metric, {}), hours, epoch, value)
+        last_epoch = epoch
+        folded += 1
+    return last_epoch, folded
+
+
+def _epoch(ts):
+    return (make_aware(ts) if is_naive(ts) else ts).timestamp()
+
+
+def record_forecast(station, entries):
+    """ Update the forecast state of `station` with newly ingested WeatherData entries """
+    readings = sorted(
+        ((_epoch(entry.timestamp), {"tmp": entry.temperature, "hum": entry.humidity}) for entry in entries),
+        key=lambda reading: reading[0]
+    )
+    if not readings:
+        return
+
+    with transaction.atomic(using=ForecastState.objects.db):
+        # Insert the row if missing, then lock it: two first uploads racing both find it, only one seeds
+        ForecastState.objects.bulk_create(
+            [ForecastState(station=station, last_ts=datetime.fromtimestamp(0, timezone.utc), state={})],
+            ignore_conflicts=True,
+        )
+        row = ForecastState.objects.select_for_update().get(station=station)
+        if not row.state:
+            # Seed once from the stored history preceding this batch
+            first = datetime.fromtimestamp(readings[0][0], timezone.utc)
+            ts, tmp, hum = get_storage().read(station, first - timedelta(days=settings.FORECAST_SEED_DAYS), first)
+            readings = [(t, {"tmp": a, "hum": b}) for t, a, b in zip(ts.tolist(), tmp.tolist(), hum.tolist())] + readings
+            last_epoch = None
+        else:
+            last_epoch = row.last_ts.timestamp()
+
+        last_epoch, folded = fold(row.state, last_epoch, readings)
+        if not folded:
+            return
+        row.last_ts = datetime.fromtimestamp(last_epoch, timezone.utc)
+        row.count += folded
+        row.save()
+
+
+def forecast(state, last_epoch, horizons):
+    """ {metric: ([values], sigma)} at `horizons` hours after `last_epoch` """
+    phi = settings.FORECAST_DAMPING
+    result = {}
+    for metric, s in state.items():
+        values = [
+            s["level"] + s["trend"] * damped_sum(phi, h) + s["season"][_hour(last_epoch + h * 3600)]
+            for h in horizons
+        ]
+        if metric == "hum":
+            values = [min(100.0, max(0.0, v)) for v in values]
+        result[metric] = (values, math.sqrt(s["err"]))
+    return result
@@ -0,0 +1,67 @@
+"""
+Fleet health index: one StationHealth row per station, maintained by the upload views.
+
+Each accepted upload refreshes its station's row with a single UPDATE (creating the row
+on the station's first upload); rejected uploads of a known station count as sync failures.
+`/api/health/` then answers from this table alone instead of ordering readings per station.
+The table lives in the time-series database, next to the readings: uploads never write db.sqlite3.
+"""
+
+from functools import wraps
+
+from django.db.models import DateTimeField, F, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils.timezone import is_naive, make_aware, now
+
+from .models import StationHealth
+
+
+INGEST_COST_WEIGHT = 0.2  # Weight of the newest upload in the ingest_ms moving average
+
+
+def _touch(station, **fields):
+    if not StationHealth.objects.filter(station=station).update(**fields):
+        StationHealth.objects.bulk_create([StationHealth(station=station)], ignore_conflicts=True)
+        StationHealth.objects.filter(station=station).update(**fields)
+
+
+def record_sync(station, **fields):
+    """ An upload of `station` was accepted: reset its failure count and store `fields` """
+    _touch(station, sync_failures=0, **fields)
+
+
+def record_weather(station, timestamps, elapsed_ms=None):
+    """ Weather readings were stored: refresh last seen, the newest reading timestamp and the ingest cost """
+    fields = {"last_weather_at": now()}
+    if elapsed_ms is not None:
+        fields["ingest_ms"] = Coalesce(F("ingest_ms") * (1 - INGEST_COST_WEIGHT) + elapsed_ms * INGEST_COST_WEIGHT, elapsed_ms)
+    if timestamps:
+        newest = max(timestamps)
+        newest = Value(make_aware(newest) if is_naive(newest) else newest, output_field=DateTimeField())
+        fields["last_reading_at"] = Greatest(Coalesce("last_reading_at", newest), newest)
+    record_sync(station, **fields)
+
+
+def record_status(station, free_heap, wifi_strength):
+    record_sync(station, last_status_at=now(), free_heap=free_heap, wifi_strength=wifi_strength)
+
+
+def set_sync_offset(station, offset):
+    _touch(station, sync_offset=offset)
+
+
+def record_failure(station):
+    _touch(station, sync_failures=F("sync_failures") + 1, last_failure_at=now())
+
+
+def tracks_sync_failures(view):
+    """ Count error responses of an upload view as sync failures of the station it identified
+    (views set `request.meteo_station` once the station is known) """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        station = getattr(request, "meteo_station", None)
+        if station is not None and response.status_code >= 400:
+            record_failure(station)
+        return response
+    return wrapper
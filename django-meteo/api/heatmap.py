@@ -0,0 +1,51 @@
+"""
+Day × hour-of-day heatmaps of a station's readings.
+
+Each cell is one HourlyRollup row (count, sum, min, max), which ingest keeps up to date in the
+time-series database (see api.rollups): a heatmap is one query over rollups shared by all workers,
+never a scan of the readings, and there is no per-process cache to invalidate.
+"""
+
+from datetime import datetime, time, timedelta, timezone
+
+import numpy as np
+
+from .models import HourlyRollup
+from .rollups import combine
+
+
+METRICS = ("tmp", "hum")
+HOURS = 24
+
+
+def _day_start(day):
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def day_hour_matrix(hours, counts, sums, lows, highs, first_epoch, n_days):
+    """ (mean, min, max) arrays of shape (n_days, 24) from hourly partials (hour start epochs), NaN where an
+    hour has no reading """
+    cell = ((hours - first_epoch) // 3600).astype(np.int64)
+    inside = (cell >= 0) & (cell < n_days * HOURS)
+    total, total_sum, low, high = combine(cell[inside], n_days * HOURS, counts[inside], sums[inside], lows[inside], highs[inside])
+
+    empty = total == 0
+    with np.errstate(invalid="ignore"):
+        mean = np.where(empty, np.nan, total_sum / np.maximum(total, 1))
+    low[empty] = np.nan
+    high[empty] = np.nan
+    return mean.reshape(n_days, HOURS), low.reshape(n_days, HOURS), high.reshape(n_days, HOURS)
+
+
+def station_heatmap(station, metric, first_day, last_day):
+    """ {date: (mean, min, max)} rows of [first_day, last_day] """
+    n_days = (last_day - first_day).days + 1
+    start = _day_start(first_day)
+    rollups = HourlyRollup.objects.filter(station=station, hour__gte=start, hour__lt=start + timedelta(days=n_days))
+    rows = list(rollups.values_list("hour", "count", f"{metric}_sum", f"{metric}_min", f"{metric}_max"))
+
+    columns = list(zip(*rows)) or [()] * 5
+    hours = np.array([hour.timestamp() for hour in columns[0]])
+    partials = (np.array(column, dtype=np.float64) for column in columns[1:])
+    mean, low, high = day_hour_matrix(hours, *partials, start.timestamp(), n_days)
+    return {first_day + timedelta(days=i): (mean[i], low[i], high[i]) for i in range(n_days)}
@@ -0,0 +1,61 @@
+"""
+Weather ingest shared by the upload endpoint and `manage.py import_weather`:
+validation of API records and the bookkeeping that follows stored readings.
+"""
+
+from datetime import datetime
+
+from . import coverage, forecast, rollups, sketches
+from .models import WeatherData
+from .reconciliation import reconcile_minmax
+from .response_cache import bump_station_version
+from .storage import get_storage
+
+
+def parse_custom_datetime(ts):
+    """ Convert 'YYYYMMDDHHMISS' to a valid datetime object. """
+    try:
+        if isinstance(ts, str) and len(ts) == 14 and ts.isdigit():
+            # Fixed-width fast path, ~10x cheaper than strptime on large batches
+            return datetime(int(ts[:4]), int(ts[4:6]), int(ts[6:8]), int(ts[8:10]), int(ts[10:12]), int(ts[12:]))
+        return datetime.strptime(ts, "%Y%m%d%H%M%S")
+    except ValueError:
+        return None
+
+
+def weather_entries(station, records):
+    """ API records [{"ts", "tmp", "hum"}] -> unsaved WeatherData (values rounded to 0.1).
+    Raises ValueError on a bad timestamp, KeyError / TypeError on a missing or non-numeric value. """
+    entries = []
+    for record in records:
+        timestamp = parse_custom_datetime(record["ts"])
+        if not timestamp:
+            raise ValueError(f"Invalid timestamp format: {record['ts']}")
+
+        entries.append(
+            WeatherData(
+                station_id=station.pk,  # Skips the per-instance related-object routing of station=
+                timestamp=timestamp,
+                temperature=round(record["tmp"], 1),
+                humidity=round(record["hum"], 1)
+            )
+        )
+    return entries
+
+
+def store_weather(station, entries):
+    """ Write readings and fold them into the incremental aggregates (coverage bitmaps, sketches,
+    forecast state, hourly rollups). Returns the number of readings stored. """
+    discarded = []
+    saved_count = get_storage().write(station, entries, discarded)
+    coverage.record_coverage(station, [entry.timestamp for entry in entries])
+    sketches.record_sketches(station, entries, discarded)
+    forecast.record_forecast(station, entries)
+    rollups.record_rollups(station, entries)
+    return saved_count
+
+
+def weather_stored(station, dates):
+    """ Refresh what is derived from the readings of `dates`: min/max reconciliation and cached responses """
+    reconcile_minmax(station, dates)
+    bump_station_version(station.station_ref)
@@ -0,0 +1,77 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+# Runs in a fresh interpreter: time to a ready WSGI application, then cost of a request
+# that goes through middleware, URL resolution and the upload view but no query (invalid JSON → 400)
+PROBE = """
+import io, json, logging, os, sys, time
+started = time.perf_counter()
+os.environ["DJANGO_SETTINGS_MODULE"] = sys.argv[1]
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns  # URLconf import is part of the worker startup
+setup = time.perf_counter() - started
+logging.disable(logging.CRITICAL)
+
+def request():
+    environ = {
+        "REQUEST_METHOD": "PUT", "PATH_INFO": "/api/weather/upload/", "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": "1", "wsgi.input": io.BytesIO(b"{"), "wsgi.errors": sys.stderr, "wsgi.url_scheme": "http",
+        "SERVER_NAME": "localhost", "SERVER_PORT": "80", "REMOTE_ADDR": "127.0.0.1",
+    }
+    response = application(environ, lambda status, headers: None)
+    b"".join(response)
+    response.close()
+
+started = time.perf_counter()
+request()
+first = time.perf_counter() - started
+n = int(sys.argv[2])
+started = time.perf_counter()
+for _ in range(n):
+    request()
+per_request = (time.perf_counter() - started) / n
+print(json.dumps({"setup": setup, "first": first, "request": per_request, "modules": len(sys.modules)}))
+"""
+
+PROFILES = {"full": "meteo.settings", "ingest": "meteo.settings_ingest"}
+
+
+class Command(BaseCommand):
+    help = "Compare worker startup time and per-request overhead of the full and ingest-only settings profiles"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="Fresh processes per profile")
+        parser.add_argument("--requests", type=int, default=2000, help="Requests timed per process")
+
+    def handle(self, *args, **options):
+        env = {k: v for k, v in os.environ.items() if k != "DJANGO_SETTINGS_MODULE"}
+        self.stdout.write(
+            f"{'profile':<8} {'process ms':>11} {'setup ms':>9} {'1st req ms':>11} {'req µs':>8} {'modules':>8}"
+        )
+        for name, module in PROFILES.items():
+            samples = []
+            for _ in range(options["runs"]):
+                started = time.perf_counter()
+                out = subprocess.run(
+                    [sys.executable, "-c", PROBE, module, str(options["requests"])],
+                    cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+                ).stdout
+                wall = time.perf_counter() - started
+                samples.append({**json.loads(out.strip().splitlines()[-1]), "wall": wall})
+
+            median = {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+            self.stdout.write(
+                f"{name:<8} {median['wall'] * 1000:>11.1f} {median['setup'] * 1000:>9.1f} {median['first'] * 1000:>11.1f} "
+                f"{median['request'] * 1e6:>8.1f} {int(median['modules']):>8}"
+            )
+        self.stdout.write("process: interpreter start to exit; setup: django.setup + WSGI app + URLconf; medians")
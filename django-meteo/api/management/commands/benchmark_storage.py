@@ -0,0 +1,115 @@
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from api.storage import encode_day, decode_day
+
+
+ROWS_SCHEMA = """
+CREATE TABLE api_weatherdata (
+    id integer NOT NULL PRIMARY KEY AUTOINCREMENT, timestamp datetime NOT NULL,
+    temperature real NOT NULL, humidity real NOT NULL, station_id bigint NOT NULL
+);
+CREATE INDEX api_weather_station_idx ON api_weatherdata (station_id, timestamp);
+CREATE INDEX api_weather_timesta_idx ON api_weatherdata (timestamp);
+"""
+
+PACKED_SCHEMA = """
+CREATE TABLE api_packedday (
+    id integer NOT NULL PRIMARY KEY AUTOINCREMENT, date date NOT NULL, count integer NOT NULL,
+    times BLOB NOT NULL, temperature BLOB NOT NULL, humidity BLOB NOT NULL, station_id bigint NOT NULL,
+    CONSTRAINT unique_packed_station_date UNIQUE (station_id, date)
+);
+"""
+
+
+class Command(BaseCommand):
+    help = "Compare DB size and range-query speed of row-per-sample vs packed station-day storage (synthetic data)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stations", type=int, default=3)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--interval", type=int, default=30, help="Minutes between readings")
+        parser.add_argument("--range-days", type=int, default=30, help="Length of the queried range")
+
+    def handle(self, *args, **options):
+        first_day = date(2025, 1, 1)
+        per_day = 24 * 60 // options["interval"]
+        seconds = np.arange(per_day) * options["interval"] * 60
+        rng = np.random.default_rng(0)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            rows_db = sqlite3.connect(os.path.join(tmp_dir, "rows.sqlite3"))
+            packed_db = sqlite3.connect(os.path.join(tmp_dir, "packed.sqlite3"))
+            rows_db.executescript(ROWS_SCHEMA)
+            packed_db.executescript(PACKED_SCHEMA)
+
+            for station_id in range(1, options["stations"] + 1):
+                for d in range(options["days"]):
+                    day = first_day + timedelta(days=d)
+                    tmp = np.round(15 + 8 * np.sin(seconds / 86400 * 2 * np.pi) + rng.normal(0, 0.5, per_day), 1)
+                    hum = np.round(60 - 15 * np.sin(seconds / 86400 * 2 * np.pi) + rng.normal(0, 2, per_day), 1)
+                    start = datetime.combine(day, datetime.min.time())
+                    rows_db.executemany(
+                        "INSERT INTO api_weatherdata (timestamp, temperature, humidity, station_id) VALUES (?, ?, ?, ?)",
+                        [
+                            ((start + timedelta(seconds=int(s))).isoformat(" "), float(t), float(h), station_id)
+                            for s, t, h in zip(seconds, tmp, hum)
+                        ]
+                    )
+                    packed_db.execute(
+                        "INSERT INTO api_packedday (date, count, times, temperature, humidity, station_id) VALUES (?, ?, ?, ?, ?, ?)",
+                        (day.isoformat(), per_day, *encode_day(seconds, tmp, hum), station_id)
+                    )
+            for db in (rows_db, packed_db):
+                db.commit()
+                db.execute("VACUUM")
+
+            readings = options["stations"] * options["days"] * per_day
+            range_start = first_day + timedelta(days=options["days"] // 2)
+            range_end = range_start + timedelta(days=options["range_days"])
+
+            def query_rows():
+                cursor = rows_db.execute(
+                    "SELECT timestamp, temperature, humidity FROM api_weatherdata "
+                    "WHERE station_id = ? AND timestamp >= ? AND timestamp < ? ORDER BY timestamp",
+                    (1, range_start.isoformat(), range_end.isoformat())
+                )
+                rows = cursor.fetchall()
+                # Same output as the packed path: epoch seconds and float arrays
+                ts = np.array([datetime.fromisoformat(r[0]).replace(tzinfo=timezone.utc).timestamp() for r in rows])
+                return ts, np.array([r[1] for r in rows]), np.array([r[2] for r in rows])
+
+            def query_packed():
+                cursor = packed_db.execute(
+                    "SELECT date, times, temperature, humidity FROM api_packedday "
+                    "WHERE station_id = ? AND date >= ? AND date < ? ORDER BY date",
+                    (1, range_start.isoformat(), range_end.isoformat())
+                )
+                parts = []
+                for day, times, tmp, hum in cursor:
+                    s, t, h = decode_day(times, tmp, hum)
+                    epoch = datetime.fromisoformat(day).replace(tzinfo=timezone.utc).timestamp()
+                    parts.append((epoch + s, t, h))
+                return tuple(np.concatenate(column) for column in zip(*parts))
+
+            self.stdout.write(f"📊 {readings} readings ({options['stations']} stations × {options['days']} days)")
+            for label, db_name, query in (("rows", "rows.sqlite3", query_rows), ("packed", "packed.sqlite3", query_packed)):
+                size = os.path.getsize(os.path.join(tmp_dir, db_name))
+                timings = []
+                for _ in range(20):
+                    started = time.perf_counter()
+                    result = query()
+                    timings.append(time.perf_counter() - started)
+                self.stdout.write(
+                    f"  {label:7s} size {size / 1024:10.1f} KiB ({size / readings:5.1f} B/reading)   "
+                    f"{options['range_days']}-day range: {len(result[0])} readings in {np.median(timings) * 1000:7.2f} ms (median)"
+                )
+
+            rows_db.close()
+            packed_db.close()
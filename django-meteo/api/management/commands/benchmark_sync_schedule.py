@@ -0,0 +1,44 @@
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.schedule import choose_slot, slot_loads
+
+
+def peak_concurrency(starts, durations):
+    """ Most uploads in progress at once (circular over the period is ignored: one hour simulated) """
+    events = np.concatenate((np.stack((starts, np.ones_like(starts)), 1), np.stack((starts + durations, -np.ones_like(starts)), 1)))
+    events = events[np.lexsort((events[:, 1], events[:, 0]))]  # Ends before starts at the same instant
+    return int(np.cumsum(events[:, 1]).max())
+
+
+class Command(BaseCommand):
+    help = "Simulate one sync period of the fleet: peak concurrent uploads with device clocks vs the server schedule"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stations", type=int, default=500)
+        parser.add_argument("--cluster", type=float, default=120.0, help="Spread (s) of device sync times around a common boot time")
+        parser.add_argument("--slot", type=int, default=settings.SYNC_SLOT_SECONDS, help="Slot length (s)")
+        parser.add_argument("--drift", type=float, default=2.0, help="Device clock error (s) when following the schedule")
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(0)
+        period, slot_seconds = settings.SYNC_PERIOD, options["slot"]
+        n = options["stations"]
+        durations = rng.lognormal(np.log(0.3), 0.6, n)  # Upload processing time (s)
+
+        scenarios = {
+            "clustered": rng.normal(0, options["cluster"], n) % period,  # Fleet powered on together
+            "random": rng.uniform(0, period, n),
+        }
+
+        # Server schedule: stations ask one after another, costs measured from earlier syncs
+        offsets = []
+        for i in range(n):
+            loads = slot_loads(offsets, durations[:i] * 1000, period // slot_seconds, slot_seconds)
+            offsets.append(choose_slot(loads, None, durations[i] * 1000) * slot_seconds)
+        scenarios["scheduled"] = (np.array(offsets) + rng.normal(0, options["drift"], n)) % period
+
+        self.stdout.write(f"{n} stations, mean upload {durations.mean() * 1000:.0f} ms, period {period} s")
+        for name, starts in scenarios.items():
+            self.stdout.write(f"{name:<10} peak concurrent uploads: {peak_concurrency(starts, durations):>4}")
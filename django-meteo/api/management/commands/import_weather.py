@@ -0,0 +1,144 @@
+import csv
+import itertools
+import json
+import sys
+import time
+import warnings
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from api import ingest
+from api.models import Station, WeatherData
+
+
+def read_records(stream, fmt):
+    """ Yield API-shaped records {"id"?, "ts", "tmp", "hum"} from a CSV or NDJSON stream """
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            record = {"ts": row.get("ts"), "tmp": row.get("tmp"), "hum": row.get("hum")}
+            try:
+                record["tmp"], record["hum"] = float(record["tmp"]), float(record["hum"])
+            except (TypeError, ValueError):
+                pass  # Left as is: rejected by ingest.weather_entries like a bad API value
+            if row.get("id"):
+                record["id"] = row["id"]
+            yield record
+        return
+
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError:
+            yield {"ts": None}  # Counted as rejected
+            continue
+        if isinstance(obj, dict) and isinstance(obj.get("data"), list):  # A whole upload payload per line
+            for record in obj["data"]:
+                yield {"id": obj.get("id"), **record} if isinstance(record, dict) else {"ts": None}
+        else:
+            yield obj if isinstance(obj, dict) else {"ts": None}
+
+
+@contextmanager
+def weather_indexes_dropped(enabled, stdout):
+    """ Drop the WeatherData indexes for the duration of the block, then rebuild them """
+    if not enabled:
+        yield
+        return
+    connection = connections[WeatherData.objects.db]
+    indexes = WeatherData._meta.indexes
+    with connection.schema_editor() as editor:
+        for index in indexes:
+            editor.remove_index(WeatherData, index)
+    try:
+        yield
+    finally:
+        started = time.perf_counter()
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.add_index(WeatherData, index)
+        stdout.write(f"🔧 {len(indexes)} indexes rebuilt in {time.perf_counter() - started:.1f} s")
+
+
+class Command(BaseCommand):
+    help = "Import historical readings from a CSV (ts,tmp,hum[,id]) or NDJSON file, validated like the upload API"
+
+    def add_arguments(self, parser):
+        parser.add_argument("file", help="Path, or - for stdin")
+        parser.add_argument("--format", choices=["csv", "ndjson"], help="Default: from the file extension")
+        parser.add_argument("--station", help="station_ref of rows without an id")
+        parser.add_argument("--chunk", type=int, default=10000, help="Readings per bulk insert / transaction")
+        parser.add_argument("--drop-indexes", action="store_true",
+                            help="Drop the WeatherData indexes during the import and rebuild them after (rows storage)")
+        parser.add_argument("--strict", action="store_true", help="Stop at the first invalid row")
+
+    def handle(self, *args, **options):
+        fmt = options["format"] or ("csv" if options["file"].endswith(".csv") else "ndjson")
+        drop_indexes = options["drop_indexes"]
+        if drop_indexes and getattr(settings, "WEATHER_STORAGE", "rows") != "rows":
+            self.stderr.write("--drop-indexes ignored: only WeatherData rows have secondary indexes")
+            drop_indexes = False
+
+        stations = {s.station_ref: s for s in Station.objects.all()}
+        touched = {}  # station -> dates, derived data refreshed once at the end
+        imported = rejected = 0
+        started = time.perf_counter()
+
+        with warnings.catch_warnings():
+            # Timestamps are naive UTC like in the upload API: don't warn once per reading (restored on exit)
+            warnings.filterwarnings("ignore", r"DateTimeField .* received a naive datetime", RuntimeWarning)
+            stream = sys.stdin if options["file"] == "-" else open(options["file"], newline="", encoding="utf-8")
+            try:
+                with weather_indexes_dropped(drop_indexes, self.stdout):
+                    records = read_records(stream, fmt)
+                    while True:
+                        chunk = list(itertools.islice(records, options["chunk"]))
+                        if not chunk:
+                            break
+                        by_station, errors = self.validate(chunk, stations, options["station"])
+                        if errors and options["strict"]:
+                            raise CommandError(errors[0])
+                        rejected += len(errors)
+                        for message in errors[:3]:
+                            self.stderr.write(f"⚠️ {message}")
+
+                        with transaction.atomic(using=WeatherData.objects.db):
+                            for station, entries in by_station.items():
+                                imported += ingest.store_weather(station, entries)
+                                touched.setdefault(station, set()).update(entry.timestamp.date() for entry in entries)
+                        if options["verbosity"] > 1:
+                            self.stdout.write(f"… {imported} readings, {imported / (time.perf_counter() - started):.0f} rows/s")
+            finally:
+                if stream is not sys.stdin:
+                    stream.close()
+
+        insert_seconds = time.perf_counter() - started
+        for station, dates in touched.items():
+            dates = sorted(dates)
+            for i in range(0, len(dates), 31):  # Reconcile a month of readings at a time
+                ingest.weather_stored(station, set(dates[i:i + 31]))
+
+        self.stdout.write(
+            f"✅ {imported} readings imported, {rejected} rejected, {len(touched)} stations in {insert_seconds:.1f} s "
+            f"({imported / max(insert_seconds, 1e-9):.0f} rows/s); derived data refreshed in "
+            f"{time.perf_counter() - started - insert_seconds:.1f} s"
+        )
+
+    def validate(self, chunk, stations, default_ref):
+        """ Group the records of a chunk by station -> ({station: [WeatherData]}, [error messages]) """
+        by_station, errors = {}, []
+        for record in chunk:
+            station_ref = record.get("id") or default_ref
+            station = stations.get(station_ref)
+            if station is None:
+                errors.append(f"Station not defined: {station_ref}")
+                continue
+            try:
+                by_station.setdefault(station, []).extend(ingest.weather_entries(station, [record]))
+            except (KeyError, TypeError, ValueError) as e:
+                errors.append(f"Invalid record {record}: {e}")
+        return by_station, errors
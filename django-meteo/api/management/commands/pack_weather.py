@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from api.models import Station, WeatherData
+from api.response_cache import bump_station_version
+from api.storage import PackedStorage
+
+
+class Command(BaseCommand):
+    help = "Convert WeatherData rows into PackedDay rows (run before switching WEATHER_STORAGE to 'packed')"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--station", help="Only this station_ref")
+        parser.add_argument("--delete", action="store_true", help="Delete the WeatherData rows once packed")
+
+    def handle(self, *args, **options):
+        stations = Station.objects.order_by("station_ref")
+        if options["station"]:
+            stations = stations.filter(station_ref=options["station"])
+
+        storage = PackedStorage()
+        for station in stations:
+            readings = WeatherData.objects.filter(station=station).order_by("timestamp")
+            if not readings.exists():
+                continue
+
+            # One day at a time keeps memory bounded for long histories
+            batch, current_day, packed = [], None, 0
+            for reading in readings.iterator(chunk_size=5000):
+                if reading.timestamp.date() != current_day and batch:
+                    packed += storage.write(station, batch)
+                    batch = []
+                current_day = reading.timestamp.date()
+                batch.append(reading)
+            packed += storage.write(station, batch)
+
+            if options["delete"]:
+                readings.delete()
+            bump_station_version(station.station_ref)  # Cached responses were built from the old layout
+            self.stdout.write(f"✅ {station.station_ref}: {packed} readings packed")
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from api.schedule import rebalance
+
+
+class Command(BaseCommand):
+    help = "Move stations to lighter sync slots when the measured ingest cost of their slot is too high (run e.g. daily)"
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{rebalance()} stations moved")
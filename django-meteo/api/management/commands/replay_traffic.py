@@ -0,0 +1,179 @@
+import base64
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from api.capture import capture_dir
+
+
+PERCENTILES = (50, 90, 99)
+
+
+def read_log(paths):
+    """ Records of the given capture files / directories, in request order """
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob("*.ndjson")) if path.is_dir() else [path])
+    records = []
+    for file in files:
+        with open(file, encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    records.sort(key=lambda r: r["at"])  # Stable: same-time records keep their file order
+    return records
+
+
+def body_of(record):
+    if "b64" in record:
+        return base64.b64decode(record["b64"])
+    if "b" in record:
+        return record["b"].encode("utf-8")
+    return None
+
+
+def send(target, record, timeout=30):
+    """ Reissue one captured request -> (status, seconds); status 0 when no response was received """
+    headers = {"X-Forwarded-For": record["ip"]} if record.get("ip") else {}
+    if record.get("ct"):
+        headers["Content-Type"] = record["ct"]
+    if record.get("ce"):
+        headers["Content-Encoding"] = record["ce"]
+    request = urllib.request.Request(target.rstrip("/") + record["p"], data=body_of(record), headers=headers, method=record["m"])
+
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = 0
+    return status, time.perf_counter() - started
+
+
+def replay(records, target, speed=1.0, concurrency=8, sender=send):
+    """ Reissue `records` against `target`, each at its original offset divided by `speed` (0: back to back),
+    from `concurrency` workers. Returns one result dict per record: view, captured and replayed status,
+    latency and lag (how late it was sent, when the pool could not keep up). """
+    if not records:
+        return []
+    origin = records[0]["at"]
+    started = time.perf_counter()
+
+    def run(record, due):
+        sent = time.perf_counter()
+        status, seconds = sender(target, record)
+        return {
+            "v": record.get("v") or record["p"].split("?")[0],
+            "s0": record.get("s"),
+            "s": status,
+            "ms": seconds * 1000,
+            "lag_ms": max(sent - due, 0.0) * 1000,
+        }
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = []
+        for record in records:
+            due = started + ((record["at"] - origin) / speed if speed else 0.0)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(run, record, due))
+        return [future.result() for future in futures]
+
+
+def summarize(results):
+    """ {view: {"n", "errors", "p50", "p90", "p99", "max", "lag_p99"}} latency in ms, plus "*" for all requests.
+    Errors are replayed statuses that differ from the captured ones (or no response). """
+    by_view = {}
+    for result in results:
+        by_view.setdefault(result["v"], []).append(result)
+        by_view.setdefault("*", []).append(result)
+
+    summary = {}
+    for view, rows in sorted(by_view.items()):
+        ms = np.array([r["ms"] for r in rows])
+        stats = {"n": len(rows), "errors": sum(1 for r in rows if r["s"] == 0 or (r["s0"] is not None and r["s"] != r["s0"]))}
+        stats.update({f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES))})
+        stats["max"] = round(float(ms.max()), 2)
+        stats["lag_p99"] = round(float(np.percentile([r["lag_ms"] for r in rows], 99)), 2)
+        summary[view] = stats
+    return summary
+
+
+def compare(baseline, current):
+    """ Rows (view, baseline stats, current stats, {pXX: relative change}) for the views of both summaries """
+    rows = []
+    for view in sorted(set(baseline) & set(current)):
+        change = {
+            f"p{p}": (current[view][f"p{p}"] - baseline[view][f"p{p}"]) / baseline[view][f"p{p}"]
+            if baseline[view][f"p{p}"] else None
+            for p in PERCENTILES
+        }
+        rows.append((view, baseline[view], current[view], change))
+    return rows
+
+
+
+class Command(BaseCommand):
+    help = "Replay requests captured by api.capture.CaptureMiddleware and report latency percentiles per view"
+
+    def add_arguments(self, parser):
+        parser.add_argument("logs", nargs="*", help="Capture files or directories (default: CAPTURE_DIR)")
+        parser.add_argument("--target", default="http://127.0.0.1:8000", help="Base URL of the instance to load")
+        parser.add_argument("--speed", type=float, default=1.0, help="Time scale: 2 = twice as fast, 0 = back to back")
+        parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at most")
+        parser.add_argument("--read-only", action="store_true", help="Only replay GET requests")
+        parser.add_argument("--limit", type=int, help="Replay the first N requests only")
+        parser.add_argument("--out", help="Write the summary as JSON (usable as --compare baseline)")
+        parser.add_argument("--compare", help="Summary JSON of a previous run to compare with")
+
+    def handle(self, *args, **options):
+        if options["speed"] < 0 or options["concurrency"] < 1:
+            raise CommandError("--speed must be >= 0 and --concurrency >= 1")
+        records = read_log(options["logs"] or [capture_dir()])
+        skipped = sum(1 for r in records if "cut" in r)
+        records = [r for r in records if "cut" not in r and (r["m"] == "GET" or not options["read_only"])]
+        if options["limit"]:
+            records = records[:options["limit"]]
+        if not records:
+            raise CommandError("No requests to replay")
+
+        span = records[-1]["at"] - records[0]["at"]
+        self.stdout.write(
+            f"Replaying {len(records)} requests ({span:.0f} s captured, speed {options['speed']:g}, "
+            f"concurrency {options['concurrency']}) against {options['target']}"
+            + (f"; {skipped} with a truncated body skipped" if skipped else "")
+        )
+        summary = summarize(replay(records, options["target"], options["speed"], options["concurrency"]))
+
+        self.stdout.write(
+            f"{'view':<28} {'n':>6} {'errors':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'lag p99':>8}"
+        )
+        for view, s in summary.items():
+            self.stdout.write(
+                f"{view:<28} {s['n']:>6} {s['errors']:>6} {s['p50']:>8.1f} {s['p90']:>8.1f} {s['p99']:>8.1f} "
+                f"{s['max']:>8.1f} {s['lag_p99']:>8.1f}"
+            )
+        self.stdout.write("errors: replayed status differs from the captured one; lag: sent late (pool saturated)")
+
+        if options["out"]:
+            with open(options["out"], "w") as f:
+                json.dump(summary, f, indent=1)
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                baseline = json.load(f)
+            self.stdout.write(f"\nCompared with {options['compare']} (p50 / p90 / p99, baseline -> now):")
+            for view, before, after, change in compare(baseline, summary):
+                cells = "  ".join(
+                    f"{before[p]:.1f}->{after[p]:.1f} ({change[p]:+.0%})" if change[p] is not None else f"{before[p]:.1f}->{after[p]:.1f}"
+                    for p in ("p50", "p90", "p99")
+                )
+                self.stdout.write(f"{view:<28} {cells}")
@@ -0,0 +1,53 @@
+import json
+import pstats
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.profiling import make_token, profile_dir
+
+
+class Command(BaseCommand):
+    help = "Summarize the request profiles written by api.profiling.ProfilingMiddleware"
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", nargs="?", help="Profile to detail (prefix of its file name); default: list them")
+        parser.add_argument("--limit", type=int, default=20, help="Profiles listed / functions and queries shown")
+        parser.add_argument("--sort", default="cumulative", help="pstats sort key for the function table")
+        parser.add_argument("--token", action="store_true", help="Print a signed X-Meteo-Profile header value")
+
+    def handle(self, *args, **options):
+        if options["token"]:
+            self.stdout.write(make_token())
+            return
+
+        metas = sorted(profile_dir().glob("*.json"), reverse=True)
+        if options["name"]:
+            matching = [m for m in metas if m.name.startswith(options["name"])]
+            if not matching:
+                raise CommandError(f"No profile matching {options['name']}")
+            self.detail(matching[0], options["limit"], options["sort"])
+            return
+
+        if not metas:
+            self.stdout.write("No profiles recorded")
+            return
+        self.stdout.write(f"{'profile':<60} {'status':>6} {'ms':>9} {'sql':>5} {'sql ms':>9}  path")
+        for path in metas[:options["limit"]]:
+            meta = json.loads(path.read_text())
+            self.stdout.write(
+                f"{path.stem:<60} {meta['status']:>6} {meta['ms']:>9.1f} {len(meta['sql']):>5} {meta['sql_ms']:>9.1f}  "
+                f"{meta['method']} {meta['path']}"
+            )
+
+    def detail(self, path, limit, sort):
+        meta = json.loads(path.read_text())
+        self.stdout.write(f"{meta['method']} {meta['path']} -> {meta['status']} ({meta['view']})")
+        self.stdout.write(f"Total {meta['ms']:.1f} ms, {len(meta['sql'])} queries in {meta['sql_ms']:.1f} ms")
+
+        self.stdout.write("\nSlowest queries:")
+        for query in sorted(meta["sql"], key=lambda q: q["ms"], reverse=True)[:limit]:
+            self.stdout.write(f"  {query['ms']:>8.2f} ms [{query['db']}] {query['sql'][:200]}")
+
+        self.stdout.write("\nFunctions:")
+        stats = pstats.Stats(str(path.with_suffix(".prof")), stream=self.stdout)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_station_http_address'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='minmaxdata',
+            index=models.Index(fields=['station', 'date'], name='api_minmaxd_station_9f983c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='minmaxdata',
+            index=models.Index(fields=['date'], name='api_minmaxd_date_207ef9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemstatus',
+            index=models.Index(fields=['station', 'timestamp'], name='api_systems_station_43def8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemstatus',
+            index=models.Index(fields=['timestamp'], name='api_systems_timesta_12e10d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='weatherdata',
+            index=models.Index(fields=['station', 'timestamp'], name='api_weather_station_b9bf7e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='weatherdata',
+            index=models.Index(fields=['timestamp'], name='api_weather_timesta_916a2c_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:30
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def remove_duplicate_minmax(apps, schema_editor):
+    """ Keep only the most recent upload for each (station, date) before adding the unique constraint """
+    MinMaxData = apps.get_model('api', 'MinMaxData')
+    db = schema_editor.connection.alias
+    keep_ids = (
+        MinMaxData.objects.using(db)
+        .values('station', 'date')
+        .annotate(keep_id=Max('id'))
+        .values_list('keep_id', flat=True)
+    )
+    MinMaxData.objects.using(db).exclude(id__in=list(keep_ids)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='minmaxdata',
+            name='api_minmaxd_station_9f983c_idx',
+        ),
+        migrations.AddField(
+            model_name='minmaxdata',
+            name='mismatch',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='minmaxdata',
+            name='reconciled_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(remove_duplicate_minmax, migrations.RunPython.noop, hints={'model_name': 'minmaxdata'}),
+        migrations.AddConstraint(
+            model_name='minmaxdata',
+            constraint=models.UniqueConstraint(fields=('station', 'date'), name='unique_minmax_station_date'),
+        ),
+    ]
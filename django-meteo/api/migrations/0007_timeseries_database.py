@@ -0,0 +1,62 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:32
+
+import django.db.models.deletion
+from django.db import DEFAULT_DB_ALIAS, connections, migrations, models
+
+
+def copy_timeseries_from_default(apps, schema_editor):
+    """
+    Existing deployments kept their readings in db.sqlite3: copy them into the freshly
+    migrated time-series database. The legacy tables in `default` are left untouched.
+    """
+    target = schema_editor.connection.alias
+    if target == DEFAULT_DB_ALIAS:
+        return
+
+    source = connections[DEFAULT_DB_ALIAS]
+    legacy_tables = source.introspection.table_names()
+    for model_name in ('weatherdata', 'systemstatus', 'minmaxdata'):
+        model = apps.get_model('api', model_name)
+        table = model._meta.db_table
+        if table not in legacy_tables:
+            continue
+
+        with source.cursor() as cursor:
+            legacy_columns = {c.name for c in source.introspection.get_table_description(cursor, table)}
+        fields = [f for f in model._meta.concrete_fields if f.column in legacy_columns]
+        columns = ', '.join(source.ops.quote_name(f.column) for f in fields)
+
+        with source.cursor() as cursor:
+            # Newest first: duplicate (station, date) min/max rows keep their latest upload
+            cursor.execute(f'SELECT {columns} FROM {source.ops.quote_name(table)} ORDER BY id DESC')
+            while rows := cursor.fetchmany(5000):
+                model.objects.using(target).bulk_create(
+                    [model(**{f.attname: value for f, value in zip(fields, row)}) for row in rows],
+                    ignore_conflicts=True,
+                )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_minmax_unique_reconcile'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='minmaxdata',
+            name='station',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='api.station'),
+        ),
+        migrations.AlterField(
+            model_name='systemstatus',
+            name='station',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='api.station'),
+        ),
+        migrations.AlterField(
+            model_name='weatherdata',
+            name='station',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='api.station'),
+        ),
+        migrations.RunPython(copy_timeseries_from_default, migrations.RunPython.noop, hints={'model_name': 'weatherdata'}),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_coverage(apps, schema_editor):
+    """ Fill the coverage bitmaps from the readings already stored """
+    WeatherData = apps.get_model('api', 'WeatherData')
+    DailyCoverage = apps.get_model('api', 'DailyCoverage')
+    db = schema_editor.connection.alias
+
+    bitmaps = {}
+    readings = WeatherData.objects.using(db).values_list('station_id', 'timestamp')
+    for station_id, ts in readings.iterator(chunk_size=5000):
+        key = (station_id, ts.date())
+        bitmaps[key] = bitmaps.get(key, 0) | (1 << (ts.hour * 2 + ts.minute // 30))
+
+    DailyCoverage.objects.using(db).bulk_create(
+        [DailyCoverage(station_id=s, date=d, bitmap=b) for (s, d), b in bitmaps.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_timeseries_database'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCoverage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('bitmap', models.BigIntegerField(default=0)),
+                ('station', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='api.station')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date'], name='api_dailyco_date_533518_idx')],
+                'constraints': [models.UniqueConstraint(fields=('station', 'date'), name='unique_coverage_station_date')],
+            },
+        ),
+        migrations.RunPython(build_coverage, migrations.RunPython.noop, hints={'model_name': 'dailycoverage'}),
+    ]
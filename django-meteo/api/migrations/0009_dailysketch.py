@@ -0,0 +1,54 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:36
+
+import django.db.models.deletion
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def build_sketches(apps, schema_editor):
+    """ Build the daily sketches from the readings already stored """
+    WeatherData = apps.get_model('api', 'WeatherData')
+    DailySketch = apps.get_model('api', 'DailySketch')
+    db = schema_editor.connection.alias
+
+    sketches = {}
+    readings = WeatherData.objects.using(db).values_list('station_id', 'timestamp', 'temperature', 'humidity')
+    for station_id, ts, tmp, hum in readings.iterator(chunk_size=5000):
+        sketch = sketches.setdefault((station_id, ts.date()), (Counter(), Counter()))
+        sketch[0][str(int(round(tmp * 10)))] += 1
+        sketch[1][str(int(round(hum * 10)))] += 1
+
+    DailySketch.objects.using(db).bulk_create(
+        [
+            DailySketch(station_id=s, date=d, count=sum(tmp.values()), temperature=dict(tmp), humidity=dict(hum))
+            for (s, d), (tmp, hum) in sketches.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_dailycoverage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('temperature', models.JSONField(default=dict)),
+                ('humidity', models.JSONField(default=dict)),
+                ('station', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='api.station')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date'], name='api_dailysk_date_5410f4_idx')],
+                'constraints': [models.UniqueConstraint(fields=('station', 'date'), name='unique_sketch_station_date')],
+            },
+        ),
+        migrations.RunPython(build_sketches, migrations.RunPython.noop, hints={'model_name': 'dailysketch'}),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:37
+
+import datetime
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_dailysketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('metric', models.CharField(choices=[('temperature', 'Temperature'), ('humidity', 'Humidity'), ('free_heap', 'Free heap'), ('wifi_strength', 'WiFi strength')], max_length=20)),
+                ('operator', models.CharField(choices=[('above', 'Above'), ('below', 'Below')], max_length=5)),
+                ('threshold', models.FloatField()),
+                ('hysteresis', models.FloatField(default=0.0)),
+                ('min_duration', models.DurationField(default=datetime.timedelta(0))),
+                ('enabled', models.BooleanField(default=True)),
+                ('station', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='api.station')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Alert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('fired_at', models.DateTimeField(blank=True, null=True)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('last_seen', models.DateTimeField()),
+                ('value', models.FloatField()),
+                ('station', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.station')),
+                ('rule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.alertrule')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['station', 'resolved_at'], name='api_alert_station_a3a31c_idx'), models.Index(fields=['fired_at'], name='api_alert_fired_a_10bfbd_idx')],
+            },
+        ),
+    ]
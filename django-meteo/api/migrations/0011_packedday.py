@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_alerts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PackedDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('times', models.BinaryField()),
+                ('temperature', models.BinaryField()),
+                ('humidity', models.BinaryField()),
+                ('station', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='api.station')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('station', 'date'), name='unique_packed_station_date')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_packedday'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StationHealth',
+            fields=[
+                ('station', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='health', serialize=False, to='api.station')),
+                ('last_weather_at', models.DateTimeField(blank=True, null=True)),
+                ('last_reading_at', models.DateTimeField(blank=True, null=True)),
+                ('last_status_at', models.DateTimeField(blank=True, null=True)),
+                ('free_heap', models.IntegerField(blank=True, null=True)),
+                ('wifi_strength', models.IntegerField(blank=True, null=True)),
+                ('sync_failures', models.IntegerField(default=0)),
+                ('last_failure_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_weather_at'], name='api_station_last_we_830aa7_idx'), models.Index(fields=['last_status_at'], name='api_station_last_st_b38b4b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_stationhealth'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stationhealth',
+            name='ingest_ms',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='stationhealth',
+            name='sync_offset',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
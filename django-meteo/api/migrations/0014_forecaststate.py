@@ -0,0 +1,27 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_stationhealth_sync_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_ts', models.DateTimeField()),
+                ('count', models.IntegerField(default=0)),
+                ('state', models.JSONField(default=dict)),
+                ('station', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='api.station')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('station',), name='unique_forecast_station')],
+            },
+        ),
+    ]
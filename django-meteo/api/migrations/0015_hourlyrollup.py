@@ -0,0 +1,83 @@
+# Generated by Django 5.1.6 on 2026-10-19 17:58
+
+import django.db.models.deletion
+from datetime import datetime, time, timedelta, timezone
+
+import numpy as np
+from django.db import migrations, models
+
+
+def build_rollups(apps, schema_editor):
+    """ Fill the hourly rollups from the readings already stored (rows and packed days) """
+    WeatherData = apps.get_model('api', 'WeatherData')
+    PackedDay = apps.get_model('api', 'PackedDay')
+    HourlyRollup = apps.get_model('api', 'HourlyRollup')
+    db = schema_editor.connection.alias
+
+    hours = {}
+
+    def add(station_id, hour, tmp, hum):
+        cell = hours.get((station_id, hour))
+        if cell is None:
+            hours[(station_id, hour)] = [1, tmp, tmp, tmp, hum, hum, hum]
+        else:
+            cell[0] += 1
+            cell[1] += tmp
+            cell[2], cell[3] = min(cell[2], tmp), max(cell[3], tmp)
+            cell[4] += hum
+            cell[5], cell[6] = min(cell[5], hum), max(cell[6], hum)
+
+    readings = WeatherData.objects.using(db).values_list('station_id', 'timestamp', 'temperature', 'humidity')
+    for station_id, ts, tmp, hum in readings.iterator(chunk_size=5000):
+        add(station_id, ts.replace(minute=0, second=0, microsecond=0), tmp, hum)
+
+    days = PackedDay.objects.using(db).values_list('station_id', 'date', 'times', 'temperature', 'humidity')
+    for station_id, day, times, temperature, humidity in days.iterator(chunk_size=100):
+        # Same decoding as api.storage.decode_day
+        seconds = np.cumsum(np.frombuffer(bytes(times), dtype='<i4'), dtype=np.int64)
+        tmp = np.cumsum(np.frombuffer(bytes(temperature), dtype='<i2'), dtype=np.int32) / 10.0
+        hum = np.cumsum(np.frombuffer(bytes(humidity), dtype='<i2'), dtype=np.int32) / 10.0
+        midnight = datetime.combine(day, time.min, tzinfo=timezone.utc)
+        for s, t, h in zip(seconds.tolist(), tmp.tolist(), hum.tolist()):
+            add(station_id, midnight + timedelta(hours=s // 3600), t, h)
+
+    HourlyRollup.objects.using(db).bulk_create(
+        [
+            HourlyRollup(
+                station_id=s, hour=hour, count=c[0],
+                tmp_sum=c[1], tmp_min=c[2], tmp_max=c[3], hum_sum=c[4], hum_min=c[5], hum_max=c[6]
+            )
+            for (s, hour), c in hours.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_forecaststate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HourlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('count', models.IntegerField(default=0)),
+                ('tmp_sum', models.FloatField()),
+                ('tmp_min', models.FloatField()),
+                ('tmp_max', models.FloatField()),
+                ('hum_sum', models.FloatField()),
+                ('hum_min', models.FloatField()),
+                ('hum_max', models.FloatField()),
+                ('station', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='api.station')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hour'], name='api_hourlyr_hour_3acea2_idx')],
+                'constraints': [models.UniqueConstraint(fields=('station', 'hour'), name='unique_rollup_station_hour')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop, hints={'model_name': 'hourlyrollup'}),
+    ]
@@ -0,0 +1,52 @@
+from django.db import DEFAULT_DB_ALIAS, connections, migrations
+
+
+def drop_legacy_timeseries_tables(apps, schema_editor):
+    """
+    Upgraded deployments still have the pre-0007 readings tables in `default`, with their FK
+    constraint on api_station (deleting a station fails) and a second copy of the data.
+    Drop them once every legacy row is found in the time-series database.
+    """
+    target = schema_editor.connection
+    if target.alias == DEFAULT_DB_ALIAS:
+        return
+
+    source = connections[DEFAULT_DB_ALIAS]
+    legacy_tables = source.introspection.table_names()
+    for model_name, key in (('weatherdata', 'id'), ('systemstatus', 'id'), ('minmaxdata', 'station_id, date')):
+        table = apps.get_model('api', model_name)._meta.db_table
+        if table not in legacy_tables:
+            continue
+
+        # 0007 copied rows with their ids (min/max rows deduplicated on station/date): every legacy key
+        # must be present in the copy, newer uploads only add rows
+        quoted = source.ops.quote_name(table)
+        bounds = ', '.join(['%s'] * len(key.split(',')))
+        missing = 0
+        with source.cursor() as legacy, target.cursor() as copied:
+            legacy.execute(f'SELECT {key} FROM {quoted} ORDER BY {key}')
+            while rows := legacy.fetchmany(5000):
+                copied.execute(
+                    f'SELECT {key} FROM {target.ops.quote_name(table)} WHERE ({key}) BETWEEN ({bounds}) AND ({bounds})',
+                    [*rows[0], *rows[-1]],
+                )
+                missing += len(set(map(tuple, rows)) - set(map(tuple, copied.fetchall())))
+        if missing:
+            raise RuntimeError(
+                f'{missing} rows of {table} in the default database are missing from the time-series '
+                f'database: not dropping it (re-run 0007 or copy them by hand)'
+            )
+
+        with source.cursor() as cursor:
+            cursor.execute(f'DROP TABLE {quoted}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_hourlyrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_legacy_timeseries_tables, migrations.RunPython.noop, hints={'model_name': 'weatherdata'}),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.6 on 2026-10-19 18:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_drop_legacy_timeseries_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StationVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('station_ref', models.CharField(max_length=100, unique=True)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
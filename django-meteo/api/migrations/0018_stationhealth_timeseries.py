@@ -0,0 +1,60 @@
+# Generated by Django 5.1.6 on 2026-10-19 18:17
+
+import django.db.models.deletion
+from django.db import DEFAULT_DB_ALIAS, connections, migrations, models
+
+
+def create_missing_table(apps, schema_editor):
+    """ Upgraded deployments created api_stationhealth in `default` (0012 ran before it was routed):
+    create it in the time-series database too, the AlterField below then drops its FK constraint """
+    connection = schema_editor.connection
+    model = apps.get_model('api', 'StationHealth')
+    if connection.alias != DEFAULT_DB_ALIAS and model._meta.db_table not in connection.introspection.table_names():
+        schema_editor.create_model(model)
+
+
+def move_health_rows(apps, schema_editor):
+    """ Copy the health rows kept in `default` into the time-series database, then drop the old table
+    (its FK constraint would block station deletion) """
+    target = schema_editor.connection.alias
+    if target == DEFAULT_DB_ALIAS:
+        return
+
+    model = apps.get_model('api', 'StationHealth')
+    table = model._meta.db_table
+    source = connections[DEFAULT_DB_ALIAS]
+    if table not in source.introspection.table_names():
+        return
+
+    with source.cursor() as cursor:
+        legacy_columns = {c.name for c in source.introspection.get_table_description(cursor, table)}
+    fields = [f for f in model._meta.concrete_fields if f.column in legacy_columns]
+    columns = ', '.join(source.ops.quote_name(f.column) for f in fields)
+    with source.cursor() as cursor:
+        cursor.execute(f'SELECT {columns} FROM {source.ops.quote_name(table)}')
+        rows = [model(**{f.attname: value for f, value in zip(fields, row)}) for row in cursor.fetchall()]
+
+    # Rows already written to the time-series database are newer: keep them
+    model.objects.using(target).bulk_create(rows, ignore_conflicts=True)
+    copied = set(model.objects.using(target).values_list('pk', flat=True))
+    if any(row.pk not in copied for row in rows):
+        raise RuntimeError(f'{table}: rows missing from the time-series database, not dropping it from default')
+    with source.cursor() as cursor:
+        cursor.execute(f'DROP TABLE {source.ops.quote_name(table)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_stationversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_table, migrations.RunPython.noop, hints={'model_name': 'stationhealth'}),
+        migrations.AlterField(
+            model_name='stationhealth',
+            name='station',
+            field=models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='health', serialize=False, to='api.station'),
+        ),
+        migrations.RunPython(move_health_rows, migrations.RunPython.noop, hints={'model_name': 'stationhealth'}),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-19 18:30
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_stationhealth_timeseries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stationversion',
+            name='epoch',
+            field=models.UUIDField(default=uuid.uuid4, editable=False),
+        ),
+    ]
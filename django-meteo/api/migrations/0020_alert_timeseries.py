@@ -0,0 +1,78 @@
+# Generated by Django 5.1.6 on 2026-10-19 18:32
+
+import django.db.models.deletion
+from django.db import DEFAULT_DB_ALIAS, connections, migrations, models
+
+
+def create_missing_table(apps, schema_editor):
+    """ Upgraded deployments created api_alert in `default` (0010 ran before it was routed):
+    create it in the time-series database too, the AlterFields below then drop its FK constraints """
+    connection = schema_editor.connection
+    model = apps.get_model('api', 'Alert')
+    if connection.alias != DEFAULT_DB_ALIAS and model._meta.db_table not in connection.introspection.table_names():
+        schema_editor.create_model(model)
+
+
+def move_alert_rows(apps, schema_editor):
+    """ Copy the alerts kept in `default` into the time-series database, then drop the old table
+    (its FK constraints would block station and rule deletion) """
+    target = schema_editor.connection.alias
+    if target == DEFAULT_DB_ALIAS:
+        return
+
+    model = apps.get_model('api', 'Alert')
+    table = model._meta.db_table
+    source = connections[DEFAULT_DB_ALIAS]
+    if table not in source.introspection.table_names():
+        return
+
+    # Same columns as when 0010 created it: read through the ORM (aware datetimes)
+    rows = list(model.objects.using(DEFAULT_DB_ALIAS).all())
+    for row in rows:
+        row._state.adding, row._state.db = True, target
+    model.objects.using(target).bulk_create(rows, ignore_conflicts=True)
+    copied = set(model.objects.using(target).values_list('pk', flat=True))
+    if any(row.pk not in copied for row in rows):
+        raise RuntimeError(f'{table}: rows missing from the time-series database, not dropping it from default')
+    with source.cursor() as cursor:
+        cursor.execute(f'DROP TABLE {source.ops.quote_name(table)}')
+
+
+def resolve_duplicate_open_alerts(apps, schema_editor):
+    """ Concurrent uploads could open two alerts for one rule and station: keep the newest open,
+    resolve the others at their last reading, so the unique constraint below can be added """
+    model = apps.get_model('api', 'Alert')
+    alias = schema_editor.connection.alias
+    seen = set()
+    for alert in model.objects.using(alias).filter(resolved_at__isnull=True).order_by('-started_at', '-pk'):
+        key = (alert.rule_id, alert.station_id)
+        if key in seen:
+            model.objects.using(alias).filter(pk=alert.pk).update(resolved_at=alert.last_seen)
+        seen.add(key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_stationversion_epoch'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_table, migrations.RunPython.noop, hints={'model_name': 'alert'}),
+        migrations.AlterField(
+            model_name='alert',
+            name='rule',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='api.alertrule'),
+        ),
+        migrations.AlterField(
+            model_name='alert',
+            name='station',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='api.station'),
+        ),
+        migrations.RunPython(move_alert_rows, migrations.RunPython.noop, hints={'model_name': 'alert'}),
+        migrations.RunPython(resolve_duplicate_open_alerts, migrations.RunPython.noop, hints={'model_name': 'alert'}),
+        migrations.AddConstraint(
+            model_name='alert',
+            constraint=models.UniqueConstraint(condition=models.Q(('resolved_at__isnull', True)), fields=('rule', 'station'), name='unique_open_alert'),
+        ),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models 
+import uuid
+from datetime import timedelta
   
 
 from django.db import models
@@ -17,35 +18,253 @@ class Station(models.Model):
 
 class WeatherData(models.Model):
     """ Stores temperature & humidity readings for each station, referencing internal ID """
-    station = models.ForeignKey(Station, on_delete=models.CASCADE)  # Internal ID reference
+    # Internal ID reference. Station lives in another database: no DB constraint, cascade done in api.signals
+    station = models.ForeignKey(Station, on_delete=models.DO_NOTHING, db_constraint=False)
     timestamp = models.DateTimeField()
     temperature = models.FloatField()
     humidity = models.FloatField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["station", "timestamp"]),  # Per-station range & latest lookups
+            models.Index(fields=["timestamp"]),  # Admin date_hierarchy
+        ]
+
     def __str__(self):
         return f"{self.timestamp} - {self.station.station_ref}: {self.temperature}°C, {self.humidity}%"
 
 
 class SystemStatus(models.Model):
     """ Stores system status for ESP32 stations, referencing internal ID """
-    station = models.ForeignKey(Station, on_delete=models.CASCADE)  # Internal ID reference
+    # Internal ID reference. Station lives in another database: no DB constraint, cascade done in api.signals
+    station = models.ForeignKey(Station, on_delete=models.DO_NOTHING, db_constraint=False)
     timestamp = models.DateTimeField(auto_now_add=True)
     uptime_ms = models.BigIntegerField()
     free_heap = models.IntegerField()
     wifi_strength = models.IntegerField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["station", "timestamp"]),
+            models.Index(fields=["timestamp"]),
+        ]
+
     def __str__(self):
         return f"{self.timestamp} - {self.station.station_ref} Status"
 
 
 class MinMaxData(models.Model):
     """ Stores min/max temperature & humidity per day for each station, referencing internal ID """
-    station = models.ForeignKey(Station, on_delete=models.CASCADE)  # Internal ID reference
+    # Internal ID reference. Station lives in another database: no DB constraint, cascade done in api.signals
+    station = models.ForeignKey(Station, on_delete=models.DO_NOTHING, db_constraint=False)
     date = models.DateField()  # One entry per day per station
     min_temperature = models.FloatField()
     max_temperature = models.FloatField()
     min_humidity = models.FloatField()
     max_humidity = models.FloatField()
+    mismatch = models.BooleanField(default=False)  # Device extremes disagree with WeatherData readings
+    reconciled_at = models.DateTimeField(blank=True, null=True)  # Last reconciliation against WeatherData
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["station", "date"], name="unique_minmax_station_date"),
+        ]
+        indexes = [
+            models.Index(fields=["date"]),
+        ]
 
     def __str__(self):
         return f"{self.date} - {self.station.station_ref}: Min {self.min_temperature}°C, Max {self.max_temperature}°C"
+
+
+class DailyCoverage(models.Model):
+    """ Which 30-minute slots of a day have at least one WeatherData reading, for each station.
+    Bit i of `bitmap` is the slot starting at 00:00 + i * 30 min (UTC), maintained at ingest. """
+    station = models.ForeignKey(Station, on_delete=models.DO_NOTHING, db_constraint=False)
+    date = models.DateField()
+    bitmap = models.BigIntegerField(default=0)  # 48 bits used
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["station", "date"], name="unique_coverage_station_date"),
+        ]
+        indexes = [
+            models.Index(fields=["date"]),  # Fleet report over a date range
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.station.station_ref}: {self.bitmap.bit_count()}/48 slots"
+
+
+class DailySketch(models.Model):
+    """ Mergeable quantile sketch of one station-day: readings are stored with 0.1 resolution, so a sparse
+    histogram {value in tenths: count} is exact, and merging days or stations is adding counts. """
+    station = models.ForeignKey(Station, on_delete=models.DO_NOTHING, db_constraint=False)
+    date = models.DateField()
+    count = models.IntegerField(default=0)
+    temperature = models.JSONField(default=dict)
+    humidity = models.JSONField(default=dict)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["station", "date"], name="unique_sketch_station_date"),
+        ]
+        indexes = [
+            models.Index(fields=["date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.station.station_ref}: {self.count} readings"
+
+
+class AlertRule(models.Model):
+    """ Threshold on a reading metric, for one station or (station empty) the whole fleet """
+    METRIC_CHOICES = [
+        ("temperature", "Temperature"),
+        ("humidity", "Humidity"),
+        ("free_heap", "Free heap"),
+        ("wifi_strength", "WiFi strength"),
+    ]
+    OPERATOR_CHOICES = [("above", "Above"), ("below", "Below")]
+
+    name = models.CharField(max_length=255)
+    station = models.ForeignKey(Station, on_delete=models.CASCADE, blank=True, null=True)  # Empty = fleet scope
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    operator = models.CharField(max_length=5, choices=OPERATOR_CHOICES)
+    threshold = models.FloatField()
+    hysteresis = models.FloatField(default=0.0)  # Value must come back past threshold ∓ hysteresis to resolve
+    min_duration = models.DurationField(default=timedelta(0))  # Condition must hold this long before firing
+    enabled = models.BooleanField(default=True)
+
+    def __str__(self):
+        scope = self.station.station_ref if self.station_id else "fleet"
+        return f"{self.name} ({scope}): {self.metric} {self.operator} {self.threshold}"
+
+
+class Alert(models.Model):
+    """ One occurrence of an AlertRule on a station: pending until min_duration elapsed, then fired, then resolved """
+    # Written at ingest: lives in the time-series database, cascades (rule, station) done in api.signals
+    rule = models.ForeignKey(AlertRule, on_delete=models.DO_NOTHING, db_constraint=False)
+    station = models.ForeignKey(Station, on_delete=models.DO_NOTHING, db_constraint=False)
+    started_at = models.DateTimeField()  # First reading meeting the condition
+    fired_at = models.DateTimeField(blank=True, null=True)  # Empty while pending
+    resolved_at = models.DateTimeField(blank=True, null=True)  # Empty while open
+    last_seen = models.DateTimeField()  # Timestamp of the last reading evaluated
+    value = models.FloatField()  # Peak value while open
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["station", "resolved_at"]),  # Open alerts of a station
+            models.Index(fields=["fired_at"]),
+        ]
+        constraints = [
+            # At most one open (pending or fired) alert per rule and station, even with concurrent uploads
+            models.UniqueConstraint(
+                fields=["rule", "station"], condition=models.Q(resolved_at__isnull=True), name="unique_open_alert"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.rule.name} - {self.station.station_ref} since {self.started_at}"
+
+
+class PackedDay(models.Model):
+    """ All readings of one station-day in a single row (alternative to row-per-sample WeatherData).
+    Arrays are little-endian and delta-encoded: `times` int32 seconds of day, `temperature` / `humidity`
+    int16 tenths (int32 for a day with a jump beyond int16). See api.storage. """
+    station = models.ForeignKey(Station, on_delete=models.DO_NOTHING, db_constraint=False)
+    date = models.DateField()
+    count = models.IntegerField(default=0)
+    times = models.BinaryField()
+    temperature = models.BinaryField()
+    humidity = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["station", "date"], name="unique_packed_station_date"),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.station.station_ref}: {self.count} packed readings"
+
+
+class StationHealth(models.Model):
+    """ Denormalised liveness of a station, updated by the upload views so monitoring never scans readings """
+    # Written by every upload: lives in the time-series database, cascade done in api.signals
+    station = models.OneToOneField(
+        Station, on_delete=models.DO_NOTHING, db_constraint=False, primary_key=True, related_name="health"
+    )
+    last_weather_at = models.DateTimeField(blank=True, null=True)  # Server time of the last accepted weather upload
+    last_reading_at = models.DateTimeField(blank=True, null=True)  # Newest reading timestamp received
+    last_status_at = models.DateTimeField(blank=True, null=True)  # Server time of the last accepted status upload
+    free_heap = models.IntegerField(blank=True, null=True)
+    wifi_strength = models.IntegerField(blank=True, null=True)
+    sync_failures = models.IntegerField(default=0)  # Rejected uploads since the last accepted one
+    last_failure_at = models.DateTimeField(blank=True, null=True)
+    sync_offset = models.IntegerField(blank=True, null=True)  # Assigned sync time, seconds into the period (api.schedule)
+    ingest_ms = models.FloatField(blank=True, null=True)  # Moving average of weather upload processing time
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["last_weather_at"]),
+            models.Index(fields=["last_status_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.station.station_ref} health - last seen {self.last_weather_at}"
+
+
+class ForecastState(models.Model):
+    """ Incremental Holt-Winters state of a station (see api.forecast), updated at ingest """
+    # Internal ID reference. Station lives in another database: no DB constraint, cascade done in api.signals
+    station = models.ForeignKey(Station, on_delete=models.DO_NOTHING, db_constraint=False)
+    last_ts = models.DateTimeField()  # Newest reading folded into the state
+    count = models.IntegerField(default=0)  # Readings folded in
+    state = models.JSONField(default=dict)  # {"tmp": {level, trend, season[24], err}, "hum": {...}}
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["station"], name="unique_forecast_station"),
+        ]
+
+    def __str__(self):
+        return f"{self.station.station_ref} forecast state at {self.last_ts}"
+
+
+class HourlyRollup(models.Model):
+    """ Count, sum, min and max of one station-hour (UTC), recomputed from the stored readings at ingest
+    (see api.rollups): fleet aggregates read these rows, never the readings. """
+    # Internal ID reference. Station lives in another database: no DB constraint, cascade done in api.signals
+    station = models.ForeignKey(Station, on_delete=models.DO_NOTHING, db_constraint=False)
+    hour = models.DateTimeField()  # Start of the hour
+    count = models.IntegerField(default=0)
+    tmp_sum = models.FloatField()
+    tmp_min = models.FloatField()
+    tmp_max = models.FloatField()
+    hum_sum = models.FloatField()
+    hum_min = models.FloatField()
+    hum_max = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["station", "hour"], name="unique_rollup_station_hour"),
+        ]
+        indexes = [
+            models.Index(fields=["hour"]),  # Fleet aggregates over a time range
+        ]
+
+    def __str__(self):
+        return f"{self.hour} - {self.station.station_ref}: {self.count} readings"
+
+
+class StationVersion(models.Model):
+    """ Counter bumped whenever the readings of a station change (see api.response_cache): cached responses
+    carry the version they were built from. Kept by reference, so a deleted station's version survives.
+    `epoch` is drawn when the row is created: a counter restarting after a flush or a database reset
+    does not match responses cached under the previous row. """
+    station_ref = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField(default=0)
+    epoch = models.UUIDField(default=uuid.uuid4, editable=False)
+
+    def __str__(self):
+        return f"{self.station_ref} v{self.version}"
@@ -0,0 +1,123 @@
+"""
+Opt-in per-request profiling for production diagnosis.
+
+A request is profiled when it is sampled (settings.PROFILING_SAMPLE_RATE) or carries a valid
+signed `X-Meteo-Profile` header (token from `manage.py show_profiles --token`). Its cProfile
+stats and the timing of every SQL query, on all databases, are written to PROFILING_DIR:
+`<name>.prof` (readable by pstats / snakeviz) and `<name>.json` (request, status, SQL).
+Only the newest PROFILING_KEEP profiles are kept. Unprofiled requests cost one comparison.
+"""
+
+import cProfile
+import itertools
+import json
+import os
+import random
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.utils.timezone import now
+
+
+HEADER = "HTTP_X_METEO_PROFILE"
+SIGNING_SALT = "api.profiling"
+TOKEN_VALUE = "profile"
+
+_sequence = itertools.count()
+
+
+def make_token():
+    """ Signed value for the X-Meteo-Profile header, valid PROFILING_TOKEN_MAX_AGE seconds """
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign(TOKEN_VALUE)
+
+
+def valid_token(token):
+    try:
+        value = signing.TimestampSigner(salt=SIGNING_SALT).unsign(token, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return value == TOKEN_VALUE
+
+
+def profile_dir():
+    return Path(settings.PROFILING_DIR)
+
+
+class QueryTimer:
+    """ Connection execute wrapper recording (database, sql, seconds) of every query """
+
+    def __init__(self):
+        self.queries = []
+
+    def wrapper(self, alias):
+        def execute(run, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return run(sql, params, many, context)
+            finally:
+                self.queries.append((alias, sql, time.perf_counter() - started))
+        return execute
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def should_profile(self, request):
+        rate = settings.PROFILING_SAMPLE_RATE
+        if rate and random.random() < rate:
+            return True
+        token = request.META.get(HEADER)
+        return bool(token) and valid_token(token)
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        timer = QueryTimer()
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timer.wrapper(alias)))
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        elapsed = time.perf_counter() - started
+
+        save_profile(request, response, profiler, timer.queries, elapsed)
+        return response
+
+
+def save_profile(request, response, profiler, queries, elapsed):
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    view = request.resolver_match.view_name if request.resolver_match else "unresolved"
+    name = f"{now().strftime('%Y%m%d%H%M%S')}-{os.getpid()}-{next(_sequence)}-{view.replace(':', '.')}"
+
+    profiler.dump_stats(directory / f"{name}.prof")
+    meta = {
+        "method": request.method,
+        "path": request.get_full_path(),
+        "view": view,
+        "status": response.status_code,
+        "ms": round(elapsed * 1000, 1),
+        "sql_ms": round(sum(q[2] for q in queries) * 1000, 1),
+        "sql": [{"db": alias, "ms": round(seconds * 1000, 2), "sql": sql} for alias, sql, seconds in queries],
+    }
+    (directory / f"{name}.json").write_text(json.dumps(meta))
+    rotate(directory, settings.PROFILING_KEEP)
+
+
+def rotate(directory, keep):
+    """ Delete all but the newest `keep` profiles """
+    metas = sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for meta in metas[keep:]:
+        meta.with_suffix(".prof").unlink(missing_ok=True)
+        meta.unlink(missing_ok=True)
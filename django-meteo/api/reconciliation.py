@@ -0,0 +1,56 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils.timezone import make_aware, now
+
+from .models import MinMaxData
+from .storage import get_storage, daily_extremes
+
+
+def _tolerance():
+    return getattr(settings, "MINMAX_RECONCILE_TOLERANCE", 0.5)
+
+
+def server_extremes(station, dates):
+    """ Return {date: (tmin, tmax, hmin, hmax)} computed from the stored readings of those days """
+    if not dates:
+        return {}
+
+    start = make_aware(datetime.combine(min(dates), time.min))
+    end = make_aware(datetime.combine(max(dates) + timedelta(days=1), time.min))
+    days, tmin, tmax, hmin, hmax = daily_extremes(*get_storage().read(station, start, end))
+
+    wanted = set(dates)
+    extremes = {}
+    for day, values in zip(days.tolist(), zip(tmin.tolist(), tmax.tolist(), hmin.tolist(), hmax.tolist())):
+        day = datetime.fromtimestamp(day, dt_timezone.utc).date()
+        if day in wanted:
+            extremes[day] = values
+    return extremes
+
+
+def reconcile_minmax(station, dates):
+    """
+    Compare the device-reported MinMaxData of `station` for the touched `dates` with the
+    extremes derived from the stored readings and flag the days that disagree.
+    Days without raw readings are left untouched. Returns the number of mismatching days.
+    """
+    dates = set(dates)
+    if not dates:
+        return 0
+
+    extremes = server_extremes(station, dates)
+    if not extremes:
+        return 0
+
+    tolerance = _tolerance()
+    checked_at = now()
+    updated = []
+    for minmax in MinMaxData.objects.filter(station=station, date__in=list(extremes)):
+        reported = (minmax.min_temperature, minmax.max_temperature, minmax.min_humidity, minmax.max_humidity)
+        minmax.mismatch = any(abs(dev - srv) > tolerance for dev, srv in zip(reported, extremes[minmax.date]))
+        minmax.reconciled_at = checked_at
+        updated.append(minmax)
+
+    MinMaxData.objects.bulk_update(updated, ["mismatch", "reconciled_at"])
+    return sum(1 for m in updated if m.mismatch)
@@ -0,0 +1,185 @@
+"""
+Full-response cache of per-station read endpoints (history, min/max history).
+
+Keys are (view, station_ref, query string, extra, station version). The version is a StationVersion
+row in the time-series database, bumped by ingest (an atomic UPDATE): every worker, ingest or read,
+sees the same counter, invalidation is O(1) and entries of older versions are never read again,
+they age out of the bounded LRU below. The row's random epoch is part of the version, so a counter
+restarting from scratch (flush, database reset) never matches responses cached before.
+Bodies live in a per-process LRU limited by RESPONSE_CACHE_MAX_ENTRIES and RESPONSE_CACHE_MAX_BYTES.
+
+On a miss, concurrent identical requests of one worker are coalesced (single flight): the first
+computes the response, the others wait for it and share its body instead of querying the database.
+"""
+
+import threading
+from collections import Counter, OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.db.models import F
+from django.http import HttpResponse
+
+from .models import StationVersion
+
+
+def station_version(station_ref):
+    """ (epoch, counter) of a station, (None, 0) before its first bump """
+    return StationVersion.objects.filter(station_ref=station_ref).values_list("epoch", "version").first() or (None, 0)
+
+
+def bump_station_version(station_ref):
+    """ Invalidate every cached response of a station, in all workers """
+    versions = StationVersion.objects.filter(station_ref=station_ref)
+    if not versions.update(version=F("version") + 1):
+        StationVersion.objects.bulk_create([StationVersion(station_ref=station_ref)], ignore_conflicts=True)
+        versions.update(version=F("version") + 1)
+
+
+class LRUCache:
+    """ Thread-safe LRU of (status, content type, body) bounded by entry count and total body size """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        size = len(entry[2])
+        max_bytes = settings.RESPONSE_CACHE_MAX_BYTES
+        if size > max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[2])
+            self._entries[key] = entry
+            self._bytes += size
+            while len(self._entries) > settings.RESPONSE_CACHE_MAX_ENTRIES or self._bytes > max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[2])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        return self._bytes
+
+
+class SingleFlight:
+    """ Run at most one computation per key at a time; concurrent callers of that key share its result """
+
+    class Flight:
+        def __init__(self):
+            self.done = threading.Event()
+            self.waiters = 0
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, compute):
+        """ Return (result, shared): shared is True when another caller's computation was reused """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = self.Flight()
+            else:
+                flight.waiters += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = compute()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    def waiting(self, key):
+        with self._lock:
+            flight = self._flights.get(key)
+            return flight.waiters if flight else 0
+
+
+responses = LRUCache()
+flights = SingleFlight()
+
+stats = Counter()  # hits, misses (computed), coalesced (shared an in-flight computation)
+_stats_lock = threading.Lock()
+
+
+def _count(outcome):
+    with _stats_lock:
+        stats[outcome] += 1
+
+
+def snapshot():
+    """ Counters and LRU occupancy of this worker """
+    with _stats_lock:
+        counters = {outcome: stats[outcome] for outcome in ("hits", "misses", "coalesced")}
+    return {**counters, "entries": len(responses), "bytes": responses.size}
+
+
+def _respond(entry, outcome):
+    status, content_type, body = entry
+    response = HttpResponse(body, status=status, content_type=content_type)
+    response["X-Cache"] = outcome
+    return response
+
+
+def cached_station_response(extra=lambda request: ()):
+    """
+    Cache successful GET responses of a `view(request, station_ref)`.
+    `extra(request)` adds key parts the response depends on (e.g. the current date),
+    or returns None when the response must not be cached.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, station_ref):
+            parts = extra(request) if request.method == "GET" else None
+            if parts is None:
+                return view(request, station_ref)
+
+            key = (view.__name__, station_ref, request.GET.urlencode(), parts, station_version(station_ref))
+            entry = responses.get(key)
+            if entry is not None:
+                _count("hits")
+                return _respond(entry, "hit")
+
+            def compute():
+                response = view(request, station_ref)
+                entry = (response.status_code, response["Content-Type"], response.content)
+                if response.status_code == 200 and not response.content.startswith(b'{"error"'):
+                    responses.set(key, entry)
+                return entry
+
+            entry, shared = flights.do(key, compute)
+            _count("coalesced" if shared else "misses")
+            return _respond(entry, "coalesced" if shared else "miss")
+        return wrapper
+    return decorator
@@ -0,0 +1,176 @@
+"""
+Hourly per-station rollups and the fleet-wide aggregates built on them.
+
+At ingest, every hour touched by an upload is recomputed from the stored readings (so a
+resent reading is counted the way the storage backend keeps it) into one HourlyRollup row:
+count, sum, min and max of temperature and humidity. Fleet aggregates then read the
+rollups of a time range in one query and merge them per (group, bucket) with NumPy;
+a cross-station correlation matrix of the bucket means comes from the same arrays.
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+from django.db import transaction
+from django.utils.timezone import is_naive, make_aware
+
+from .analytics import SECONDS_PER_DAY
+from .models import HourlyRollup
+from .storage import get_storage
+
+
+BUCKETS = {"1h": 3600, "3h": 3 * 3600, "6h": 6 * 3600, "12h": 12 * 3600, "1d": SECONDS_PER_DAY}
+METRICS = ("tmp", "hum")
+MIN_OVERLAP = 3  # Buckets two stations must share for a correlation coefficient
+MAX_READ_GAP_HOURS = 24  # Untouched hours read anyway to keep touched hours in one storage read
+
+
+def _epoch(ts):
+    return (make_aware(ts) if is_naive(ts) else ts).timestamp()
+
+
+def _datetime(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc)
+
+
+def combine(cell, n_cells, counts, sums, lows, highs):
+    """ Merge partial aggregates into `n_cells` cells -> (count, sum, min, max) arrays; min/max are ±inf
+    in empty cells. Raw readings are partials with count 1 and sum = min = max = value. """
+    total = np.bincount(cell, weights=counts, minlength=n_cells)
+    total_sum = np.bincount(cell, weights=sums, minlength=n_cells)
+    low = np.full(n_cells, np.inf)
+    high = np.full(n_cells, -np.inf)
+    np.minimum.at(low, cell, lows)
+    np.maximum.at(high, cell, highs)
+    return total, total_sum, low, high
+
+
+def touched_spans(hours, max_gap=MAX_READ_GAP_HOURS):
+    """ Split sorted hour numbers into (first, last) spans, cut where more than `max_gap` hours are untouched """
+    hours = np.asarray(hours, dtype=np.int64)
+    cuts = np.flatnonzero(np.diff(hours) > max_gap + 1) + 1
+    return [(int(span[0]), int(span[-1])) for span in np.split(hours, cuts)]
+
+
+def record_rollups(station, entries):
+    """ Recompute the rollups of the hours touched by newly ingested WeatherData entries. Storage is read
+    per span of touched hours: a reading resent from months ago does not read the months in between. """
+    touched = sorted({int(_epoch(entry.timestamp) // 3600) for entry in entries})
+    if not touched:
+        return
+
+    storage = get_storage()
+    touched_set = set(touched)
+    rows = []
+    for first_hour, last_hour in touched_spans(touched):
+        first = first_hour * 3600
+        ts, tmp, hum = storage.read(station, _datetime(first), _datetime((last_hour + 1) * 3600))
+        n_hours = last_hour - first_hour + 1
+        cell = ((ts - first) // 3600).astype(np.int64)
+        ones = np.ones(len(ts))
+        count, tmp_sum, tmp_min, tmp_max = combine(cell, n_hours, ones, tmp, tmp, tmp)
+        _, hum_sum, hum_min, hum_max = combine(cell, n_hours, ones, hum, hum, hum)
+
+        for i in range(n_hours):
+            if count[i] and first_hour + i in touched_set:
+                rows.append(HourlyRollup(
+                    station_id=station.pk, hour=_datetime((first_hour + i) * 3600), count=int(count[i]),
+                    tmp_sum=float(tmp_sum[i]), tmp_min=float(tmp_min[i]), tmp_max=float(tmp_max[i]),
+                    hum_sum=float(hum_sum[i]), hum_min=float(hum_min[i]), hum_max=float(hum_max[i]),
+                ))
+
+    with transaction.atomic(using=HourlyRollup.objects.db):
+        HourlyRollup.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["station", "hour"],
+            update_fields=["count", "tmp_sum", "tmp_min", "tmp_max", "hum_sum", "hum_min", "hum_max"],
+        )
+
+
+def load_rollups(start, end):
+    """ Rollups of [start, end) as arrays: station ids, hour epochs, counts and {metric: (sum, min, max)} """
+    rows = list(
+        HourlyRollup.objects.filter(hour__gte=start, hour__lt=end).values_list(
+            "station_id", "hour", "count", "tmp_sum", "tmp_min", "tmp_max", "hum_sum", "hum_min", "hum_max"
+        )
+    )
+    if not rows:
+        empty = np.empty(0)
+        return np.empty(0, dtype=np.int64), empty, empty, {metric: (empty, empty, empty) for metric in METRICS}
+
+    columns = list(zip(*rows))
+    station_ids = np.array(columns[0], dtype=np.int64)
+    hours = np.array([hour.timestamp() for hour in columns[1]])
+    counts = np.array(columns[2], dtype=np.float64)
+    values = {
+        metric: tuple(np.array(columns[3 + 3 * m + k], dtype=np.float64) for k in range(3))
+        for m, metric in enumerate(METRICS)
+    }
+    return station_ids, hours, counts, values
+
+
+def aggregate(groups, buckets, counts, values, n_groups, n_buckets):
+    """ Merge rollup rows by (group index, bucket index) -> counts (n_groups, n_buckets) and
+    {metric: (mean, min, max)} of the same shape, NaN where a cell has no reading """
+    cell = groups * n_buckets + buckets
+    size = n_groups * n_buckets
+    result = {}
+    for metric, (sums, lows, highs) in values.items():
+        total, total_sum, low, high = combine(cell, size, counts, sums, lows, highs)
+        empty = total == 0
+        with np.errstate(invalid="ignore"):
+            mean = np.where(empty, np.nan, total_sum / np.maximum(total, 1))
+        low[empty] = np.nan
+        high[empty] = np.nan
+        result[metric] = tuple(a.reshape(n_groups, n_buckets) for a in (mean, low, high))
+    return total.reshape(n_groups, n_buckets), result
+
+
+def correlation(matrix, min_overlap=MIN_OVERLAP):
+    """ Pairwise Pearson correlation of the rows of `matrix` (NaN = missing) over the columns both rows have,
+    all pairs at once through masked matrix products. NaN where the overlap or a variance is too small. """
+    mask = ~np.isnan(matrix)
+    m = mask.astype(np.float64)
+    x = np.where(mask, matrix, 0.0)
+    x = np.where(mask, x - (x.sum(axis=1) / np.maximum(m.sum(axis=1), 1))[:, None], 0.0)  # Centred: no cancellation below
+
+    n = m @ m.T  # Shared columns of each pair
+    sum_x = x @ m.T  # Σ x_i over the columns shared with j
+    sum_xx = (x * x) @ m.T
+    sum_xy = x @ x.T
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sum_xy - sum_x * sum_x.T / n
+        var_x = sum_xx - sum_x ** 2 / n
+        var_y = var_x.T
+        r = cov / np.sqrt(var_x * var_y)
+    # Constant rows over the overlap give 0 / 0; rounding noise can push |r| slightly above 1
+    r[(n < min_overlap) | (var_x <= 1e-9) | (var_y <= 1e-9)] = np.nan
+    return np.clip(r, -1.0, 1.0)
+
+
+def fleet_aggregate(origin, step, n_buckets, station_groups, n_groups, corr_metric):
+    """ Aggregates of the buckets [origin + i * step) for stations {station_id: group index} (others ignored).
+    Returns (counts, {metric: (mean, min, max)}) per (group, bucket), the ids of the stations with data
+    and the correlation matrix of their `corr_metric` bucket means, in `station_groups` order. """
+    station_ids, hours, counts, values = load_rollups(_datetime(origin), _datetime(origin + n_buckets * step))
+    order = np.fromiter(station_groups, dtype=np.int64, count=len(station_groups))
+    group_of = np.fromiter(station_groups.values(), dtype=np.int64, count=len(station_groups))
+
+    # Position of each row's station in `order` (rows of unknown stations dropped)
+    sorter = np.argsort(order)
+    found = np.searchsorted(order, station_ids, sorter=sorter)
+    found = np.minimum(found, max(len(order) - 1, 0))
+    known = (order[sorter[found]] == station_ids) if len(order) else np.zeros(len(station_ids), dtype=bool)
+    position = sorter[found[known]]
+    buckets = ((hours[known] - origin) // step).astype(np.int64)
+    counts = counts[known]
+    values = {metric: tuple(a[known] for a in arrays) for metric, arrays in values.items()}
+
+    group_counts, stats = aggregate(group_of[position], buckets, counts, values, n_groups, n_buckets)
+
+    present = np.unique(position)  # Sorted positions = `station_groups` order
+    _, by_station = aggregate(
+        np.searchsorted(present, position), buckets, counts, {corr_metric: values[corr_metric]}, len(present), n_buckets
+    )
+    return group_counts, stats, order[present].tolist(), correlation(by_station[corr_metric][0])
@@ -0,0 +1,104 @@
+"""
+Server-assigned sync schedule: spreads the hourly syncs of the fleet over the period.
+
+The period (settings.SYNC_PERIOD) is split in slots of SYNC_SLOT_SECONDS. A slot's load is the
+sum of the ingest cost (moving average of upload processing time, StationHealth.ingest_ms) of
+the stations assigned to it. A station takes the least loaded slot once, when it is created, in
+the middle of the largest run of such slots so an empty hour fills evenly. Assignments hold the
+write lock of the time-series database, so two stations never pick a slot from the same loads.
+`/api/lastupdate/` only reads the assigned offset. `manage.py rebalance_sync_schedule` moves a
+station when another slot is lighter by more than its own cost, so the schedule follows the load.
+"""
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils.timezone import now
+
+from .health import set_sync_offset
+from .models import StationHealth
+
+
+def slot_loads(offsets, costs, n_slots, slot_seconds):
+    loads = np.zeros(n_slots)
+    np.add.at(loads, (np.asarray(offsets, dtype=np.int64) // slot_seconds) % n_slots, costs)
+    return loads
+
+
+def best_slot(loads):
+    """ A least loaded slot: the middle of the longest circular run of them """
+    n = len(loads)
+    busy = np.flatnonzero(loads > loads.min())
+    if not len(busy):
+        return 0
+    # Gap after each busy slot up to the next one (circular)
+    gaps = np.diff(np.append(busy, busy[0] + n))
+    i = int(np.argmax(gaps))
+    return int((busy[i] + (gaps[i] + 1) // 2) % n)
+
+
+def choose_slot(loads, current, own_cost):
+    """ Slot for a station currently in `current` (None if unassigned); `loads` exclude the station """
+    best = best_slot(loads)
+    if current is None or loads[current] > loads[best] + own_cost:
+        return best
+    return current
+
+
+def _assignments():
+    """ (station ids, offsets, costs) of the assigned stations, rows locked. Costs are in whole
+    microseconds so loads stay exact as stations are moved from one slot to another. """
+    rows = StationHealth.objects.select_for_update().exclude(sync_offset=None)
+    station_ids, offsets, costs = [], [], []
+    for station_id, offset, ingest_ms in rows.values_list("station_id", "sync_offset", "ingest_ms"):
+        station_ids.append(station_id)
+        offsets.append(offset)
+        costs.append(ingest_ms if ingest_ms is not None else settings.SYNC_DEFAULT_COST_MS)
+    return station_ids, np.array(offsets, dtype=np.int64), np.rint(np.array(costs, dtype=float) * 1000)
+
+
+def assign_slot(station):
+    """ Give `station` the least loaded slot; returns its offset in seconds into the period """
+    slot_seconds = settings.SYNC_SLOT_SECONDS
+    with transaction.atomic(using=StationHealth.objects.db):
+        # Writing the station's row first takes the database write lock (SQLite) before the loads are
+        # read, serializing concurrent assignments; select_for_update() locks the rows elsewhere
+        StationHealth.objects.bulk_create([StationHealth(station_id=station.pk)], ignore_conflicts=True)
+        station_ids, offsets, costs = _assignments()
+        others = np.array([station_id != station.pk for station_id in station_ids], dtype=bool)
+        loads = slot_loads(offsets[others], costs[others], settings.SYNC_PERIOD // slot_seconds, slot_seconds)
+        offset = best_slot(loads) * slot_seconds
+        set_sync_offset(station, offset)
+    return offset
+
+
+def rebalance():
+    """ Move each station whose slot is heavier than the lightest one by more than its own cost.
+    Loads are read once and updated as stations move; returns the number of stations moved. """
+    slot_seconds = settings.SYNC_SLOT_SECONDS
+    n_slots = settings.SYNC_PERIOD // slot_seconds
+    with transaction.atomic(using=StationHealth.objects.db):
+        station_ids, offsets, costs = _assignments()
+        loads = slot_loads(offsets, costs, n_slots, slot_seconds)
+        moved = []
+        for station_id, offset, cost in zip(station_ids, offsets.tolist(), costs.tolist()):
+            current = offset // slot_seconds % n_slots
+            loads[current] -= cost
+            slot = choose_slot(loads, current, cost)
+            loads[slot] += cost
+            if slot * slot_seconds != offset:
+                moved.append(StationHealth(station_id=station_id, sync_offset=slot * slot_seconds))
+        StationHealth.objects.bulk_update(moved, ["sync_offset"])
+    return len(moved)
+
+
+def sync_schedule(station):
+    """ (offset in seconds into the period, seconds until the next sync) of `station`: one read of its
+    health row, the slot is only assigned here for stations created before scheduling existed """
+    offset = StationHealth.objects.filter(station=station).values_list("sync_offset", flat=True).first()
+    if offset is None:
+        offset = assign_slot(station)
+
+    period = settings.SYNC_PERIOD
+    wait = (offset - int(now().timestamp())) % period
+    return offset, wait or period
@@ -0,0 +1,42 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .alerts import rule_index
+from .response_cache import bump_station_version
+from .models import Station, WeatherData, SystemStatus, MinMaxData, DailyCoverage, DailySketch, AlertRule, Alert, PackedDay, ForecastState, HourlyRollup, StationHealth
+
+
+@receiver(post_delete, sender=Station)
+def delete_station_timeseries(sender, instance, **kwargs):
+    """ Cascade a station deletion to its readings, which may live in the time-series database """
+    for model in (WeatherData, SystemStatus, MinMaxData, DailyCoverage, DailySketch, PackedDay, ForecastState, HourlyRollup, StationHealth, Alert):
+        model.objects.filter(station_id=instance.pk).delete()
+    bump_station_version(instance.station_ref)
+
+
+@receiver(post_save, sender=Station)
+def invalidate_station_responses(sender, instance, created, **kwargs):
+    """ A station (re)created under a reference must not see responses cached for an earlier one """
+    if created:
+        bump_station_version(instance.station_ref)
+
+
+@receiver(post_save, sender=Station)
+def assign_sync_slot(sender, instance, created, **kwargs):
+    """ A new station gets its sync slot once, here, rather than from its lastupdate requests """
+    if created:
+        from .schedule import assign_slot  # NumPy: not imported at startup by the ingest-only profile
+        assign_slot(instance)
+
+
+@receiver(post_save, sender=AlertRule)
+@receiver(post_delete, sender=AlertRule)
+def invalidate_alert_rules(sender, **kwargs):
+    """ Rules changed in this process: rebuild the in-memory rule index on next ingest """
+    rule_index.invalidate()
+
+
+@receiver(post_delete, sender=AlertRule)
+def delete_rule_alerts(sender, instance, **kwargs):
+    """ Cascade a rule deletion to its alerts, kept in the time-series database """
+    Alert.objects.filter(rule_id=instance.pk).delete()
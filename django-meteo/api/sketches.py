@@ -0,0 +1,71 @@
+"""
+Mergeable per station-day quantile sketches for temperature and humidity.
+
+Readings are rounded to 0.1 at ingest, so the sketch is a sparse histogram of
+values in tenths: merging days, months or stations is adding counts and the
+quantiles are exact at the resolution of the stored data (no t-digest/KLL
+approximation needed).
+"""
+
+from collections import Counter
+
+import numpy as np
+from django.db import transaction
+
+from .models import DailySketch
+
+
+def to_tenths(value):
+    return int(round(value * 10))
+
+
+def record_sketches(station, entries, discarded=()):
+    """ Add newly ingested WeatherData entries to their station-day sketches, minus the `discarded`
+    readings the storage did not keep (see PackedStorage.write): sketches count what is stored """
+    by_day = {}
+    for sign, readings in ((1, entries), (-1, discarded)):
+        for entry in readings:
+            tmp, hum, count = by_day.setdefault(entry.timestamp.date(), (Counter(), Counter(), [0]))
+            tmp[str(to_tenths(entry.temperature))] += sign
+            hum[str(to_tenths(entry.humidity))] += sign
+            count[0] += sign
+    if not by_day:
+        return
+
+    with transaction.atomic(using=DailySketch.objects.db):
+        existing = DailySketch.objects.select_for_update().filter(station=station, date__in=list(by_day))
+        for sketch in existing:
+            tmp, hum, count = by_day[sketch.date]
+            tmp.update(sketch.temperature)
+            hum.update(sketch.humidity)
+            count[0] += sketch.count
+
+        DailySketch.objects.bulk_create(
+            [
+                DailySketch(station=station, date=day, count=count[0], temperature=dict(+tmp), humidity=dict(+hum))
+                for day, (tmp, hum, count) in by_day.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["station", "date"],
+            update_fields=["count", "temperature", "humidity"],
+        )
+
+
+def merge(histograms):
+    """ Merge sparse {tenths: count} histograms into sorted (values, counts) arrays """
+    keys = [int(k) for h in histograms for k in h]
+    if not keys:
+        return np.empty(0), np.empty(0, dtype=np.int64)
+
+    counts = np.fromiter((c for h in histograms for c in h.values()), dtype=np.int64, count=len(keys))
+    values, inverse = np.unique(np.asarray(keys, dtype=np.int64), return_inverse=True)
+    return values / 10.0, np.bincount(inverse, weights=counts).astype(np.int64)
+
+
+def quantiles(values, counts, qs):
+    """ Nearest-rank quantiles of a merged histogram (NaN when empty) """
+    total = counts.sum()
+    if total == 0:
+        return np.full(len(qs), np.nan)
+    ranks = np.maximum(np.ceil(np.asarray(qs) * total), 1)
+    return values[np.searchsorted(np.cumsum(counts), ranks)]
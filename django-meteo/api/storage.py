@@ -0,0 +1,181 @@
+"""
+Storage backends for raw weather readings.
+
+- "rows" (default): one WeatherData row per reading.
+- "packed": one PackedDay row per station-day holding delta-encoded arrays,
+  about 8 bytes per reading instead of a full row with its FK, datetime and indexes.
+
+Views go through `get_storage()` (selected by settings.WEATHER_STORAGE) and only see
+NumPy arrays (epoch seconds, °C, %), so both layouts are interchangeable.
+"""
+
+from datetime import datetime, time, timedelta, timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from .analytics import SECONDS_PER_DAY, fetch_series
+from .models import WeatherData, PackedDay
+
+
+def _empty():
+    return np.empty(0), np.empty(0), np.empty(0)
+
+
+def _epoch(day):
+    return datetime.combine(day, time.min, tzinfo=timezone.utc).timestamp()
+
+
+INT16 = np.iinfo(np.int16)
+INT32 = np.iinfo(np.int32)
+
+
+def _encode_values(values):
+    """ Delta-encoded tenths: int16, or int32 for the whole day when a delta does not fit
+    (sentinel values of a failed sensor read, e.g. 9999 °C). Raises ValueError beyond int32. """
+    tenths = np.rint(np.asarray(values, dtype=np.float64) * 10)
+    if not np.all(np.isfinite(tenths)) or np.any(np.abs(tenths) > INT32.max // 2):
+        raise ValueError("Reading out of range for packed storage")
+    deltas = np.diff(tenths.astype(np.int32), prepend=np.int32(0))
+    wide = np.any((deltas < INT16.min) | (deltas > INT16.max))
+    return deltas.astype("<i4" if wide else "<i2").tobytes()
+
+
+def _decode_values(buffer, count):
+    buffer = bytes(buffer)
+    dtype = "<i2" if len(buffer) == 2 * count else "<i4"  # int32 days are twice as long
+    return np.cumsum(np.frombuffer(buffer, dtype=dtype), dtype=np.int64) / 10.0
+
+
+def encode_day(seconds, tmp, hum):
+    """ Arrays of one day (sorted by seconds of day) -> (times, temperature, humidity) bytes """
+    times = np.diff(seconds.astype(np.int32), prepend=np.int32(0)).astype("<i4")
+    return times.tobytes(), _encode_values(tmp), _encode_values(hum)
+
+
+def decode_day(times, temperature, humidity):
+    """ Inverse of encode_day -> (seconds of day, °C, %) arrays """
+    seconds = np.cumsum(np.frombuffer(bytes(times), dtype="<i4"), dtype=np.int64)
+    return seconds, _decode_values(temperature, len(seconds)), _decode_values(humidity, len(seconds))
+
+
+class RowStorage:
+    """ One WeatherData row per reading """
+
+    def write(self, station, entries, discarded=None):
+        return len(WeatherData.objects.bulk_create(entries))  # Resent readings are kept: nothing discarded
+
+    def read(self, station, start, end):
+        return fetch_series(WeatherData.objects.filter(station=station, timestamp__gte=start, timestamp__lt=end))
+
+    def latest(self, station, n):
+        """ The `n` most recent readings, newest first """
+        rows = WeatherData.objects.filter(station=station).order_by("-timestamp")[:n]
+        rows = list(rows.values_list("timestamp", "temperature", "humidity"))
+        if not rows:
+            return _empty()
+        timestamps, temperatures, humidities = zip(*rows)
+        return np.array([t.timestamp() for t in timestamps]), np.array(temperatures), np.array(humidities)
+
+
+class PackedStorage:
+    """ One PackedDay row per station-day; a resent reading replaces the one with the same timestamp """
+
+    def write(self, station, entries, discarded=None):
+        """ Store `entries`; readings that end up not stored (replaced ones, and duplicates within
+        `entries`) are appended to the `discarded` list as unsaved WeatherData. """
+        by_day = {}
+        for entry in entries:
+            ts = entry.timestamp
+            seconds = ts.hour * 3600 + ts.minute * 60 + ts.second
+            by_day.setdefault(ts.date(), []).append((seconds, entry.temperature, entry.humidity))
+        if not by_day:
+            return 0
+
+        with transaction.atomic(using=PackedDay.objects.db):
+            existing = {
+                day.date: decode_day(day.times, day.temperature, day.humidity)
+                for day in PackedDay.objects.select_for_update().filter(station=station, date__in=list(by_day))
+            }
+            packed = []
+            for day, readings in by_day.items():
+                new_s, new_t, new_h = (np.array(column, dtype=np.float64) for column in zip(*readings))
+                old_s, old_t, old_h = existing.get(day, _empty())
+                all_s = np.concatenate((new_s, old_s))
+                # np.unique keeps the first occurrence: new readings win over stored ones
+                seconds, first = np.unique(all_s, return_index=True)
+                all_t, all_h = np.concatenate((new_t, old_t)), np.concatenate((new_h, old_h))
+                if discarded is not None:
+                    midnight = datetime.combine(day, time.min)
+                    dropped = np.setdiff1d(np.arange(len(all_t)), first)
+                    discarded.extend(
+                        WeatherData(station_id=station.pk, timestamp=midnight + timedelta(seconds=s), temperature=t, humidity=h)
+                        for s, t, h in zip(all_s[dropped].tolist(), all_t[dropped].tolist(), all_h[dropped].tolist())
+                    )
+                tmp, hum = all_t[first], all_h[first]
+
+                times_b, tmp_b, hum_b = encode_day(seconds, tmp, hum)
+                packed.append(PackedDay(
+                    station=station, date=day, count=len(seconds), times=times_b, temperature=tmp_b, humidity=hum_b
+                ))
+
+            PackedDay.objects.bulk_create(
+                packed,
+                update_conflicts=True,
+                unique_fields=["station", "date"],
+                update_fields=["count", "times", "temperature", "humidity"],
+            )
+        return len(entries)
+
+    def _days(self, rows):
+        """ Decode (date, times, temperature, humidity) rows into concatenated epoch arrays """
+        parts = []
+        for day, times, temperature, humidity in rows:
+            seconds, tmp, hum = decode_day(times, temperature, humidity)
+            parts.append((_epoch(day) + seconds, tmp, hum))
+        if not parts:
+            return _empty()
+        return tuple(np.concatenate(column) for column in zip(*parts))
+
+    def read(self, station, start, end):
+        days = PackedDay.objects.filter(
+            station=station, date__gte=start.date(), date__lte=(end - timedelta(microseconds=1)).date()
+        ).order_by("date")
+        ts, tmp, hum = self._days(days.values_list("date", "times", "temperature", "humidity"))
+        inside = (ts >= start.timestamp()) & (ts < end.timestamp())
+        return ts[inside], tmp[inside], hum[inside]
+
+    def latest(self, station, n):
+        rows, total = [], 0
+        days = PackedDay.objects.filter(station=station).order_by("-date")
+        for row in days.values_list("date", "times", "temperature", "humidity", "count").iterator(chunk_size=8):
+            rows.append(row[:4])
+            total += row[4]
+            if total >= n:
+                break
+        ts, tmp, hum = self._days(reversed(rows))
+        return ts[::-1][:n], tmp[::-1][:n], hum[::-1][:n]
+
+
+BACKENDS = {"rows": RowStorage, "packed": PackedStorage}
+
+
+def get_storage():
+    """ Backend selected by settings.WEATHER_STORAGE """
+    return BACKENDS[getattr(settings, "WEATHER_STORAGE", "rows")]()
+
+
+def daily_extremes(ts, tmp, hum):
+    """ Per UTC day of a series: (day start epochs, tmin, tmax, hmin, hmax) """
+    day = np.floor_divide(ts, SECONDS_PER_DAY).astype(np.int64)
+    days, inverse = np.unique(day, return_inverse=True)
+    extremes = []
+    for values in (tmp, hum):
+        low = np.full(len(days), np.inf)
+        high = np.full(len(days), -np.inf)
+        np.minimum.at(low, inverse, values)
+        np.maximum.at(high, inverse, values)
+        extremes += [low, high]
+    tmin, tmax, hmin, hmax = extremes
+    return days * SECONDS_PER_DAY, tmin, tmax, hmin, hmax
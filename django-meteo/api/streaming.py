@@ -0,0 +1,187 @@
+"""
+Streaming decode of upload bodies.
+
+`body_chunks` reads the request stream in fixed-size chunks and inflates `Content-Encoding: gzip`
+or `deflate` bodies on the fly, refusing more than a given number of decoded bytes (no gzip bombs).
+`iter_members` decodes a JSON object from those chunks member by member and hands the array of one
+member (the upload's "data") out as a lazy iterator of its elements. Memory stays bounded by the
+chunk size and the largest single element, whatever the size of the batch.
+"""
+
+import codecs
+import json
+import re
+import zlib
+from collections.abc import Iterator
+
+from django.conf import settings
+
+CHUNK_SIZE = 64 * 1024
+MAX_VALUE_BYTES = 1024 * 1024  # A single JSON element larger than this is rejected
+WHITESPACE = " \t\n\r"
+NUMBER_END = re.compile(r"[^0-9+\-.eE]")
+
+_decoder = json.JSONDecoder()
+
+
+class BodyError(Exception):
+    """ Body that cannot be decoded, with the HTTP status to answer """
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _decompressor(encoding, first_bytes):
+    if encoding in ("gzip", "x-gzip"):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        # RFC 9110 deflate is zlib-wrapped, but some clients send raw deflate: check the zlib header
+        zlib_wrapped = len(first_bytes) >= 2 and first_bytes[0] & 0x0F == 8 and int.from_bytes(first_bytes[:2], "big") % 31 == 0
+        return zlib.decompressobj(zlib.MAX_WBITS if zlib_wrapped else -zlib.MAX_WBITS)
+    raise BodyError(f"Unsupported Content-Encoding: {encoding}", status=415)
+
+
+def body_chunks(request, max_bytes, chunk_size=CHUNK_SIZE):
+    """ Decoded body of `request` in chunks of at most `chunk_size` bytes """
+    encoding = request.META.get("HTTP_CONTENT_ENCODING", "").strip().lower()
+    decompressor = None
+    total = 0
+    try:
+        while True:
+            raw = request.read(chunk_size)
+            if not raw:
+                break
+            if encoding in ("", "identity"):
+                pieces = [raw]
+            else:
+                if decompressor is None:
+                    decompressor = _decompressor(encoding, raw)
+                pieces = [decompressor.decompress(raw, chunk_size)]
+                while decompressor.unconsumed_tail:
+                    pieces.append(decompressor.decompress(decompressor.unconsumed_tail, chunk_size))
+            for piece in pieces:
+                total += len(piece)
+                if total > max_bytes:
+                    raise BodyError(f"Body too large: more than {max_bytes} bytes once decoded", status=413)
+                if piece:
+                    yield piece
+        if decompressor is not None:
+            tail = decompressor.flush()
+            if not decompressor.eof:
+                raise BodyError("Truncated compressed body")
+            if total + len(tail) > max_bytes:
+                raise BodyError(f"Body too large: more than {max_bytes} bytes once decoded", status=413)
+            if tail:
+                yield tail
+    except zlib.error as e:
+        raise BodyError(f"Invalid {encoding} body: {e}")
+
+
+def decoded_body(request):
+    """ Whole decoded body, for the small uploads (same limit as request.body) """
+    return b"".join(body_chunks(request, settings.DATA_UPLOAD_MAX_MEMORY_SIZE or float("inf")))
+
+
+class _Reader:
+    """ Text buffer over byte chunks: look at the next token, decode one JSON value at a time """
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def error(self, message):
+        return json.JSONDecodeError(message, self.text, self.pos)
+
+    def fill(self):
+        """ Append the next chunk, dropping what was consumed; False at the end of the body """
+        if self.eof:
+            return False
+        chunk = next(self.chunks, None)
+        self.text = self.text[self.pos:] + self.utf8.decode(chunk or b"", final=chunk is None)
+        self.pos = 0
+        self.eof = chunk is None
+        return True
+
+    def peek(self):
+        """ Next non-whitespace character ("" at the end of the body) """
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise self.error(f"Expecting '{char}'")
+        self.pos += 1
+
+    def value(self):
+        if self.peek() in "-0123456789":
+            # Unlike strings, arrays and objects, a number may go on in the next chunk
+            while not NUMBER_END.search(self.text, self.pos) and self.fill():
+                pass
+        while True:
+            try:
+                value, self.pos = _decoder.raw_decode(self.text, self.pos)
+                return value
+            except json.JSONDecodeError:
+                if len(self.text) - self.pos > MAX_VALUE_BYTES or not self.fill():
+                    raise
+
+
+def _array_items(reader):
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        separator = reader.peek()
+        reader.pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            reader.pos -= 1
+            raise reader.error("Expecting ',' or ']'")
+
+
+def iter_members(chunks, stream="data"):
+    """ (key, value) members of the JSON object in `chunks`, in body order. When the value of `stream`
+    is an array it is an iterator of its elements, to consume before the next member (left over
+    elements are skipped). Raises json.JSONDecodeError on malformed JSON. """
+    reader = _Reader(chunks)
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+    else:
+        while True:
+            key = reader.value()
+            if not isinstance(key, str):
+                raise reader.error("Expecting property name")
+            reader.expect(":")
+            if key == stream and reader.peek() == "[":
+                reader.pos += 1
+                items = _array_items(reader)
+                yield key, items
+                for _ in items:
+                    pass
+            else:
+                yield key, reader.value()
+            separator = reader.peek()
+            reader.pos += 1
+            if separator == "}":
+                break
+            if separator != ",":
+                reader.pos -= 1
+                raise reader.error("Expecting ',' or '}'")
+    if reader.peek():
+        raise reader.error("Extra data")
+
+
+def is_stream(value):
+    return isinstance(value, Iterator)
@@ -0,0 +1,59 @@
+from unittest import mock
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now, timedelta
+from api.admin import EstimatedCountPaginator
+from api.models import Station, WeatherData, AlertRule, Alert
+
+
+class AdminChangelistTests(TestCase):
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        """✅ One station with a few readings and a logged-in superuser"""
+        self.station = Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+        WeatherData.objects.bulk_create([
+            WeatherData(station=self.station, timestamp=now() - timedelta(minutes=30 * i), temperature=20.0, humidity=50.0)
+            for i in range(20)
+        ])
+        self.admin = User.objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(self.admin)
+
+    def test_weatherdata_changelist_queries_do_not_scale_with_rows(self):
+        """✅ Stations are not fetched per row"""
+        self.client.get("/admin/api/weatherdata/")  # Warm up session / content types
+
+        with CaptureQueriesContext(connections["default"]) as ctx:
+            response = self.client.get("/admin/api/weatherdata/")
+        self.assertEqual(response.status_code, 200)
+
+        # Stations are fetched by one batched IN lookup (they live in the default database)
+        station_lookups = [q for q in ctx.captured_queries if 'FROM "api_station" WHERE' in q["sql"]]
+        self.assertEqual(len(station_lookups), 1)
+        self.assertIn(" IN ", station_lookups[0]["sql"])
+
+    def test_paginator_uses_estimate_for_unfiltered_large_tables(self):
+        """✅ Unfiltered querysets above the threshold use the estimate, filtered ones count exactly"""
+        with mock.patch("api.admin.ESTIMATE_THRESHOLD", 0):
+            paginator = EstimatedCountPaginator(WeatherData.objects.order_by("-timestamp"), 50)
+            max_id = WeatherData.objects.order_by("-id").first().id
+            self.assertEqual(paginator.count, max_id)
+
+            filtered = EstimatedCountPaginator(WeatherData.objects.filter(station=self.station).order_by("-timestamp"), 50)
+            self.assertEqual(filtered.count, 20)
+
+    def test_alert_changelist_without_join(self):
+        """✅ Alerts live in the time-series database: rules and stations fetched by batched lookups"""
+        rule = AlertRule.objects.create(name="Hot", station=self.station, metric="temperature", operator="above", threshold=30.0)
+        Alert.objects.create(rule=rule, station=self.station, started_at=now(), last_seen=now(), value=31.0)
+        response = self.client.get("/admin/api/alert/")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "esp32-001")
+
+    def test_stationhealth_changelist_without_join(self):
+        """✅ Health rows live in the time-series database: stations fetched by a batched lookup"""
+        response = self.client.get("/admin/api/stationhealth/")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "esp32-001")
@@ -0,0 +1,81 @@
+import json
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from api.alerts import rule_index
+from api.models import Station, AlertRule, Alert
+
+
+class AlertTests(TestCase):
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        """✅ A station rule on temperature (1h min duration, 2°C hysteresis) and a fleet rule on wifi"""
+        self.addCleanup(rule_index.invalidate)  # Rules are rolled back without post_delete signals
+        self.station = Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+        self.other = Station.objects.create(station_ref="esp32-002", name="Other Station")
+        self.hot = AlertRule.objects.create(
+            name="Hot", station=self.station, metric="temperature", operator="above",
+            threshold=30.0, hysteresis=2.0, min_duration=timedelta(hours=1)
+        )
+        AlertRule.objects.create(name="Weak wifi", metric="wifi_strength", operator="below", threshold=-85.0)
+
+    def put(self, url, payload):
+        return self.client.put(url, data=json.dumps(payload), content_type="application/json")
+
+    def weather(self, ref, readings):
+        return self.put("/api/weather/upload/", {
+            "id": ref, "data": [{"ts": ts, "tmp": tmp, "hum": 50.0} for ts, tmp in readings]
+        })
+
+    def test_min_duration_and_hysteresis(self):
+        """✅ Fires after holding 1h, stays open inside the hysteresis band, resolves below 28°C"""
+        response = self.weather("esp32-001", [("20250220120000", 31.0), ("20250220123000", 32.5)])
+        self.assertEqual(response.json()["alerts"], 0)
+        self.assertIsNone(Alert.objects.get().fired_at)
+
+        response = self.weather("esp32-001", [("20250220130000", 31.0), ("20250220133000", 29.0)])
+        self.assertEqual(response.json()["alerts"], 1)
+        alert = Alert.objects.get()
+        self.assertIsNotNone(alert.fired_at)
+        self.assertIsNone(alert.resolved_at)
+        self.assertEqual(alert.value, 32.5)
+
+        self.weather("esp32-001", [("20250220140000", 27.5)])
+        self.assertIsNotNone(Alert.objects.get().resolved_at)
+
+    def test_short_excursion_does_not_fire(self):
+        """✅ A pending alert is dropped when the condition stops before min_duration"""
+        self.weather("esp32-001", [("20250220120000", 31.0), ("20250220123000", 25.0)])
+        self.assertFalse(Alert.objects.exists())
+
+    def test_fleet_rule_on_status_and_api(self):
+        """✅ Fleet rules apply to every station; GET /api/alerts/ lists fired alerts"""
+        self.put("/api/status/upload/", {"id": "esp32-002", "ts": "20250220120000", "upt": 1, "mem": 200000, "wif": -90})
+        self.weather("esp32-002", [("20250220120000", 35.0)])  # Station rule of esp32-001 only
+
+        alerts = self.client.get("/api/alerts/?active=1").json()["alerts"]
+        self.assertEqual(len(alerts), 1)
+        self.assertEqual((alerts[0]["station"], alerts[0]["metric"], alerts[0]["val"]), ("esp32-002", "wifi_strength", -90))
+        self.assertEqual(self.client.get("/api/alerts/?station=esp32-001").json()["alerts"], [])
+
+    def test_alerts_live_in_timeseries_database(self):
+        """✅ Written at ingest next to the readings; deleting a rule or a station removes its alerts"""
+        self.weather("esp32-001", [("20250220120000", 31.0)])
+        self.assertEqual(Alert.objects.get()._state.db, "timeseries")
+        self.hot.delete()
+        self.assertFalse(Alert.objects.exists())
+
+        self.weather("esp32-002", [("20250220120000", 20.0)])
+        self.put("/api/status/upload/", {"id": "esp32-002", "ts": "20250220120000", "upt": 1, "mem": 200000, "wif": -90})
+        self.other.delete()
+        self.assertFalse(Alert.objects.exists())
+
+    def test_one_open_alert_per_rule_and_station(self):
+        """✅ A second open alert for the same rule and station is refused by the database"""
+        self.weather("esp32-001", [("20250220120000", 31.0)])
+        alert = Alert.objects.get()
+        with self.assertRaises(IntegrityError), transaction.atomic(using=Alert.objects.db):
+            Alert.objects.create(rule=self.hot, station=self.station, started_at=alert.started_at, last_seen=alert.last_seen, value=31.0)
+        Alert.objects.filter(pk=alert.pk).update(resolved_at=alert.last_seen)
+        Alert.objects.create(rule=self.hot, station=self.station, started_at=alert.started_at, last_seen=alert.last_seen, value=31.0)
@@ -0,0 +1,102 @@
+import json
+import numpy as np
+from django.test import TestCase, SimpleTestCase
+from api import analytics
+from api.models import Station
+from api.response_cache import responses
+
+
+class AnalyticsFunctionTests(SimpleTestCase):
+
+    def test_dew_point_and_heat_index(self):
+        """✅ Reference values: 20°C/50% -> Td 9.3°C, 90°F/70% -> HI 106°F"""
+        self.assertAlmostEqual(analytics.dew_point(np.array([20.0]), np.array([50.0]))[0], 9.3, places=1)
+        self.assertAlmostEqual(analytics.heat_index(np.array([32.22]), np.array([70.0]))[0], 41.1, delta=0.3)
+        # Below 80°F the simple formula stays close to the air temperature
+        self.assertAlmostEqual(analytics.heat_index(np.array([20.0]), np.array([50.0]))[0], 19.6, delta=0.5)
+
+    def test_rolling_mean_and_rate_of_change(self):
+        """✅ Time-window mean and per-hour change on irregular spacing"""
+        ts = np.array([0.0, 1800.0, 3600.0, 10800.0])
+        tmp = np.array([10.0, 12.0, 14.0, 20.0])
+        np.testing.assert_allclose(analytics.rolling_mean(ts, tmp, 3600.0), [10.0, 11.0, 13.0, 20.0])
+        roc = analytics.rate_of_change(ts, tmp)
+        self.assertTrue(np.isnan(roc[0]))
+        np.testing.assert_allclose(roc[1:], [4.0, 4.0, 3.0])
+
+    def test_daily_degree_days(self):
+        """✅ Daily means split on UTC midnight"""
+        ts = np.array([0.0, 3600.0, 86400.0])
+        days, mean, hdd, cdd = analytics.daily_degree_days(ts, np.array([10.0, 14.0, 25.0]), 18.0)
+        np.testing.assert_allclose(days, [0, 86400])
+        np.testing.assert_allclose(mean, [12.0, 25.0])
+        np.testing.assert_allclose(hdd, [6.0, 0.0])
+        np.testing.assert_allclose(cdd, [0.0, 7.0])
+
+    def test_resample_fill_methods(self):
+        """✅ Duplicates are averaged, gaps stay NaN / carry forward / interpolate (never extrapolate)"""
+        ts = np.array([0.0, 60.0, 3600.0, 10800.0])
+        tmp = np.array([10.0, 12.0, 14.0, 20.0])
+
+        grid, (none,) = analytics.resample(ts, [tmp], 0.0, 18000.0, 3600, "none")
+        np.testing.assert_allclose(grid, [0, 3600, 7200, 10800, 14400])
+        np.testing.assert_allclose(none, [11.0, 14.0, np.nan, 20.0, np.nan])
+
+        _, (previous,) = analytics.resample(ts, [tmp], 0.0, 18000.0, 3600, "previous")
+        np.testing.assert_allclose(previous, [11.0, 14.0, 14.0, 20.0, 20.0])
+
+        _, (linear,) = analytics.resample(ts, [tmp], 0.0, 18000.0, 3600, "linear")
+        np.testing.assert_allclose(linear, [11.0, 14.0, 17.0, 20.0, np.nan])
+
+
+class AnalyticsEndpointTests(TestCase):
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        responses.clear()  # History bodies cached by an earlier test
+        self.addCleanup(responses.clear)
+        Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+        self.client.put("/api/weather/upload/", data=json.dumps({
+            "id": "esp32-001",
+            "data": [
+                {"ts": "20250220100000", "tmp": 20.0, "hum": 50.0},
+                {"ts": "20250220103000", "tmp": 21.0, "hum": 50.0},
+                {"ts": "20250221100000", "tmp": 10.0, "hum": 80.0},
+            ]
+        }), content_type="application/json")
+
+    def test_analytics(self):
+        """✅ GET /api/analytics/esp32-001/?from=&to= returns series and daily values"""
+        response = self.client.get("/api/analytics/esp32-001/?from=20250220&to=20250221")
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        self.assertEqual(data["count"], 3)
+        self.assertEqual(data["series"]["ts"][0], "20250220100000")
+        self.assertEqual(data["series"]["dew"][0], 9.3)
+        self.assertIsNone(data["series"]["troc"][0])
+        self.assertEqual(data["series"]["troc"][1], 2.0)
+        self.assertEqual(data["daily"], [
+            {"dt": "20250220", "tavg": 20.5, "hdd": 0.0, "cdd": 2.5},
+            {"dt": "20250221", "tavg": 10.0, "hdd": 8.0, "cdd": 0.0},
+        ])
+
+    def test_resampled_history(self):
+        """✅ GET /api/history/esp32-001/?resample=1d&fill=linear returns one cell per day, newest first"""
+        response = self.client.get("/api/history/esp32-001/?resample=1d&fill=linear&from=20250219&to=20250221")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["history"], [
+            {"ts": "20250221000000", "tmp": 10.0, "hum": 80.0},
+            {"ts": "20250220000000", "tmp": 20.5, "hum": 50.0},
+            {"ts": "20250219000000", "tmp": None, "hum": None},
+        ])
+        self.assertEqual(self.client.get("/api/history/esp32-001/?resample=2h").status_code, 400)
+        self.assertEqual(self.client.get("/api/history/esp32-001/?resample=1h&fill=spline").status_code, 400)
+
+    def test_analytics_errors(self):
+        """✅ Unknown station and invalid range"""
+        self.assertEqual(self.client.get("/api/analytics/unknown/").status_code, 404)
+        self.assertEqual(self.client.get("/api/analytics/esp32-001/?from=2025").status_code, 400)
+        self.assertEqual(self.client.get("/api/analytics/esp32-001/?from=20250222&to=20250220").status_code, 400)
+        for window in ("0", "-1", "nan", "inf", "x"):
+            self.assertEqual(self.client.get(f"/api/analytics/esp32-001/?window={window}").status_code, 400, window)
@@ -0,0 +1,58 @@
+import json
+from django.test import TestCase
+from api.models import Station
+from api.response_cache import responses
+
+
+class BatchTests(TestCase):
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        responses.clear()  # History bodies cached by an earlier test
+        self.addCleanup(responses.clear)
+        Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+        payload = {"id": "esp32-001", "data": [
+            {"ts": "20250220120000", "tmp": 21.5, "hum": 50.0}, {"ts": "20250220123000", "tmp": 22.0, "hum": 51.0}
+        ]}
+        self.client.put("/api/weather/upload/", data=json.dumps(payload), content_type="application/json")
+
+    def batch(self, subs):
+        return self.client.post("/api/batch/", data=json.dumps({"requests": subs}), content_type="application/json")
+
+    def test_batch_matches_individual_endpoints(self):
+        """✅ One station lookup and one latest-readings read serve lastreport and history"""
+        subs = [{"endpoint": e, "id": "esp32-001"} for e in ("lastreport", "history", "status", "minmax")]
+        with self.assertNumQueries(1, using="default"), self.assertNumQueries(3, using="timeseries"):
+            results = self.batch(subs).json()["results"]
+
+        self.assertEqual(results[0]["body"], self.client.get("/api/lastreport/esp32-001/").json())
+        self.assertEqual(results[1]["body"], self.client.get("/api/history/esp32-001/").json())
+        self.assertEqual(results[2]["body"], {"error": "No system status available"})
+        self.assertEqual(results[3]["body"], self.client.get("/api/minmax/history/esp32-001/").json())
+
+    def test_per_request_errors_and_params(self):
+        results = self.batch([
+            {"endpoint": "history", "id": "esp32-404"},
+            {"endpoint": "upload", "id": "esp32-001"},
+            {"endpoint": "history", "id": "esp32-001", "params": {"resample": "1h", "from": "20250220", "to": "20250220"}},
+        ]).json()["results"]
+        self.assertEqual([r["status"] for r in results], [404, 400, 200])
+        self.assertEqual(len(results[2]["body"]["history"]), 24)
+
+    def test_malformed_sub_requests(self):
+        """✅ Bad id, params or request shape: a 400 for that sub-request only, never a 500"""
+        results = self.batch([
+            {"endpoint": "status", "id": ["esp32-001"]},
+            {"endpoint": "status", "id": {"ref": "esp32-001"}},
+            {"endpoint": "history", "id": "esp32-001", "params": ["resample", "1h"]},
+            {"endpoint": "history", "id": "esp32-001", "params": {"resample": 1}},
+            "lastreport",
+            {"endpoint": "lastreport", "id": "esp32-001"},
+        ]).json()["results"]
+        self.assertEqual([r["status"] for r in results], [400, 400, 400, 400, 400, 200])
+        self.assertEqual(results[0]["body"], {"error": "Invalid id: expected a string"})
+        self.assertEqual((results[4]["endpoint"], results[4]["id"]), (None, None))
+
+    def test_invalid_batch(self):
+        self.assertEqual(self.client.get("/api/batch/").status_code, 400)
+        self.assertEqual(self.batch("history").status_code, 400)
@@ -0,0 +1,105 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from django.core.management import call_command
+from django.test import LiveServerTestCase, SimpleTestCase, TestCase, override_settings
+from api.management.commands import replay_traffic
+from api.models import Station, WeatherData
+from api.response_cache import responses
+
+
+def upload_payload(ts):
+    return json.dumps({"id": "esp32-001", "data": [{"ts": ts, "tmp": 21.5, "hum": 50.0}]})
+
+
+class CaptureTests(TestCase):
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        responses.clear()  # History bodies cached by an earlier test
+        self.addCleanup(responses.clear)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = Path(directory.name)
+        Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+
+    def test_disabled_by_default(self):
+        with override_settings(CAPTURE_DIR=self.dir):
+            self.client.get("/api/stations/")
+        self.assertEqual(list(self.dir.iterdir()), [])
+
+    def test_records_api_requests(self):
+        """✅ Method, path, view, client address, body, status and duration, one line per request"""
+        with override_settings(CAPTURE_SAMPLE_RATE=1.0, CAPTURE_DIR=self.dir):
+            self.client.put(
+                "/api/weather/upload/", data=upload_payload("20250220100000"), content_type="application/json",
+                HTTP_X_FORWARDED_FOR="192.168.1.50",
+            )
+            self.client.get("/api/history/esp32-001/?resample=1h")
+            self.client.get("/admin/login/")  # Not under /api/
+
+        upload, history = replay_traffic.read_log([self.dir])
+        self.assertEqual((upload["m"], upload["v"], upload["ip"], upload["s"]), ("PUT", "receive_weather_data", "192.168.1.50", 201))
+        self.assertEqual(json.loads(upload["b"])["data"][0]["tmp"], 21.5)
+        self.assertEqual(upload["ct"], "application/json")
+        self.assertEqual((history["p"], history["s"]), ("/api/history/esp32-001/?resample=1h", 200))
+        self.assertNotIn("b", history)
+        self.assertLessEqual(upload["at"], history["at"])
+
+    def test_large_bodies_not_stored(self):
+        with override_settings(CAPTURE_SAMPLE_RATE=1.0, CAPTURE_DIR=self.dir, CAPTURE_MAX_BODY=10):
+            self.client.put("/api/weather/upload/", data=upload_payload("20250220100000"), content_type="application/json")
+        record, = replay_traffic.read_log([self.dir])
+        self.assertNotIn("b", record)
+        self.assertGreater(record["cut"], 10)
+
+
+class LatencySummaryTests(SimpleTestCase):
+    def test_summary_and_comparison(self):
+        results = [{"v": "history", "s0": 200, "s": 200, "ms": float(ms), "lag_ms": 0.0} for ms in range(1, 101)]
+        results.append({"v": "status", "s0": 200, "s": 500, "ms": 5.0, "lag_ms": 0.0})
+        summary = replay_traffic.summarize(results)
+        self.assertEqual(summary["history"]["n"], 100)
+        self.assertEqual(summary["history"]["p50"], 50.5)
+        self.assertEqual(summary["status"]["errors"], 1)
+        self.assertEqual(summary["*"]["n"], 101)
+
+        slower = {view: {**s, "p50": s["p50"] * 2} for view, s in summary.items()}
+        rows = {view: change for view, _, _, change in replay_traffic.compare(summary, slower)}
+        self.assertEqual(rows["history"]["p50"], 1.0)
+        self.assertEqual(rows["history"]["p99"], 0.0)
+
+
+class ReplayTests(LiveServerTestCase):
+    databases = {"default", "timeseries"}
+
+    def test_replay_reproduces_captured_requests(self):
+        """✅ Replaying a capture against a running instance gives the same statuses, in capture order"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        Station.objects.create(station_ref="esp32-001", name="Test Weather Station", http_address="http://10.0.0.7")
+        with override_settings(CAPTURE_SAMPLE_RATE=1.0, CAPTURE_DIR=directory.name):
+            self.client.put(
+                "/api/weather/upload/", data=upload_payload("20250220100000"), content_type="application/json",
+                HTTP_X_FORWARDED_FOR="10.0.0.7",
+            )
+            self.client.get("/api/lastreport/esp32-001/")
+            self.client.get("/api/status/unknown/")
+        WeatherData.objects.all().delete()
+
+        out = StringIO()
+        summary_path = Path(directory.name) / "run.json"
+        call_command(
+            "replay_traffic", directory.name, "--target", self.live_server_url, "--speed", "0",
+            "--concurrency", "1", "--out", str(summary_path), stdout=out,
+        )
+        summary = json.loads(summary_path.read_text())
+        self.assertEqual(summary["*"], {**summary["*"], "n": 3, "errors": 0})
+        self.assertEqual(WeatherData.objects.count(), 1)  # Upload accepted: captured client address forwarded
+
+        call_command(
+            "replay_traffic", directory.name, "--target", self.live_server_url, "--speed", "0", "--read-only",
+            "--compare", str(summary_path), stdout=out,
+        )
+        self.assertIn("Compared with", out.getvalue())
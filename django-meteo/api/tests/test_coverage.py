@@ -0,0 +1,53 @@
+import json
+from django.test import TestCase
+from api.models import Station, DailyCoverage
+
+
+class CoverageTests(TestCase):
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        """✅ Two stations, esp32-001 reporting every 30 min on 2025-02-20 except 10:00-11:30"""
+        self.station = Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+        Station.objects.create(station_ref="esp32-002", name="Silent Station")
+        readings = [
+            {"ts": f"20250220{hour:02d}{minute:02d}00", "tmp": 20.0, "hum": 50.0}
+            for hour in range(24) for minute in (0, 30)
+            if not 10 <= hour + minute / 60 < 11.5
+        ]
+        self.put({"id": "esp32-001", "data": readings[:20]})
+        self.put({"id": "esp32-001", "data": readings[20:]})
+
+    def put(self, payload):
+        return self.client.put("/api/weather/upload/", data=json.dumps(payload), content_type="application/json")
+
+    def test_bitmap_maintained_at_ingest(self):
+        """✅ Batches of the same day are OR-ed into one bitmap, resyncs change nothing"""
+        self.put({"id": "esp32-001", "data": [{"ts": "20250220000500", "tmp": 20.0, "hum": 50.0}]})
+
+        bitmap = DailyCoverage.objects.get(station=self.station).bitmap
+        self.assertEqual(bitmap.bit_count(), 45)
+        self.assertFalse(bitmap & (1 << 20))  # 10:00 slot
+
+    def test_station_coverage(self):
+        """✅ GET /api/coverage/esp32-001/ reports the hole"""
+        response = self.client.get("/api/coverage/esp32-001/?from=20250220&to=20250220")
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        self.assertEqual(data["days"][0]["n"], 45)
+        self.assertEqual(data["missing"], [["20250220100000", "20250220113000"]])
+        self.assertEqual(data["cov"], round(100 * 45 / 48, 1))
+
+    def test_fleet_coverage(self):
+        """✅ GET /api/coverage/ lists every station, partial ranges are clipped to their slots"""
+        response = self.client.get("/api/coverage/?from=20250220090000&to=20250221010000")
+        self.assertEqual(response.status_code, 200)
+
+        stations = {s["id"]: s for s in response.json()["stations"]}
+        self.assertEqual(stations["esp32-001"]["missing"], [
+            ["20250220100000", "20250220113000"],
+            ["20250221000000", "20250221010000"],
+        ])
+        self.assertEqual(stations["esp32-002"]["cov"], 0.0)
+        self.assertEqual(stations["esp32-002"]["missing"], [["20250220090000", "20250221010000"]])
@@ -2,12 +2,16 @@ import json
 from django.test import TestCase
 from django.utils.timezone import now,  make_aware 
 from api.models import Station, WeatherData, MinMaxData, SystemStatus
+from api.response_cache import responses
 from datetime import datetime 
 
 class DjangoAPITests(TestCase):
+    databases = {"default", "timeseries"}
 
     def setUp(self):
         """✅ Populate test database with fake ESP32 data"""
+        responses.clear()  # History bodies cached by an earlier test
+        self.addCleanup(responses.clear)
         self.station = Station.objects.create(
             station_ref="esp32-001",
             name="Test Weather Station",
@@ -136,7 +140,7 @@ class DjangoAPITests(TestCase):
         self.assertEqual(response.status_code, 200)
 
         # ✅ Fix: Ensure fetching the latest status correctly
-        latest_status = SystemStatus.objects.get(station=self.station)
+        latest_status = SystemStatus.objects.filter(station=self.station).latest("id")
         self.assertEqual(latest_status.uptime_ms, 120000)
         self.assertEqual(latest_status.free_heap, 200000)
         self.assertEqual(latest_status.wifi_strength, -75)
@@ -0,0 +1,99 @@
+import json
+from datetime import datetime, timezone
+from unittest import mock
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+from api import rollups
+from api.models import Station, HourlyRollup, WeatherData
+from api.storage import RowStorage
+
+
+class CorrelationTests(SimpleTestCase):
+    def test_pairwise_over_shared_columns(self):
+        """✅ Each pair uses only the buckets both rows have; too little overlap or no variance gives NaN"""
+        matrix = np.array([
+            [1.0, 2.0, 3.0, 4.0, np.nan],
+            [2.0, 4.0, 6.0, 8.0, 10.0],
+            [np.nan, 3.0, 2.0, 1.0, 0.0],
+            [5.0, 5.0, 5.0, 5.0, 5.0],
+            [np.nan, np.nan, np.nan, 1.0, 2.0],
+        ])
+        r = rollups.correlation(matrix)
+        np.testing.assert_allclose(r[:3, :3], [[1, 1, -1], [1, 1, -1], [-1, -1, 1]])
+        self.assertTrue(np.isnan(r[3]).all())
+        self.assertTrue(np.isnan(r[0, 4]))  # One shared bucket
+
+    def test_touched_spans(self):
+        self.assertEqual(rollups.touched_spans([5, 6, 8, 40, 41, 3000], max_gap=24), [(5, 8), (40, 41), (3000, 3000)])
+
+
+class FleetAggregateTests(TestCase):
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        for ref, location in (("esp32-001", "Paris"), ("esp32-002", "Paris"), ("esp32-003", "Lyon"), ("esp32-004", None)):
+            Station.objects.create(station_ref=ref, name=ref, location=location)
+        hours = ["20250220100000", "20250220110000", "20250220120000", "20250220130000"]
+        self.upload("esp32-001", [(ts, tmp) for ts, tmp in zip(hours, (10.0, 12.0, 14.0, 13.0))])
+        self.upload("esp32-002", [(ts, tmp) for ts, tmp in zip(hours, (11.0, 13.0, 15.0, 14.0))])
+        self.upload("esp32-003", [(ts, tmp) for ts, tmp in zip(hours, (20.0, 18.0, 16.0, 17.0))])
+
+    def upload(self, station_ref, readings):
+        payload = {"id": station_ref, "data": [{"ts": ts, "tmp": tmp, "hum": 50.0} for ts, tmp in readings]}
+        response = self.client.put("/api/weather/upload/", data=json.dumps(payload), content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+
+    def get(self, query="from=20250220100000&to=20250220140000"):
+        return self.client.get(f"/api/fleet/aggregate/?{query}")
+
+    def test_rollups_recomputed_at_ingest(self):
+        """✅ One rollup per station-hour, updated when an hour receives more readings"""
+        self.assertEqual(HourlyRollup.objects.count(), 12)
+        self.upload("esp32-001", [("20250220103000", 20.0)])
+        rollup = HourlyRollup.objects.get(station=Station.objects.get(station_ref="esp32-001"), hour__hour=10)
+        self.assertEqual((rollup.count, rollup.tmp_sum, rollup.tmp_min, rollup.tmp_max), (2, 30.0, 10.0, 20.0))
+
+    def test_resent_old_reading_reads_only_its_hours(self):
+        """✅ An old resent reading plus a fresh one: two short storage reads, not the months in between"""
+        self.upload("esp32-001", [("20241101100000", 9.0), ("20250220150000", 16.0)])
+        station = Station.objects.get(station_ref="esp32-001")
+        entries = [WeatherData(timestamp=datetime(2024, 11, 1, 10, tzinfo=timezone.utc)),
+                   WeatherData(timestamp=datetime(2025, 2, 20, 15, tzinfo=timezone.utc))]
+        with mock.patch("api.storage.RowStorage.read", autospec=True, side_effect=RowStorage.read) as read:
+            rollups.record_rollups(station, entries)
+        spans = [(end - start).total_seconds() for _, _, start, end in (call.args for call in read.call_args_list)]
+        self.assertEqual(spans, [3600, 3600])
+        self.assertEqual(HourlyRollup.objects.get(station=station, hour=entries[0].timestamp).tmp_max, 9.0)
+
+    def test_aggregates_by_location(self):
+        """✅ Per-bucket mean/min/max across the stations of each location, in one time-series query"""
+        with self.assertNumQueries(1, using="timeseries"), self.assertNumQueries(1, using="default"):
+            data = self.get().json()
+        self.assertEqual(data["buckets"], ["20250220100000", "20250220110000", "20250220120000", "20250220130000"])
+        self.assertEqual([g["key"] for g in data["groups"]], ["Lyon", "Paris", None])
+
+        paris = data["groups"][1]
+        self.assertEqual(paris["stations"], ["esp32-001", "esp32-002"])
+        self.assertEqual(paris["n"], [2, 2, 2, 2])
+        self.assertEqual(paris["tmp"]["mean"], [10.5, 12.5, 14.5, 13.5])
+        self.assertEqual((paris["tmp"]["min"][0], paris["tmp"]["max"][0]), (10.0, 11.0))
+        self.assertEqual(data["groups"][2]["tmp"]["mean"], [None] * 4)  # Station without readings
+
+    def test_daily_buckets(self):
+        data = self.get("group=station&bucket=1d&from=20250220&to=20250220").json()
+        self.assertEqual(data["buckets"], ["20250220000000"])
+        self.assertEqual(data["groups"][0]["tmp"]["mean"], [12.2])
+        self.assertEqual(data["groups"][0]["tmp"]["max"], [14.0])
+
+    def test_correlation_matrix(self):
+        """✅ Stations with readings, pairwise correlation of their bucket means"""
+        corr = self.get().json()["corr"]
+        self.assertEqual(corr["stations"], ["esp32-001", "esp32-002", "esp32-003"])
+        self.assertEqual(corr["matrix"][0][:2], [1.0, 1.0])
+        self.assertLess(corr["matrix"][0][2], -0.9)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.get("group=country").status_code, 400)
+        self.assertEqual(self.get("bucket=5m").status_code, 400)
+        self.assertEqual(self.get("corr=wind").status_code, 400)
+        self.assertEqual(self.get("from=20200101&to=20250101").status_code, 400)  # Too many buckets
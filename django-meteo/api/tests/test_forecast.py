@@ -0,0 +1,94 @@
+import json
+import math
+from datetime import datetime, timedelta, timezone
+from django.test import SimpleTestCase, TestCase
+from api import forecast
+from api.models import Station, ForecastState
+
+
+def diurnal(epoch):
+    """ 15 °C mean, ±6 °C, warmest at 13:00 UTC """
+    return 15.0 + 6.0 * math.cos(2 * math.pi * ((epoch / 3600) % 24 - 13) / 24)
+
+
+class ForecastModelTests(SimpleTestCase):
+    def test_learns_diurnal_cycle(self):
+        """✅ After some days of half-hourly readings, 6 h ahead beats persistence"""
+        readings = [(i * 1800.0, {"tmp": diurnal(i * 1800.0)}) for i in range(20 * 48)]
+        state = {}
+        last_epoch, folded = forecast.fold(state, None, readings)
+        self.assertEqual(folded, len(readings))
+
+        values, sigma = forecast.forecast(state, last_epoch, [6])["tmp"]
+        persistence = abs(diurnal(last_epoch) - diurnal(last_epoch + 6 * 3600))
+        self.assertLess(abs(values[0] - diurnal(last_epoch + 6 * 3600)), persistence / 2)
+        self.assertLess(sigma, 1.0)
+
+    def test_older_readings_skipped(self):
+        state = {}
+        last_epoch, _ = forecast.fold(state, None, [(3600.0, {"tmp": 10.0})])
+        self.assertEqual(forecast.fold(state, last_epoch, [(1800.0, {"tmp": 40.0})]), (3600.0, 0))
+        self.assertEqual(state["tmp"]["level"], 10.0)
+
+
+class ForecastApiTests(TestCase):
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        self.station = Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+
+    def upload(self, start, count, step=timedelta(minutes=30)):
+        data = []
+        for i in range(count):
+            ts = start + i * step
+            data.append({"ts": ts.strftime("%Y%m%d%H%M%S"), "tmp": round(diurnal(ts.replace(tzinfo=timezone.utc).timestamp()), 1), "hum": 60.0})
+        payload = {"id": "esp32-001", "data": data}
+        response = self.client.put("/api/weather/upload/", data=json.dumps(payload), content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+
+    def test_forecast_from_state(self):
+        """✅ Uploads update the state; the endpoint reads it without touching readings"""
+        self.upload(datetime(2025, 2, 20), 48)
+        self.upload(datetime(2025, 2, 21), 48)
+        row = ForecastState.objects.get(station=self.station)
+        self.assertEqual(row.count, 96)
+
+        with self.assertNumQueries(1, using="timeseries"), self.assertNumQueries(1, using="default"):
+            data = self.client.get("/api/forecast/esp32-001/?hours=3").json()
+        self.assertEqual(data["from"], "20250221233000")
+        self.assertEqual([p["ts"] for p in data["forecast"]], ["20250222003000", "20250222013000", "20250222023000"])
+        self.assertEqual(data["forecast"][0]["hum"], 60.0)
+        self.assertEqual(set(data["err"]), {"tmp", "hum"})
+
+    def test_state_seeded_from_history(self):
+        """✅ A station without state is seeded once from its stored readings"""
+        self.upload(datetime(2025, 2, 20), 10)
+        ForecastState.objects.all().delete()
+        self.upload(datetime(2025, 2, 20, 6), 2)
+        self.assertEqual(ForecastState.objects.get(station=self.station).count, 12)
+
+    def test_row_inserted_by_concurrent_first_upload(self):
+        """✅ A row another worker inserted first is locked and seeded, not inserted again (unique conflict)"""
+        self.upload(datetime(2025, 2, 20), 10)
+        ForecastState.objects.update(state={}, count=0)  # Other worker: row inserted, not seeded yet
+        self.upload(datetime(2025, 2, 20, 6), 2)
+        self.assertEqual(ForecastState.objects.get(station=self.station).count, 12)
+
+    def test_duplicate_timestamps_in_batch(self):
+        payload = {"id": "esp32-001", "data": [{"ts": "20250220100000", "tmp": t, "hum": 60.0} for t in (5.0, 6.0)]}
+        response = self.client.put("/api/weather/upload/", data=json.dumps(payload), content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(ForecastState.objects.get(station=self.station).count, 1)
+
+    def test_late_readings_skipped(self):
+        self.upload(datetime(2025, 2, 20, 12), 2)
+        self.upload(datetime(2025, 2, 20, 6), 2)
+        self.assertEqual(ForecastState.objects.get(station=self.station).count, 2)
+
+    def test_errors(self):
+        self.assertEqual(self.client.get("/api/forecast/esp32-001/").status_code, 404)  # No state yet
+        self.assertEqual(self.client.get("/api/forecast/unknown/").status_code, 404)
+        self.upload(datetime(2025, 2, 20), 1)
+        self.assertEqual(self.client.get("/api/forecast/esp32-001/?hours=0").status_code, 400)
+        self.assertEqual(self.client.get("/api/forecast/esp32-001/?hours=x").status_code, 400)
+        self.assertEqual(self.client.get("/api/forecast/esp32-001/").status_code, 200)
@@ -0,0 +1,63 @@
+import json
+from datetime import timedelta
+from django.test import TestCase
+from django.utils.timezone import now
+from api.models import Station, StationHealth
+
+
+class HealthIndexTests(TestCase):
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        self.station = Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+        Station.objects.create(station_ref="esp32-002", name="Silent Station")
+
+    def put(self, url, payload):
+        return self.client.put(url, data=json.dumps(payload), content_type="application/json")
+
+    def upload_weather(self, *timestamps):
+        data = [{"ts": ts, "tmp": 21.5, "hum": 50.0} for ts in timestamps]
+        return self.put("/api/weather/upload/", {"id": "esp32-001", "data": data})
+
+    def test_uploads_maintain_health_record(self):
+        """✅ Weather and status uploads refresh the station's health row"""
+        self.upload_weather("20250220120000", "20250220123000")
+        self.upload_weather("20250220110000")  # Older resync does not move the newest reading back
+        self.put("/api/status/upload/", {"id": "esp32-001", "upt": 1000, "mem": 15000, "wif": -70, "ts": "20250220123000"})
+
+        health = StationHealth.objects.get(station=self.station)
+        self.assertEqual(health.last_reading_at.strftime("%Y%m%d%H%M%S"), "20250220123000")
+        self.assertIsNotNone(health.last_weather_at)
+        self.assertEqual((health.free_heap, health.wifi_strength, health.sync_failures), (15000, -70, 0))
+
+    def test_rejected_uploads_count_as_failures(self):
+        """✅ Errors of a known station are counted until an upload is accepted"""
+        self.upload_weather("bad")
+        self.upload_weather("bad")
+        self.assertEqual(StationHealth.objects.get(station=self.station).sync_failures, 2)
+
+        self.upload_weather("20250220120000")
+        self.assertEqual(StationHealth.objects.get(station=self.station).sync_failures, 0)
+
+    def test_health_lists_stale_and_degraded_stations(self):
+        """✅ Flagged health rows filtered in SQL list stations never seen, stale or with low heap"""
+        self.upload_weather("20250220120000")
+        with self.assertNumQueries(1, using="default"), self.assertNumQueries(2, using="timeseries"):
+            data = self.client.get("/api/health/").json()  # Flagged rows, ids of stations with a row
+        self.assertEqual([s["id"] for s in data["stations"]], ["esp32-002"])
+        self.assertEqual(data["stations"][0]["issues"], ["stale"])
+
+        StationHealth.objects.filter(station=self.station).update(last_weather_at=now() - timedelta(hours=3), free_heap=1000)
+        data = self.client.get("/api/health/").json()
+        self.assertEqual(data["stations"][0]["id"], "esp32-001")
+        self.assertEqual(data["stations"][0]["issues"], ["stale", "low_heap"])
+
+        all_stations = self.client.get("/api/health/?all=1&stale=86400").json()["stations"]
+        self.assertEqual([s["issues"] for s in all_stations], [["low_heap"], ["stale"]])
+
+    def test_station_without_health_row_is_stale(self):
+        """✅ A station that never got a health row is listed, healthy stations are not"""
+        self.upload_weather("20250220120000")
+        StationHealth.objects.exclude(station=self.station).delete()
+        data = self.client.get("/api/health/").json()
+        self.assertEqual([(s["id"], s["issues"], s["fail"]) for s in data["stations"]], [("esp32-002", ["stale"], 0)])
@@ -0,0 +1,39 @@
+import json
+from django.test import TestCase
+from api.models import Station
+
+
+class HeatmapTests(TestCase):
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+        self.upload([("20250220100000", 20.0), ("20250220103000", 22.0), ("20250221230000", 5.0)])
+
+    def upload(self, readings):
+        payload = {"id": "esp32-001", "data": [{"ts": ts, "tmp": tmp, "hum": 50.0} for ts, tmp in readings]}
+        self.client.put("/api/weather/upload/", data=json.dumps(payload), content_type="application/json")
+
+    def get(self, query="metric=tmp&from=20250220&to=20250221&stats=minmax"):
+        return self.client.get(f"/api/heatmap/esp32-001/?{query}")
+
+    def test_heatmap_matrix(self):
+        """✅ One row per day, 24 hourly means with min/max"""
+        data = self.get().json()
+        self.assertEqual(data["days"], ["20250220", "20250221"])
+        self.assertEqual(len(data["mean"][0]), 24)
+        self.assertEqual((data["mean"][0][10], data["min"][0][10], data["max"][0][10]), (21.0, 20.0, 22.0))
+        self.assertIsNone(data["mean"][0][11])
+        self.assertEqual(data["mean"][1][23], 5.0)
+
+    def test_built_from_hourly_rollups(self):
+        """✅ One rollup query, no reading scanned; a late upload for a past day is reflected by every worker"""
+        with self.assertNumQueries(1, using="timeseries"), self.assertNumQueries(1, using="default"):
+            self.get()  # Station lookup, then the rollups of the range
+
+        self.upload([("20250220101500", 30.0)])
+        self.assertEqual(self.get().json()["max"][0][10], 30.0)
+        self.assertEqual(self.get().json()["mean"][0][10], 24.0)
+
+    def test_invalid_metric(self):
+        self.assertEqual(self.get("metric=wind").status_code, 400)
@@ -0,0 +1,73 @@
+import json
+import tempfile
+import warnings
+from io import StringIO
+from pathlib import Path
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
+from api.models import Station, WeatherData, DailySketch, DailyCoverage
+
+
+class ImportTestMixin:
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.dir = Path(tmp_dir.name)
+        self.station = Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+        Station.objects.create(station_ref="esp32-002", name="Second Station")
+
+    def write(self, name, content):
+        path = self.dir / name
+        path.write_text(content)
+        return str(path)
+
+
+class ImportIndexTests(ImportTestMixin, TransactionTestCase):
+    """ Index drop / rebuild needs the SQLite schema editor, unavailable inside TestCase's transaction """
+
+    def test_csv_import_with_dropped_indexes(self):
+        """✅ Chunked import, invalid rows rejected, aggregates maintained, indexes rebuilt"""
+        rows = "".join(f"202502201{m // 60}{m % 60:02d}00,{20 + m / 100:.2f},50\n" for m in range(0, 120, 5))
+        path = self.write("dump.csv", "ts,tmp,hum\n" + rows + "bad,1,2\n20250220130000,,50\n")
+
+        out = StringIO()
+        call_command("import_weather", path, station="esp32-001", chunk=7, drop_indexes=True, stdout=out, stderr=StringIO())
+
+        self.assertIn("24 readings imported, 2 rejected", out.getvalue())
+        self.assertEqual(WeatherData.objects.filter(station=self.station).count(), 24)
+        self.assertEqual(DailySketch.objects.get(station=self.station).count, 24)
+        self.assertEqual(bin(DailyCoverage.objects.get(station=self.station).bitmap).count("1"), 4)
+        self.assertEqual(WeatherData.objects.first().temperature, 20.0)  # Rounded like the API
+
+        index_names = {index.name for index in WeatherData._meta.indexes}
+        connection = connections[WeatherData.objects.db]
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, WeatherData._meta.db_table)
+        self.assertTrue(index_names <= set(constraints))
+
+
+class ImportWeatherTests(ImportTestMixin, TestCase):
+
+    def test_ndjson_records_and_upload_payloads(self):
+        lines = [
+            {"id": "esp32-001", "ts": "20250220120000", "tmp": 21.0, "hum": 50.0},
+            {"id": "esp32-002", "data": [{"ts": "20250220120000", "tmp": 5.0, "hum": 80.0}]},
+            {"id": "esp32-404", "ts": "20250220120000", "tmp": 1.0, "hum": 1.0},
+        ]
+        path = self.write("dump.ndjson", "\n".join(json.dumps(line) for line in lines) + "\nnot json\n")
+
+        out = StringIO()
+        filters = list(warnings.filters)
+        call_command("import_weather", path, stdout=out, stderr=StringIO())
+        self.assertIn("2 readings imported, 2 rejected, 2 stations", out.getvalue())
+        self.assertEqual(warnings.filters, filters)  # Naive datetime warnings only silenced during the import
+
+    def test_strict_stops_on_invalid_row(self):
+        path = self.write("dump.csv", "ts,tmp,hum\n20250220120000,xx,50\n")
+        with self.assertRaises(CommandError):
+            call_command("import_weather", path, station="esp32-001", strict=True, stdout=StringIO())
+        self.assertFalse(WeatherData.objects.exists())
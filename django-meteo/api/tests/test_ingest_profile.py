@@ -0,0 +1,44 @@
+import json
+import os
+import subprocess
+import sys
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from api.models import Station, WeatherData
+
+
+@override_settings(ROOT_URLCONF="meteo.urls_ingest", MIDDLEWARE=["api.profiling.ProfilingMiddleware"])
+class IngestProfileTests(TestCase):
+    """ meteo.settings_ingest routing: ESP32 endpoints only, without CSRF / session middleware """
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        self.station = Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+
+    def test_upload_and_lastupdate(self):
+        payload = {"id": "esp32-001", "data": [{"ts": "20250220120000", "tmp": 21.5, "hum": 50.0}]}
+        response = self.client.put("/api/weather/upload/", data=json.dumps(payload), content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(WeatherData.objects.filter(station=self.station).count(), 1)
+        self.assertEqual(self.client.get("/api/lastupdate/esp32-001/").status_code, 200)
+
+    def test_read_endpoints_not_served(self):
+        self.assertEqual(self.client.get("/api/history/esp32-001/").status_code, 404)
+
+
+class IngestStartupTests(SimpleTestCase):
+    def test_numpy_not_imported_at_startup(self):
+        """✅ A fresh meteo.settings_ingest worker loads its middleware and URLconf without importing NumPy"""
+        probe = (
+            "import sys\n"
+            "from django.core.wsgi import get_wsgi_application\n"
+            "get_wsgi_application()\n"
+            "from django.urls import get_resolver\n"
+            "get_resolver().url_patterns\n"
+            "print('numpy' in sys.modules)\n"
+        )
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE="meteo.settings_ingest")
+        result = subprocess.run(
+            [sys.executable, "-c", probe], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True
+        )
+        self.assertEqual(result.stdout.strip(), "False")
@@ -0,0 +1,64 @@
+import json
+from datetime import date
+from django.test import TestCase
+from api.models import Station, MinMaxData
+
+
+class MinMaxUploadTests(TestCase):
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        """✅ One station (no http_address, so no IP check) with raw readings on 2025-02-20"""
+        self.station = Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+        self.put("/api/weather/upload/", {
+            "id": "esp32-001",
+            "data": [
+                {"ts": "20250220060000", "tmp": 14.0, "hum": 40.0},
+                {"ts": "20250220150000", "tmp": 28.0, "hum": 55.0},
+            ]
+        })
+
+    def put(self, url, payload):
+        return self.client.put(url, data=json.dumps(payload), content_type="application/json")
+
+    def test_resync_updates_instead_of_duplicating(self):
+        """✅ Uploading the same day twice keeps a single row with the latest values"""
+        for tmax in (27.0, 28.0):
+            response = self.put("/api/minmax/upload/", {
+                "id": "esp32-001",
+                "data": [{"dt": "20250220", "tmin": 14.0, "tmax": tmax, "hmin": 40.0, "hmax": 55.0}]
+            })
+            self.assertEqual(response.status_code, 201)
+
+        rows = MinMaxData.objects.filter(station=self.station, date=date(2025, 2, 20))
+        self.assertEqual(rows.count(), 1)
+        self.assertEqual(rows.get().max_temperature, 28.0)
+        self.assertFalse(rows.get().mismatch)
+        self.assertIsNotNone(rows.get().reconciled_at)
+
+    def test_reconciliation_flags_disagreeing_days(self):
+        """✅ Device extremes far from the raw readings are flagged, days without readings are not checked"""
+        response = self.put("/api/minmax/upload/", {
+            "id": "esp32-001",
+            "data": [
+                {"dt": "20250220", "tmin": 14.0, "tmax": 35.0, "hmin": 40.0, "hmax": 55.0},
+                {"dt": "20250219", "tmin": 10.0, "tmax": 20.0, "hmin": 30.0, "hmax": 50.0},
+            ]
+        })
+        self.assertEqual(response.json()["mismatch"], 1)
+
+        self.assertTrue(MinMaxData.objects.get(date=date(2025, 2, 20)).mismatch)
+        unchecked = MinMaxData.objects.get(date=date(2025, 2, 19))
+        self.assertFalse(unchecked.mismatch)
+        self.assertIsNone(unchecked.reconciled_at)
+
+    def test_weather_upload_reconciles_touched_days(self):
+        """✅ A late raw reading that explains the device maximum clears the flag"""
+        self.put("/api/minmax/upload/", {
+            "id": "esp32-001",
+            "data": [{"dt": "20250220", "tmin": 14.0, "tmax": 35.0, "hmin": 40.0, "hmax": 55.0}]
+        })
+        self.assertTrue(MinMaxData.objects.get(date=date(2025, 2, 20)).mismatch)
+
+        self.put("/api/weather/upload/", {"id": "esp32-001", "data": [{"ts": "20250220160000", "tmp": 35.0, "hum": 50.0}]})
+        self.assertFalse(MinMaxData.objects.get(date=date(2025, 2, 20)).mismatch)
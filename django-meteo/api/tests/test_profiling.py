@@ -0,0 +1,52 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from api.models import Station
+from api.profiling import make_token
+from api.response_cache import responses
+
+
+class ProfilingTests(TestCase):
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        responses.clear()  # History bodies cached by an earlier test
+        self.addCleanup(responses.clear)
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.dir = Path(tmp_dir.name)
+        settings_override = override_settings(PROFILING_DIR=self.dir, PROFILING_SAMPLE_RATE=0.0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+
+    def test_unprofiled_by_default(self):
+        self.client.get("/api/minmax/history/esp32-001/", HTTP_X_METEO_PROFILE="forged")
+        self.assertEqual(list(self.dir.glob("*")), [])
+
+    def test_signed_header_writes_profile_and_sql(self):
+        """✅ A signed header profiles the request, SQL of both databases included"""
+        self.client.get("/api/minmax/history/esp32-001/", HTTP_X_METEO_PROFILE=make_token())
+
+        meta_path, = self.dir.glob("*.json")
+        meta = json.loads(meta_path.read_text())
+        self.assertTrue(meta_path.with_suffix(".prof").exists())
+        self.assertEqual((meta["view"], meta["status"]), ("maxima_history", 200))
+        self.assertEqual({q["db"] for q in meta["sql"]}, {"default", "timeseries"})
+
+        out = StringIO()
+        call_command("show_profiles", stdout=out)
+        self.assertIn("/api/minmax/history/esp32-001/", out.getvalue())
+        call_command("show_profiles", meta_path.stem, stdout=out)
+        self.assertIn("Slowest queries", out.getvalue())
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_KEEP=2)
+    def test_sampling_and_rotation(self):
+        """✅ Sampled requests are profiled and only the newest PROFILING_KEEP are kept"""
+        for _ in range(3):
+            self.client.get("/api/stations/")
+        self.assertEqual(len(list(self.dir.glob("*.json"))), 2)
+        self.assertEqual(len(list(self.dir.glob("*.prof"))), 2)
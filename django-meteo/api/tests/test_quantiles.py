@@ -0,0 +1,50 @@
+import json
+import numpy as np
+from django.test import TestCase
+from api.models import Station, WeatherData, DailySketch
+
+
+class QuantileTests(TestCase):
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        """✅ Two stations, two days of readings each"""
+        self.station, self.other = [Station.objects.create(station_ref=ref, name=ref) for ref in ("esp32-001", "esp32-002")]
+        self.put("esp32-001", [(f"2025022010{i:02d}00", 10.0 + i, 50.0) for i in range(10)])
+        self.put("esp32-001", [(f"2025022110{i:02d}00", 20.0 + i, 60.0) for i in range(10)])
+        self.put("esp32-002", [(f"2025022010{i:02d}00", -5.3, 90.0) for i in range(5)])
+
+    def put(self, ref, readings):
+        payload = {"id": ref, "data": [{"ts": ts, "tmp": tmp, "hum": hum} for ts, tmp, hum in readings]}
+        self.client.put("/api/weather/upload/", data=json.dumps(payload), content_type="application/json")
+
+    def test_sketch_maintained_at_ingest(self):
+        """✅ Batches of the same day merge into one sketch"""
+        self.put("esp32-002", [("20250220200000", -5.3, 91.0)])
+        sketch = DailySketch.objects.get(station=self.other)
+        self.assertEqual(sketch.count, 6)
+        self.assertEqual(sketch.temperature, {"-53": 6})
+        self.assertEqual(sketch.humidity, {"900": 5, "910": 1})
+
+    def test_station_quantiles_match_raw_readings(self):
+        """✅ Quantiles over merged days equal nearest-rank quantiles of the raw readings"""
+        response = self.client.get("/api/quantiles/esp32-001/?q=0.05,0.5,0.95&from=20250220&to=20250221")
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        self.assertEqual(data["n"], 20)
+        raw = np.sort(WeatherData.objects.filter(station=self.station).values_list("temperature", flat=True))
+        for label, q in (("0.05", 0.05), ("0.5", 0.5), ("0.95", 0.95)):
+            self.assertEqual(data["tmp"][label], raw[int(np.ceil(q * len(raw))) - 1])
+        self.assertEqual(data["hum"]["0.5"], 50.0)
+
+    def test_fleet_quantiles(self):
+        """✅ GET /api/quantiles/ merges stations, optionally restricted"""
+        data = self.client.get("/api/quantiles/?q=0,1&from=20250220&to=20250220").json()
+        self.assertEqual((data["n"], data["tmp"]["0"], data["tmp"]["1"]), (15, -5.3, 19.0))
+
+        data = self.client.get("/api/quantiles/?q=0&from=20250220&to=20250221&stations=esp32-001").json()
+        self.assertEqual(data["tmp"]["0"], 10.0)
+
+        self.assertEqual(self.client.get("/api/quantiles/?q=1.5").status_code, 400)
+        self.assertIsNone(self.client.get("/api/quantiles/?from=20240101&to=20240102").json()["tmp"]["0.5"])
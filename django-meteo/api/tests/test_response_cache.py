@@ -0,0 +1,106 @@
+import json
+import threading
+import time
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.db.models import F
+from api.models import Station, StationVersion
+from api.response_cache import SingleFlight, responses
+
+
+class ResponseCacheTests(TestCase):
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        responses.clear()
+        self.addCleanup(responses.clear)
+        Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+        self.upload("20250220120000", 21.5)
+
+    def upload(self, ts, tmp):
+        payload = {"id": "esp32-001", "data": [{"ts": ts, "tmp": tmp, "hum": 50.0}]}
+        self.client.put("/api/weather/upload/", data=json.dumps(payload), content_type="application/json")
+
+    def test_repeated_reads_served_from_cache(self):
+        """✅ Second identical read only looks up the station version"""
+        first = self.client.get("/api/history/esp32-001/")
+        with self.assertNumQueries(0, using="default"), self.assertNumQueries(1, using="timeseries"):
+            second = self.client.get("/api/history/esp32-001/")
+        self.assertEqual((first["X-Cache"], second["X-Cache"]), ("miss", "hit"))
+        self.assertEqual(first.content, second.content)
+
+        metrics = self.client.get("/api/metrics/").json()["cache"]
+        self.assertEqual(metrics["entries"], 1)
+        self.assertGreaterEqual(metrics["hits"], 1)
+
+    def test_ingest_invalidates_station(self):
+        """✅ An upload bumps the station version: next read sees the new reading"""
+        self.client.get("/api/history/esp32-001/")
+        self.upload("20250220123000", 30.0)
+        response = self.client.get("/api/history/esp32-001/")
+        self.assertEqual(response["X-Cache"], "miss")
+        self.assertEqual(response.json()["history"][0]["tmp"], 30.0)
+
+    def test_version_bumped_by_another_worker(self):
+        """✅ The version lives in the database: a bump from an ingest worker reaches this worker's cache"""
+        self.client.get("/api/history/esp32-001/")
+        StationVersion.objects.filter(station_ref="esp32-001").update(version=F("version") + 1)  # Other process
+        self.assertEqual(self.client.get("/api/history/esp32-001/")["X-Cache"], "miss")
+
+    def test_version_reset_not_matched(self):
+        """✅ A counter restarting from scratch (flush, database reset) does not match responses cached before"""
+        self.client.get("/api/history/esp32-001/")
+        version = StationVersion.objects.get(station_ref="esp32-001").version
+        StationVersion.objects.all().delete()
+        StationVersion.objects.create(station_ref="esp32-001", version=version)
+        self.assertEqual(self.client.get("/api/history/esp32-001/")["X-Cache"], "miss")
+
+    def test_unknown_station_not_cached(self):
+        self.client.get("/api/minmax/history/esp32-404/")
+        self.assertEqual(self.client.get("/api/minmax/history/esp32-404/")["X-Cache"], "miss")
+
+    @override_settings(RESPONSE_CACHE_MAX_ENTRIES=2)
+    def test_lru_eviction(self):
+        """✅ Least recently used response is evicted past the entry limit"""
+        for query in ("", "?resample=1h&to=20250221", ""):
+            self.client.get(f"/api/history/esp32-001/{query}")
+        self.client.get("/api/minmax/history/esp32-001/")
+        self.assertEqual(len(responses), 2)
+        self.assertEqual(self.client.get("/api/history/esp32-001/")["X-Cache"], "hit")
+        self.assertEqual(self.client.get("/api/history/esp32-001/?resample=1h&to=20250221")["X-Cache"], "miss")
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_calls_share_one_computation(self):
+        """✅ Callers arriving while a computation runs reuse its result"""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return "body"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do("k", compute))) for _ in range(4)]
+        threads[0].start()
+        while not calls:
+            time.sleep(0.001)
+        for thread in threads[1:]:
+            thread.start()
+        while flight.waiting("k") < 3:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [("body", False)] + [("body", True)] * 3)
+        self.assertEqual(flight.do("k", lambda: "next"), ("next", False))  # Finished flights are not reused
+
+    def test_error_propagates_and_clears_flight(self):
+        flight = SingleFlight()
+        with self.assertRaises(ValueError):
+            flight.do("k", lambda: int("x"))
+        self.assertEqual(flight.waiting("k"), 0)
+        self.assertEqual(flight.do("k", lambda: 1), (1, False))
@@ -0,0 +1,66 @@
+import importlib
+from types import SimpleNamespace
+from django.apps import apps
+from django.db import connections
+from django.test import TestCase
+from django.utils.timezone import now
+from api.models import Station, WeatherData, SystemStatus
+
+
+class TimeSeriesRouterTests(TestCase):
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        self.station = Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+        WeatherData.objects.create(station=self.station, timestamp=now(), temperature=22.5, humidity=60.0)
+        SystemStatus.objects.create(station=self.station, uptime_ms=1000, free_heap=200000, wifi_strength=-70)
+
+    def test_readings_live_in_timeseries_database(self):
+        """✅ Readings go to the time-series DB, stations stay in default"""
+        self.assertEqual(WeatherData.objects.get().station._state.db, "default")
+        self.assertEqual(WeatherData.objects.get()._state.db, "timeseries")
+
+        default_tables = connections["default"].introspection.table_names()
+        self.assertIn("api_station", default_tables)
+        self.assertNotIn("api_weatherdata", default_tables)
+
+    def test_station_deletion_cascades_across_databases(self):
+        """✅ Deleting a station removes its readings from the time-series DB"""
+        self.station.delete()
+        self.assertFalse(WeatherData.objects.exists())
+        self.assertFalse(SystemStatus.objects.exists())
+
+
+class LegacyTablesMigrationTests(TestCase):
+    databases = {"default", "timeseries"}
+    migration = importlib.import_module("api.migrations.0016_drop_legacy_timeseries_tables")
+
+    def setUp(self):
+        self.station = Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+        with connections["default"].cursor() as cursor:
+            # Pre-0007 table left in default by an upgrade, FK-constrained to api_station
+            cursor.execute(
+                "CREATE TABLE api_weatherdata (id integer PRIMARY KEY, station_id bigint REFERENCES api_station (id), "
+                "timestamp datetime, temperature real, humidity real)"
+            )
+            cursor.executemany(
+                "INSERT INTO api_weatherdata VALUES (%s, %s, '2025-02-20 10:00:00', 21.5, 50.0)",
+                [(pk, self.station.pk) for pk in (1, 2, 3)],
+            )
+
+    def drop(self):
+        self.migration.drop_legacy_timeseries_tables(apps, SimpleNamespace(connection=connections["timeseries"]))
+
+    def test_dropped_once_copied(self):
+        """✅ Legacy readings table removed from default when all its rows are in the time-series DB"""
+        for pk in (1, 2, 3, 4):
+            WeatherData.objects.create(id=pk, station=self.station, timestamp=now(), temperature=21.5, humidity=50.0)
+        self.drop()
+        self.assertNotIn("api_weatherdata", connections["default"].introspection.table_names())
+        self.assertEqual(WeatherData.objects.count(), 4)
+
+    def test_kept_when_copy_incomplete(self):
+        WeatherData.objects.create(id=1, station=self.station, timestamp=now(), temperature=21.5, humidity=50.0)
+        with self.assertRaisesMessage(RuntimeError, "2 rows of api_weatherdata"):
+            self.drop()
+        self.assertIn("api_weatherdata", connections["default"].introspection.table_names())
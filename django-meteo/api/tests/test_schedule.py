@@ -0,0 +1,84 @@
+import json
+from io import StringIO
+import numpy as np
+from django.core.management import call_command
+from django.db import connections
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from api.models import Station, StationHealth
+from api.schedule import best_slot, choose_slot, rebalance
+
+
+class SlotChoiceTests(SimpleTestCase):
+    def test_empty_period_fills_evenly(self):
+        loads = np.zeros(360)
+        chosen = []
+        for _ in range(4):
+            slot = best_slot(loads)
+            chosen.append(slot)
+            loads[slot] += 1
+        self.assertEqual(chosen, [0, 180, 90, 270])
+
+    def test_moves_only_when_clearly_lighter(self):
+        loads = np.array([300.0, 0.0, 40.0, 40.0])
+        self.assertEqual(choose_slot(loads, 0, own_cost=50), 1)
+        self.assertEqual(choose_slot(np.array([30.0, 0.0, 40.0, 40.0]), 0, own_cost=50), 0)
+
+
+class SyncScheduleTests(TestCase):
+    databases = {"default", "timeseries"}
+
+    def test_lastupdate_assigns_stable_spread_offsets(self):
+        """✅ Each station gets its own offset, kept on later requests"""
+        for ref in ("esp32-001", "esp32-002"):
+            Station.objects.create(station_ref=ref, name=ref)
+        first = self.client.get("/api/lastupdate/esp32-001/").json()
+        second = self.client.get("/api/lastupdate/esp32-002/").json()
+        self.assertEqual((first["offset"], second["offset"]), (0, 1800))
+        self.assertTrue(0 < second["wait"] <= 3600)
+        self.assertEqual(self.client.get("/api/lastupdate/esp32-001/").json()["offset"], 0)
+
+    def test_slot_assigned_at_creation_and_only_read_by_lastupdate(self):
+        """✅ lastupdate reads the station's own row: no scan of the fleet, no write"""
+        station = Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+        self.assertEqual(StationHealth.objects.get(station=station).sync_offset, 0)
+        with self.assertNumQueries(2, using="timeseries"):  # Latest reading, own sync offset
+            self.assertEqual(self.client.get("/api/lastupdate/esp32-001/").json()["offset"], 0)
+
+    def test_unassigned_station_gets_slot_on_first_request(self):
+        station = Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+        Station.objects.create(station_ref="esp32-002", name="Other Station")
+        StationHealth.objects.filter(station=station).delete()  # Created before slots were assigned
+        self.assertEqual(self.client.get("/api/lastupdate/esp32-001/").json()["offset"], 0)
+        self.assertEqual(StationHealth.objects.get(station=station).sync_offset, 0)
+
+    def test_rebalance_moves_station_off_heavy_slot(self):
+        """✅ manage.py rebalance_sync_schedule follows the measured ingest cost"""
+        for ref in ("esp32-001", "esp32-002", "esp32-003"):
+            Station.objects.create(station_ref=ref, name=ref)
+        StationHealth.objects.update(sync_offset=0, ingest_ms=100.0)
+        out = StringIO()
+        call_command("rebalance_sync_schedule", stdout=out)
+        self.assertIn("1 stations moved", out.getvalue())  # The others are not lighter by more than their cost
+        self.assertEqual(sorted(StationHealth.objects.values_list("sync_offset", flat=True))[:2], [0, 0])
+        call_command("rebalance_sync_schedule", stdout=out)
+        self.assertIn("0 stations moved", out.getvalue())
+
+    def test_rebalance_queries_do_not_scale_with_fleet(self):
+        """✅ Offsets and costs read once, moved offsets written by one bulk update"""
+        def queries(n):
+            Station.objects.all().delete()
+            for i in range(n):
+                Station.objects.create(station_ref=f"esp32-{i:03d}", name=f"Station {i}")
+            StationHealth.objects.update(sync_offset=0, ingest_ms=100.0)
+            with CaptureQueriesContext(connections["timeseries"]) as ctx:
+                self.assertGreater(rebalance(), 0)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(queries(3), queries(12))
+
+    def test_upload_records_ingest_cost(self):
+        station = Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+        payload = {"id": "esp32-001", "data": [{"ts": "20250220120000", "tmp": 21.5, "hum": 50.0}]}
+        self.client.put("/api/weather/upload/", data=json.dumps(payload), content_type="application/json")
+        self.assertGreater(StationHealth.objects.get(station=station).ingest_ms, 0)
@@ -0,0 +1,109 @@
+import json
+from datetime import datetime, timezone
+from io import StringIO
+from unittest import mock
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase, SimpleTestCase, override_settings
+from api.models import Station, WeatherData, PackedDay, DailySketch
+from api.response_cache import responses
+from api.storage import encode_day, decode_day
+
+
+READINGS = [
+    {"ts": "20250220100000", "tmp": -3.4, "hum": 60.0},
+    {"ts": "20250220103000", "tmp": 21.7, "hum": 58.5},
+    {"ts": "20250221000500", "tmp": 12.0, "hum": 99.9},
+]
+
+
+class PackedEncodingTests(SimpleTestCase):
+
+    def test_roundtrip(self):
+        """✅ Delta-encoded int16 tenths decode to the stored values"""
+        seconds = np.array([0, 1800, 86399])
+        tmp, hum = np.array([-40.0, 59.9, 12.3]), np.array([0.0, 100.0, 45.6])
+        times, tmp_b, hum_b = encode_day(seconds, tmp, hum)
+        self.assertEqual(len(tmp_b), 6)  # 2 bytes per reading
+
+        s, t, h = decode_day(times, tmp_b, hum_b)
+        np.testing.assert_array_equal(s, seconds)
+        np.testing.assert_allclose(t, tmp)
+        np.testing.assert_allclose(h, hum)
+
+    def test_out_of_int16_range(self):
+        """✅ A day with a sentinel reading falls back to int32 deltas instead of wrapping"""
+        seconds = np.array([0, 60, 120])
+        tmp, hum = np.array([21.5, 9999.0, 21.6]), np.array([50.0, 50.0, 50.0])
+        times, tmp_b, hum_b = encode_day(seconds, tmp, hum)
+        self.assertEqual((len(tmp_b), len(hum_b)), (12, 6))
+
+        _, t, h = decode_day(times, tmp_b, hum_b)
+        np.testing.assert_allclose(t, tmp)
+        np.testing.assert_allclose(h, hum)
+        with self.assertRaises(ValueError):
+            encode_day(seconds, np.array([21.5, np.nan, 1e12]), hum)
+
+
+class StorageBackendTests(TestCase):
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        responses.clear()  # History bodies cached by an earlier test
+        self.addCleanup(responses.clear)
+        self.station = Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+        # lastupdate's "wait" counts down with the clock: freeze it so responses compare equal
+        clock = mock.patch("api.schedule.now", return_value=datetime(2025, 2, 21, 12, tzinfo=timezone.utc))
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def upload(self, readings):
+        payload = {"id": "esp32-001", "data": readings}
+        return self.client.put("/api/weather/upload/", data=json.dumps(payload), content_type="application/json")
+
+    def responses(self):
+        return [
+            self.client.get(url).json() for url in (
+                "/api/history/esp32-001/",
+                "/api/lastreport/esp32-001/",
+                "/api/lastupdate/esp32-001/",
+                "/api/analytics/esp32-001/?from=20250220&to=20250221",
+                "/api/history/esp32-001/?resample=1h&from=20250220&to=20250221",
+            )
+        ]
+
+    def test_packed_backend_is_transparent(self):
+        """✅ Same API responses with one PackedDay per station-day and no WeatherData rows"""
+        self.upload(READINGS)
+        expected = self.responses()
+        WeatherData.objects.all().delete()
+
+        with override_settings(WEATHER_STORAGE="packed"):
+            self.upload(READINGS[:1])
+            self.upload(READINGS[1:] + READINGS[:1])  # Resent reading replaces, not duplicates
+            self.assertEqual(PackedDay.objects.count(), 2)
+            self.assertFalse(WeatherData.objects.exists())
+            self.assertEqual(self.responses(), expected)
+
+    def test_packed_resent_readings_counted_once_in_sketches(self):
+        """✅ Quantile sketches count the readings kept by the packed storage, not the resent ones"""
+        with override_settings(WEATHER_STORAGE="packed"):
+            self.upload(READINGS)
+            self.upload(READINGS[:2])
+            self.upload([{**READINGS[0], "tmp": 5.0}])  # Corrected value replaces the stored one
+        sketch = DailySketch.objects.get(date="2025-02-20")
+        self.assertEqual(sketch.count, 2)
+        self.assertEqual(sketch.temperature, {"50": 1, "217": 1})
+        self.assertEqual(sum(PackedDay.objects.values_list("count", flat=True)), 3)
+
+    def test_pack_weather_command(self):
+        """✅ manage.py pack_weather converts existing rows"""
+        self.upload(READINGS)
+        expected = self.responses()
+        call_command("pack_weather", "--delete", stdout=StringIO())
+
+        self.assertFalse(WeatherData.objects.exists())
+        self.assertEqual(sum(PackedDay.objects.values_list("count", flat=True)), 3)
+        with override_settings(WEATHER_STORAGE="packed"):
+            self.assertEqual(self.client.get("/api/history/esp32-001/")["X-Cache"], "miss")  # Version bumped
+            self.assertEqual(self.responses(), expected)
@@ -0,0 +1,169 @@
+import gzip
+import json
+import tempfile
+import threading
+import zlib
+from datetime import datetime, timedelta
+from unittest import mock
+from django.db import connections
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from api import ingest, streaming
+from api.models import Station, WeatherData, SystemStatus
+
+
+def readings(n, start_hour=0):
+    start = datetime(2025, 2, 20) + timedelta(hours=start_hour)
+    return [
+        {"ts": (start + timedelta(hours=i)).strftime("%Y%m%d%H%M%S"), "tmp": 20.0 + i % 7, "hum": 50.0}
+        for i in range(n)
+    ]
+
+
+class StreamingDecodeTests(SimpleTestCase):
+    def decode(self, text, chunk_size):
+        body = text.encode("utf-8")
+        chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+        return {key: list(value) if streaming.is_stream(value) else value for key, value in streaming.iter_members(chunks)}
+
+    def test_same_result_as_json_loads_for_any_chunking(self):
+        """✅ Tokens, numbers and multi-byte characters split across chunk boundaries"""
+        text = json.dumps({"id": "esp32-é01", "n": 12345.25, "data": [{"ts": "20250220100000", "tmp": -3.25, "hum": 61}, {}], "x": [1]})
+        for chunk_size in (1, 2, 3, 7, 64):
+            self.assertEqual(self.decode(text, chunk_size), json.loads(text))
+
+    def test_malformed(self):
+        for text in ('{"id": "a", "data": [{"ts": 1} {"ts": 2}]}', '{"id": "a"', '[1, 2]', '{"id": "a"} x', '{1: 2}'):
+            with self.assertRaises(json.JSONDecodeError, msg=text):
+                self.decode(text, 4)
+
+
+class CompressedUploadTests(TestCase):
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+
+    def put(self, payload, encoding=None, compress=None, path="/api/weather/upload/"):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        headers = {"HTTP_CONTENT_ENCODING": encoding} if encoding else {}
+        return self.client.put(path, data=compress(body) if compress else body, content_type="application/json", **headers)
+
+    def test_gzip_and_deflate(self):
+        """✅ gzip, zlib-wrapped deflate and raw deflate bodies"""
+        raw_deflate = lambda body: zlib.compress(body, wbits=-zlib.MAX_WBITS)
+        for encoding, compress, start in (("gzip", gzip.compress, 0), ("deflate", zlib.compress, 10), ("deflate", raw_deflate, 20)):
+            response = self.put({"id": "esp32-001", "data": readings(3, start)}, encoding, compress)
+            self.assertEqual(response.status_code, 201, encoding)
+            self.assertEqual(response.json()["count"], 3)
+        self.assertEqual(WeatherData.objects.count(), 9)
+
+    def test_stored_in_fixed_size_batches(self):
+        """✅ A large upload reaches the storage WEATHER_UPLOAD_BATCH readings at a time"""
+        with override_settings(WEATHER_UPLOAD_BATCH=100), mock.patch("api.ingest.store_weather", wraps=ingest.store_weather) as store:
+            response = self.put({"id": "esp32-001", "data": readings(250)}, "gzip", gzip.compress)
+        self.assertEqual(response.json()["count"], 250)
+        self.assertEqual([len(call.args[1]) for call in store.call_args_list], [100, 100, 50])
+        self.assertEqual(WeatherData.objects.count(), 250)
+
+    def test_invalid_reading_stores_nothing(self):
+        """✅ All-or-nothing, even when earlier batches were already written"""
+        data = readings(5) + [{"ts": "2025-02-21", "tmp": 1.0, "hum": 1.0}]
+        with override_settings(WEATHER_UPLOAD_BATCH=2):
+            response = self.put({"id": "esp32-001", "data": data})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(WeatherData.objects.exists())
+
+    def test_bad_tail_stores_nothing(self):
+        """✅ Readings are stored only once the whole body is decoded: a complete "data" array is not enough"""
+        payload = {"id": "esp32-001", "data": readings(3), "v": 1}
+        body = json.dumps(payload).encode("utf-8")
+        self.assertEqual(self.put(payload, "gzip", lambda body: gzip.compress(body)[:-10]).status_code, 400)  # Truncated
+        self.assertEqual(self.put(body[:-1]).status_code, 400)  # No closing brace
+        self.assertEqual(self.put(body[:-2] + b"x}").status_code, 400)  # Malformed trailing member
+        self.assertFalse(WeatherData.objects.exists())
+
+    def test_data_before_id(self):
+        body = b'{"data": ' + json.dumps(readings(2)).encode() + b', "id": "esp32-001"}'
+        self.assertEqual(self.put(body).json()["count"], 2)
+
+    def test_body_errors(self):
+        payload = {"id": "esp32-001", "data": readings(50)}
+        self.assertEqual(self.put(payload, "br", lambda body: body).status_code, 415)
+        self.assertEqual(self.put(payload, "gzip", lambda body: gzip.compress(body)[:40]).status_code, 400)  # Truncated
+        self.assertEqual(self.put(payload, "gzip").status_code, 400)  # Not compressed
+        with override_settings(WEATHER_UPLOAD_MAX_BYTES=1000):
+            self.assertEqual(self.put(payload, "gzip", gzip.compress).status_code, 413)
+        self.assertEqual(self.put({"id": "esp32-001", "data": "x"}).status_code, 400)
+        self.assertEqual(self.put({"id": "esp32-001"}).status_code, 400)
+        self.assertFalse(WeatherData.objects.exists())
+
+    def test_compressed_status_upload(self):
+        payload = {"id": "esp32-001", "ts": "20250220100000", "mem": 120000, "wif": -60, "upt": 3600}
+        response = self.put(payload, "gzip", gzip.compress, path="/api/status/upload/")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertTrue(SystemStatus.objects.exists())
+
+    def test_large_upload_streams_through_capture(self):
+        """✅ With traffic capture on, a body over CAPTURE_MAX_BODY is not buffered by the middleware"""
+        payload = {"id": "esp32-001", "data": readings(300)}
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            CAPTURE_SAMPLE_RATE=1.0, CAPTURE_DIR=directory, CAPTURE_MAX_BODY=1000, DATA_UPLOAD_MAX_MEMORY_SIZE=2000
+        ):
+            self.assertEqual(self.put(payload).json()["count"], 300)
+
+
+class PausingBody:
+    """ wsgi.input that stops after `pause_at` bytes until `resume` is set, like an ESP32 on a slow link """
+
+    def __init__(self, body, pause_at):
+        self.body, self.pos, self.pause_at = body, 0, pause_at
+        self.paused, self.resume = threading.Event(), threading.Event()
+
+    def read(self, size=-1):
+        if self.pos == self.pause_at:
+            self.paused.set()
+            self.resume.wait(timeout=10)
+        end = len(self.body) if size is None or size < 0 else self.pos + size
+        if self.pos < self.pause_at:
+            end = min(end, self.pause_at)
+        chunk = self.body[self.pos:end]
+        self.pos += len(chunk)
+        return chunk
+
+    readline = read
+
+
+class SlowUploadTests(TransactionTestCase):
+    """ Concurrent uploads need committed data and their own connections, not TestCase's transaction """
+    databases = {"default", "timeseries"}
+
+    def setUp(self):
+        Station.objects.create(station_ref="esp32-001", name="Test Weather Station")
+        Station.objects.create(station_ref="esp32-002", name="Second Weather Station")
+
+    def put(self, payload, **extra):
+        body = json.dumps(payload).encode("utf-8")
+        return Client().put("/api/weather/upload/", data=body, content_type="application/json", **extra)
+
+    def test_slow_body_does_not_block_other_uploads(self):
+        """✅ No transaction is held while a body is still arriving: another station uploads meanwhile"""
+        payload = {"id": "esp32-001", "data": readings(6)}
+        body = json.dumps(payload).encode("utf-8")
+        slow = PausingBody(body, pause_at=body.index(readings(6)[3]["ts"].encode()))  # Mid fourth reading
+        responses = {}
+
+        def slow_upload():
+            responses["slow"] = self.put(payload, **{"wsgi.input": slow})
+            connections.close_all()
+
+        with override_settings(WEATHER_UPLOAD_BATCH=2):
+            thread = threading.Thread(target=slow_upload)
+            thread.start()
+            self.assertTrue(slow.paused.wait(timeout=10))  # Two batches decoded, body incomplete
+            responses["fast"] = self.put({"id": "esp32-002", "data": readings(2)})
+            slow.resume.set()
+            thread.join()
+
+        self.assertEqual(responses["fast"].status_code, 201, responses["fast"].content)
+        self.assertEqual(responses["slow"].status_code, 201, responses["slow"].content)
+        self.assertEqual(WeatherData.objects.count(), 8)
@@ -1,17 +1,30 @@
 from django.urls import path
 from .views import (
     list_stations, status, last_report, history, maxima_history, 
-    last_update, receive_weather_data, receive_minmax_data, receive_status_data
+    last_update, station_analytics, station_coverage, fleet_coverage,
+    station_quantiles, fleet_quantiles, station_heatmap, station_forecast, fleet_aggregate, list_alerts, fleet_health, worker_metrics, batch, receive_weather_data, receive_minmax_data, receive_status_data
 )
 
 urlpatterns = [
     path('stations/', list_stations, name="list_stations"),  # ✅ Android app only
+    path('status/upload/', receive_status_data, name="receive_status_data"),  # ✅ Before status/<id>/, which would capture it
     path('status/<str:station_ref>/', status, name="status"),  # ✅ Matches /api/status/<id>/
     path('lastreport/<str:station_ref>/', last_report, name="last_report"),  # ✅ Matches /api/lastreport/<id>/
     path('history/<str:station_ref>/', history, name="history"),  # ✅ Matches /api/history/<id>/
     path('minmax/history/<str:station_ref>/', maxima_history, name="maxima_history"),  # 🔄 FIXED path
+    path('analytics/<str:station_ref>/', station_analytics, name="station_analytics"),  # ✅ Derived metrics (NumPy)
+    path('coverage/', fleet_coverage, name="fleet_coverage"),  # ✅ Missing intervals of every station
+    path('coverage/<str:station_ref>/', station_coverage, name="station_coverage"),  # ✅ 30-min slot coverage bitmap
+    path('quantiles/', fleet_quantiles, name="fleet_quantiles"),  # ✅ Quantiles merged across stations
+    path('quantiles/<str:station_ref>/', station_quantiles, name="station_quantiles"),  # ✅ Quantiles from daily sketches
+    path('heatmap/<str:station_ref>/', station_heatmap, name="station_heatmap"),  # ✅ Day × hour-of-day matrix
+    path('forecast/<str:station_ref>/', station_forecast, name="station_forecast"),  # ✅ Next hours estimate
+    path('fleet/aggregate/', fleet_aggregate, name="fleet_aggregate"),  # ✅ Per-location aggregates + correlations
+    path('health/', fleet_health, name="fleet_health"),  # ✅ Stale or degraded stations
+    path('batch/', batch, name="batch"),  # ✅ Several reads in one request (Android app)
+    path('metrics/', worker_metrics, name="worker_metrics"),  # ✅ Cache counters of this worker
+    path('alerts/', list_alerts, name="list_alerts"),  # ✅ Fired threshold alerts
     path('lastupdate/<str:station_ref>/', last_update, name="last_update"),  # ✅ Matches /api/lastupdate/<id>/
     path('weather/upload/', receive_weather_data, name="receive_weather_data"),  # ✅ Matches /api/weather/upload/
     path('minmax/upload/', receive_minmax_data, name="receive_minmax_data"),  # ✅ Matches /api/minmax/upload/
-    path('status/upload/', receive_status_data, name="receive_status_data"),  # ✅ ADDED /api/status/upload/
 ]
@@ -1,24 +1,57 @@
-from django.http import JsonResponse
-from django.utils.timezone import now, timedelta
-from django.db.models import Min, Max
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.http import JsonResponse, QueryDict
+from django.utils.timezone import now, timedelta, make_aware
 from django.views.decorators.csrf import csrf_exempt
+import copy
+import itertools
 import json
+import math
+import os
+import struct
+import tempfile
+import time
 #from django.utils.dateparse import parse_datetime
-from .models import Station, WeatherData, MinMaxData, SystemStatus
+from .models import Station, WeatherData, MinMaxData, SystemStatus, DailySketch, Alert, ForecastState, StationHealth
+from .reconciliation import reconcile_minmax
+from . import alerts, analytics, coverage, forecast, health, heatmap, ingest, response_cache, rollups, schedule, sketches, streaming
+from .ingest import parse_custom_datetime
+from .response_cache import cached_station_response
+from .storage import get_storage, daily_extremes
 
 from django.utils.timezone import localtime
 
 
 from datetime import datetime
 
-def parse_custom_datetime(ts):
-    """ Convert 'YYYYMMDDHHMISS' to a valid datetime object. """
-    try:
-        return datetime.strptime(ts, "%Y%m%d%H%M%S")
-    except ValueError:
-        return None
 
 
+def parse_range_bound(value, end=False):
+    """ Convert a 'YYYYMMDD' or 'YYYYMMDDHHMISS' query parameter to an aware datetime.
+    A date used as the end of a range includes that whole day. """
+    if len(value) == 8:
+        try:
+            bound = datetime.strptime(value, "%Y%m%d")
+        except ValueError:
+            raise ValueError(f"Invalid date format: {value}")
+        if end:
+            bound += timedelta(days=1)
+    else:
+        bound = parse_custom_datetime(value)
+        if not bound:
+            raise ValueError(f"Invalid timestamp format: {value}")
+    return make_aware(bound)
+
+
+def parse_time_range(request, default_days=7):
+    """ Read `?from=&to=` into a [start, end) range, defaulting to the last `default_days` days """
+    end = parse_range_bound(request.GET["to"], end=True) if request.GET.get("to") else now()
+    start = parse_range_bound(request.GET["from"]) if request.GET.get("from") else end - timedelta(days=default_days)
+    if start >= end:
+        raise ValueError("'from' must be before 'to'")
+    return start, end
+
 
 def get_client_ip(request):
     """ Retrieve the IP address of the device making the request """
@@ -51,69 +84,92 @@ def list_stations(request):
     return JsonResponse(response)
 
 
+def status_payload(station):
+    latest_status = SystemStatus.objects.filter(station=station).order_by('-timestamp').first()
+    if not latest_status:
+        return {"error": "No system status available"}
+    return {
+        "id": station.station_ref,
+        "ts": latest_status.timestamp.strftime("%Y%m%d%H%M%S"),
+        "upt": latest_status.uptime_ms,
+        "mem": latest_status.free_heap,
+        "wif": latest_status.wifi_strength
+    }
+
+
 # ✅ **GET /api/status/<station_ref>/** - Get ESP32 system status
 def status(request, station_ref):
     try:
         station = Station.objects.get(station_ref=station_ref)
-        latest_status = SystemStatus.objects.filter(station=station).order_by('-timestamp').first()
-
-        if latest_status:
-            response = {
-                "id": station_ref,
-                "ts": latest_status.timestamp.strftime("%Y%m%d%H%M%S"),
-                "upt": latest_status.uptime_ms,
-                "mem": latest_status.free_heap,
-                "wif": latest_status.wifi_strength
-            }
-        else:
-            response = {"error": "No system status available"}
-
+        response = status_payload(station)
     except Station.DoesNotExist:
         response = {"error": "Station not found"}
 
     return JsonResponse(response)
 
 
+def last_report_payload(station, latest):
+    """ `latest`: (ts, tmp, hum) arrays of the newest readings, newest first """
+    ts, tmp, hum = latest
+    if not len(ts):
+        return {"error": "No weather data available"}
+    return {
+        "id": station.station_ref,
+        "ts": analytics.format_epochs(ts[:1])[0],
+        "tmp": round(float(tmp[0]), 1),  # ✅ Ensure 1 decimal precision
+        "hum": round(float(hum[0]), 1)  # ✅ Ensure 1 decimal precision
+    }
+
+
 # ✅ **GET /api/lastreport/<station_ref>/** - Get latest weather report 
 def last_report(request, station_ref):
     try:
         station = Station.objects.get(station_ref=station_ref)
-        latest_data = WeatherData.objects.filter(station=station).order_by('-timestamp').first()
-
-        if latest_data:
-            response = {
-                "id": station_ref,
-                "ts": latest_data.timestamp.strftime("%Y%m%d%H%M%S"),
-                "tmp": round(latest_data.temperature, 1),  # ✅ Ensure 1 decimal precision
-                "hum": round(latest_data.humidity, 1)  # ✅ Ensure 1 decimal precision
-            }
-        else:
-            response = {"error": "No weather data available"}
-
+        response = last_report_payload(station, get_storage().latest(station, 1))
     except Station.DoesNotExist:
         response = {"error": "Station not found"}
 
     return JsonResponse(response)
 
 
+# Readings returned by the raw history
+HISTORY_LENGTH = 50
+
+
+def history_payload(station, latest):
+    """ `latest`: (ts, tmp, hum) arrays of the newest readings, newest first """
+    ts, tmp, hum = (values[:HISTORY_LENGTH] for values in latest)
+    return {
+        "id": station.station_ref,
+        "history": [
+            {
+                "ts": t,
+                "tmp": tmp_value,  # ✅ Ensure 1 decimal precision
+                "hum": hum_value  # ✅ Ensure 1 decimal precision
+            }
+            for t, tmp_value, hum_value in zip(
+                analytics.format_epochs(ts), analytics.to_json_list(tmp), analytics.to_json_list(hum)
+            )
+        ]
+    }
+
+
+def history_cache_key(request):
+    """ Raw history only changes on ingest; a resampled range ending "now" also moves with the clock """
+    if request.GET.get("resample") and not request.GET.get("to"):
+        return None
+    return ()
+
 
 # ✅ **GET /api/history/<station_ref>/** - Get ESP32 weather history 
+@cached_station_response(history_cache_key)
 def history(request, station_ref):
+    if request.GET.get("resample"):
+        return resampled_history(request, station_ref)
+
     try:
         station = Station.objects.get(station_ref=station_ref)
-        weather_data = WeatherData.objects.filter(station=station).order_by('-timestamp')[:50]
-
-        response = {
-            "id": station_ref,
-            "history": [
-                {
-                    "ts": entry.timestamp.strftime("%Y%m%d%H%M%S"),
-                    "tmp": round(entry.temperature, 1),  # ✅ Ensure 1 decimal precision
-                    "hum": round(entry.humidity, 1)  # ✅ Ensure 1 decimal precision
-                }
-                for entry in weather_data
-            ]
-        }
+        response = history_payload(station, get_storage().latest(station, HISTORY_LENGTH))
     except Station.DoesNotExist:
         response = {"error": "Station not found"}
 
@@ -121,35 +177,600 @@ def history(request, station_ref):
 
 
 
+# Upper bound of grid cells for one resampled history response
+MAX_RESAMPLE_CELLS = 20000
+
+
+# ✅ **GET /api/history/<station_ref>/?resample=30m|1h|1d&fill=none|linear|previous&from=&to=**
+def resampled_history(request, station_ref):
+    """ History aligned to a regular grid (newest first, like the raw history) """
+    try:
+        station = Station.objects.get(station_ref=station_ref)
+    except Station.DoesNotExist:
+        return JsonResponse({"error": "Station not found"}, status=404)
+
+    step = analytics.RESAMPLE_STEPS.get(request.GET["resample"])
+    fill = request.GET.get("fill", "none")
+    if step is None:
+        return JsonResponse({"error": f"Invalid resample: expected one of {', '.join(analytics.RESAMPLE_STEPS)}"}, status=400)
+    if fill not in analytics.FILL_METHODS:
+        return JsonResponse({"error": f"Invalid fill: expected one of {', '.join(analytics.FILL_METHODS)}"}, status=400)
+
+    try:
+        start, end = parse_time_range(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    if (end - start).total_seconds() / step > MAX_RESAMPLE_CELLS:
+        return JsonResponse({"error": "Range too large for this resample step"}, status=400)
+
+    ts, tmp, hum = get_storage().read(station, start, end)
+    grid, (tmp_grid, hum_grid) = analytics.resample(ts, [tmp, hum], start.timestamp(), end.timestamp(), step, fill)
+
+    response = {
+        "id": station_ref,
+        "resample": request.GET["resample"],
+        "fill": fill,
+        "history": [
+            {"ts": t, "tmp": tmp_value, "hum": hum_value}
+            for t, tmp_value, hum_value in zip(
+                analytics.format_epochs(grid[::-1]),
+                analytics.to_json_list(tmp_grid[::-1]),
+                analytics.to_json_list(hum_grid[::-1]),
+            )
+        ]
+    }
+    return JsonResponse(response)
+
+
+def maxima_payload(station):
+    response = {"id": station.station_ref, "history": []}
+
+    # ✅ Last 7 days (today included) read once, extremes per day computed with NumPy
+    tomorrow = make_aware(datetime.combine(now().date() + timedelta(days=1), datetime.min.time()))
+    days, tmin, tmax, hmin, hmax = daily_extremes(*get_storage().read(station, tomorrow - timedelta(days=7), tomorrow))
+
+    for dt, min_temp, max_temp, min_hum, max_hum in reversed(list(zip(
+        analytics.format_epochs(days, "%Y%m%d"),
+        analytics.to_json_list(tmin), analytics.to_json_list(tmax),
+        analytics.to_json_list(hmin), analytics.to_json_list(hmax)
+    ))):
+        response["history"].append({
+            "dt": dt,
+            "tmin": min_temp,
+            "tmax": max_temp,
+            "hmin": min_hum,
+            "hmax": max_hum
+        })
+    return response
+
+
 # ✅ **GET /api/minmax/history/<station_ref>/** - Get ESP32 min/max records 
+@cached_station_response(lambda request: (now().date(),))  # The 7-day window moves at midnight
 def maxima_history(request, station_ref):
     try:
         station = Station.objects.get(station_ref=station_ref)
-        response = {"id": station_ref, "history": []}
-
-        for i in range(7):
-            day = now() - timedelta(days=i)
-            daily_data = WeatherData.objects.filter(station=station, timestamp__date=day.date())
-
-            if daily_data.exists():
-                min_temp = round(daily_data.aggregate(Min('temperature'))["temperature__min"], 1)
-                max_temp = round(daily_data.aggregate(Max('temperature'))["temperature__max"], 1)
-                min_hum = round(daily_data.aggregate(Min('humidity'))["humidity__min"], 1)
-                max_hum = round(daily_data.aggregate(Max('humidity'))["humidity__max"], 1)
-
-                response["history"].append({
-                    "dt": day.strftime("%Y%m%d"),
-                    "tmin": min_temp,
-                    "tmax": max_temp,
-                    "hmin": min_hum,
-                    "hmax": max_hum
-                })
+        response = maxima_payload(station)
     except Station.DoesNotExist:
         response = {"error": "Station not found"}
 
     return JsonResponse(response)
 
 
+# ✅ **GET /api/analytics/<station_ref>/?from=&to=&window=** - Derived metrics over raw readings
+def station_analytics(request, station_ref):
+    try:
+        station = Station.objects.get(station_ref=station_ref)
+    except Station.DoesNotExist:
+        return JsonResponse({"error": "Station not found"}, status=404)
+
+    try:
+        start, end = parse_time_range(request)
+        window_h = float(request.GET.get("window", 3))  # Rolling mean window in hours
+        if not (math.isfinite(window_h) and window_h > 0):
+            raise ValueError("'window' must be a positive number of hours")
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    # ✅ One query, then NumPy over whole arrays
+    ts, tmp, hum = get_storage().read(station, start, end)
+    days, tavg_day, hdd, cdd = analytics.daily_degree_days(ts, tmp, settings.DEGREE_DAY_BASE)
+
+    response = {
+        "id": station_ref,
+        "from": start.strftime("%Y%m%d%H%M%S"),
+        "to": end.strftime("%Y%m%d%H%M%S"),
+        "count": len(ts),
+        "series": {
+            "ts": analytics.format_epochs(ts),
+            "dew": analytics.to_json_list(analytics.dew_point(tmp, hum)),
+            "hix": analytics.to_json_list(analytics.heat_index(tmp, hum)),
+            "tavg": analytics.to_json_list(analytics.rolling_mean(ts, tmp, window_h * 3600)),
+            "havg": analytics.to_json_list(analytics.rolling_mean(ts, hum, window_h * 3600)),
+            "troc": analytics.to_json_list(analytics.rate_of_change(ts, tmp)),
+            "hroc": analytics.to_json_list(analytics.rate_of_change(ts, hum)),
+        },
+        "daily": [
+            {"dt": dt, "tavg": t, "hdd": h, "cdd": c}
+            for dt, t, h, c in zip(
+                analytics.format_epochs(days, "%Y%m%d"),
+                analytics.to_json_list(tavg_day),
+                analytics.to_json_list(hdd),
+                analytics.to_json_list(cdd),
+            )
+        ],
+    }
+    return JsonResponse(response)
+
+
+# ✅ **GET /api/coverage/<station_ref>/?from=&to=** - 30-minute slot coverage and gaps of a station
+def station_coverage(request, station_ref):
+    try:
+        station = Station.objects.get(station_ref=station_ref)
+    except Station.DoesNotExist:
+        return JsonResponse({"error": "Station not found"}, status=404)
+
+    try:
+        start, end = parse_time_range(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    end = min(end, now())  # Future slots are not missing
+    if start >= end:
+        return JsonResponse({"error": "'from' must be in the past"}, status=400)
+
+    bitmaps = coverage.load_bitmaps(start, end, station).get(station.pk, {})
+    bits, origin = coverage.slot_bits(bitmaps, start, end)
+
+    response = {
+        "id": station_ref,
+        "from": start.strftime("%Y%m%d%H%M%S"),
+        "to": end.strftime("%Y%m%d%H%M%S"),
+        "cov": round(100.0 * bits.mean(), 1) if len(bits) else 0.0,
+        "days": [
+            {"dt": day.strftime("%Y%m%d"), "n": bitmap.bit_count(), "map": f"{bitmap:012x}"}
+            for day, bitmap in sorted(bitmaps.items())
+        ],
+        "missing": [
+            [gap_start.strftime("%Y%m%d%H%M%S"), gap_end.strftime("%Y%m%d%H%M%S")]
+            for gap_start, gap_end in coverage.missing_intervals(bits, origin)
+        ]
+    }
+    return JsonResponse(response)
+
+
+# ✅ **GET /api/coverage/?from=&to=** - Fleet report of missing intervals, from the coverage bitmaps only
+def fleet_coverage(request):
+    try:
+        start, end = parse_time_range(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    end = min(end, now())
+    if start >= end:
+        return JsonResponse({"error": "'from' must be in the past"}, status=400)
+
+    bitmaps = coverage.load_bitmaps(start, end)
+    stations = []
+    for station_id, station_ref in Station.objects.order_by("station_ref").values_list("id", "station_ref"):
+        bits, origin = coverage.slot_bits(bitmaps.get(station_id, {}), start, end)
+        gaps = coverage.missing_intervals(bits, origin)
+        stations.append({
+            "id": station_ref,
+            "cov": round(100.0 * bits.mean(), 1) if len(bits) else 0.0,
+            "missing": [[a.strftime("%Y%m%d%H%M%S"), b.strftime("%Y%m%d%H%M%S")] for a, b in gaps]
+        })
+
+    return JsonResponse({"from": start.strftime("%Y%m%d%H%M%S"), "to": end.strftime("%Y%m%d%H%M%S"), "stations": stations})
+
+
+def parse_quantiles(request):
+    """ Read `?q=0.05,0.5,0.95` (default) into a list of floats in [0, 1] """
+    raw = request.GET.get("q", "0.05,0.5,0.95")
+    try:
+        qs = [float(q) for q in raw.split(",")]
+    except ValueError:
+        raise ValueError(f"Invalid quantiles: {raw}")
+    if not all(0.0 <= q <= 1.0 for q in qs):
+        raise ValueError("Quantiles must be between 0 and 1")
+    return raw.split(","), qs
+
+
+def quantile_response(sketch_rows, labels, qs):
+    """ Merge the (temperature, humidity, count) sketch rows and compute the requested quantiles """
+    rows = list(sketch_rows)
+    response = {"n": sum(count for _, _, count in rows)}
+    for key, column in (("tmp", 0), ("hum", 1)):
+        values, counts = sketches.merge([row[column] for row in rows])
+        result = analytics.to_json_list(sketches.quantiles(values, counts, qs))
+        response[key] = dict(zip(labels, result))
+    return response
+
+
+# ✅ **GET /api/quantiles/<station_ref>/?q=&from=&to=** - Temperature & humidity quantiles from daily sketches
+def station_quantiles(request, station_ref):
+    try:
+        station = Station.objects.get(station_ref=station_ref)
+    except Station.DoesNotExist:
+        return JsonResponse({"error": "Station not found"}, status=404)
+
+    try:
+        labels, qs = parse_quantiles(request)
+        start, end = parse_time_range(request, default_days=30)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    # Whole days: sketches are per station-day
+    first_day, last_day = start.date(), (end - timedelta(microseconds=1)).date()
+    rows = DailySketch.objects.filter(station=station, date__gte=first_day, date__lte=last_day)
+    response = {
+        "id": station_ref,
+        "from": first_day.strftime("%Y%m%d"),
+        "to": last_day.strftime("%Y%m%d"),
+        **quantile_response(rows.values_list("temperature", "humidity", "count"), labels, qs)
+    }
+    return JsonResponse(response)
+
+
+# ✅ **GET /api/quantiles/?q=&from=&to=&stations=** - Same, merged across stations (all by default)
+def fleet_quantiles(request):
+    try:
+        labels, qs = parse_quantiles(request)
+        start, end = parse_time_range(request, default_days=30)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    first_day, last_day = start.date(), (end - timedelta(microseconds=1)).date()
+    rows = DailySketch.objects.filter(date__gte=first_day, date__lte=last_day)
+    if request.GET.get("stations"):
+        station_refs = request.GET["stations"].split(",")
+        station_ids = list(Station.objects.filter(station_ref__in=station_refs).values_list("id", flat=True))
+        rows = rows.filter(station_id__in=station_ids)
+
+    response = {
+        "from": first_day.strftime("%Y%m%d"),
+        "to": last_day.strftime("%Y%m%d"),
+        **quantile_response(rows.values_list("temperature", "humidity", "count"), labels, qs)
+    }
+    return JsonResponse(response)
+
+
+# Longest range served by one heatmap response
+MAX_HEATMAP_DAYS = 400
+
+
+# ✅ **GET /api/heatmap/<station_ref>/?metric=tmp|hum&from=&to=&stats=minmax** - Day × hour-of-day means
+def station_heatmap(request, station_ref):
+    try:
+        station = Station.objects.get(station_ref=station_ref)
+    except Station.DoesNotExist:
+        return JsonResponse({"error": "Station not found"}, status=404)
+
+    metric = request.GET.get("metric", "tmp")
+    if metric not in heatmap.METRICS:
+        return JsonResponse({"error": f"Invalid metric: expected one of {', '.join(heatmap.METRICS)}"}, status=400)
+    try:
+        start, end = parse_time_range(request, default_days=30)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    first_day, last_day = start.date(), (end - timedelta(microseconds=1)).date()
+    if (last_day - first_day).days >= MAX_HEATMAP_DAYS:
+        return JsonResponse({"error": f"Range too large: at most {MAX_HEATMAP_DAYS} days"}, status=400)
+
+    rows = heatmap.station_heatmap(station, metric, first_day, last_day)
+    days = sorted(rows)
+    response = {
+        "id": station_ref,
+        "metric": metric,
+        "from": first_day.strftime("%Y%m%d"),
+        "to": last_day.strftime("%Y%m%d"),
+        "days": [day.strftime("%Y%m%d") for day in days],
+        "mean": [analytics.to_json_list(rows[day][0]) for day in days]
+    }
+    if request.GET.get("stats") == "minmax":
+        response["min"] = [analytics.to_json_list(rows[day][1]) for day in days]
+        response["max"] = [analytics.to_json_list(rows[day][2]) for day in days]
+    return JsonResponse(response)
+
+
+# Longest forecast horizon (hours)
+MAX_FORECAST_HOURS = 48
+
+
+# ✅ **GET /api/forecast/<station_ref>/?hours=6** - Hourly forecast from the incremental state (no history read)
+def station_forecast(request, station_ref):
+    try:
+        station = Station.objects.get(station_ref=station_ref)
+    except Station.DoesNotExist:
+        return JsonResponse({"error": "Station not found"}, status=404)
+    try:
+        hours = int(request.GET.get("hours", 6))
+    except ValueError:
+        hours = 0
+    if not 1 <= hours <= MAX_FORECAST_HOURS:
+        return JsonResponse({"error": f"Invalid hours: expected 1 to {MAX_FORECAST_HOURS}"}, status=400)
+
+    row = ForecastState.objects.filter(station=station).first()
+    if row is None:
+        return JsonResponse({"error": "No forecast available"}, status=404)
+
+    last_epoch = row.last_ts.timestamp()
+    horizons = list(range(1, hours + 1))
+    predicted = forecast.forecast(row.state, last_epoch, horizons)
+    tmp_values, tmp_err = predicted["tmp"]
+    hum_values, hum_err = predicted["hum"]
+
+    response = {
+        "id": station_ref,
+        "from": row.last_ts.strftime("%Y%m%d%H%M%S"),
+        "count": row.count,
+        "err": {"tmp": round(tmp_err, 1), "hum": round(hum_err, 1)},
+        "forecast": [
+            {"ts": t, "tmp": tmp_value, "hum": hum_value}
+            for t, tmp_value, hum_value in zip(
+                analytics.format_epochs([last_epoch + h * 3600 for h in horizons]),
+                analytics.to_json_list(tmp_values), analytics.to_json_list(hum_values)
+            )
+        ]
+    }
+    return JsonResponse(response)
+
+
+# Longest fleet aggregate grid (buckets per group)
+MAX_AGGREGATE_BUCKETS = 2000
+AGGREGATE_GROUPS = ("location", "station")
+
+
+# ✅ **GET /api/fleet/aggregate/?group=location|station&bucket=1h&from=&to=&corr=tmp|hum** - Cross-station aggregates
+def fleet_aggregate(request):
+    """ Per-bucket mean/min/max across the stations of each group and the station correlation matrix,
+    from the hourly rollups only (one query, whatever the number of stations) """
+    group = request.GET.get("group", "location")
+    bucket = request.GET.get("bucket", "1h")
+    corr_metric = request.GET.get("corr", "tmp")
+    if group not in AGGREGATE_GROUPS:
+        return JsonResponse({"error": f"Invalid group: expected one of {', '.join(AGGREGATE_GROUPS)}"}, status=400)
+    if bucket not in rollups.BUCKETS:
+        return JsonResponse({"error": f"Invalid bucket: expected one of {', '.join(rollups.BUCKETS)}"}, status=400)
+    if corr_metric not in rollups.METRICS:
+        return JsonResponse({"error": f"Invalid corr: expected one of {', '.join(rollups.METRICS)}"}, status=400)
+    try:
+        start, end = parse_time_range(request, default_days=1)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    # Buckets aligned on UTC hours / days
+    step = rollups.BUCKETS[bucket]
+    origin = start.timestamp() // step * step
+    n_buckets = int(-((origin - end.timestamp()) // step))
+    if n_buckets > MAX_AGGREGATE_BUCKETS:
+        return JsonResponse({"error": f"Range too large: at most {MAX_AGGREGATE_BUCKETS} buckets"}, status=400)
+
+    stations = list(Station.objects.order_by("station_ref").values_list("id", "station_ref", "location"))
+    keys = {}
+    for _, station_ref, location in stations:
+        keys.setdefault(location if group == "location" else station_ref, []).append(station_ref)
+    groups = sorted(keys, key=lambda key: (key is None, key or ""))  # Stations without location last
+    index = {key: i for i, key in enumerate(groups)}
+    station_groups = {
+        station_id: index[location if group == "location" else station_ref]
+        for station_id, station_ref, location in stations
+    }
+    refs = {station_id: station_ref for station_id, station_ref, _ in stations}
+
+    counts, stats, corr_ids, matrix = rollups.fleet_aggregate(
+        origin, step, n_buckets, station_groups, len(groups), corr_metric
+    )
+
+    epochs = [origin + i * step for i in range(n_buckets)]
+    response = {
+        "from": analytics.format_epochs([origin])[0],
+        "to": analytics.format_epochs([origin + n_buckets * step])[0],
+        "group": group,
+        "bucket": bucket,
+        "buckets": analytics.format_epochs(epochs),
+        "groups": [
+            {
+                "key": key,
+                "stations": keys[key],
+                "n": counts[i].astype(int).tolist(),
+                **{
+                    metric: {
+                        name: analytics.to_json_list(values[i])
+                        for name, values in zip(("mean", "min", "max"), stats[metric])
+                    }
+                    for metric in rollups.METRICS
+                }
+            }
+            for i, key in enumerate(groups)
+        ],
+        "corr": {
+            "metric": corr_metric,
+            "stations": [refs[station_id] for station_id in corr_ids],
+            "matrix": [analytics.to_json_list(row, digits=2) for row in matrix]
+        }
+    }
+    return JsonResponse(response)
+
+
+# ✅ **GET /api/alerts/?station=&active=1&from=&to=** - Fired alerts, newest first
+def list_alerts(request):
+    # Time-series database: rules and stations (default database) fetched in batched lookups, no JOIN
+    alerts_qs = Alert.objects.filter(fired_at__isnull=False).prefetch_related("rule", "station").order_by("-fired_at")
+
+    if request.GET.get("station"):
+        station_ids = Station.objects.filter(station_ref=request.GET["station"]).values_list("pk", flat=True)
+        alerts_qs = alerts_qs.filter(station_id__in=list(station_ids))
+    if request.GET.get("active") == "1":
+        alerts_qs = alerts_qs.filter(resolved_at__isnull=True)
+    try:
+        if request.GET.get("from"):
+            alerts_qs = alerts_qs.filter(fired_at__gte=parse_range_bound(request.GET["from"]))
+        if request.GET.get("to"):
+            alerts_qs = alerts_qs.filter(fired_at__lt=parse_range_bound(request.GET["to"], end=True))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    response = {
+        "alerts": [
+            {
+                "id": alert.pk,
+                "rule": alert.rule.name,
+                "station": alert.station.station_ref,
+                "metric": alert.rule.metric,
+                "op": alert.rule.operator,
+                "thr": alert.rule.threshold,
+                "val": round(alert.value, 1),
+                "start": alert.started_at.strftime("%Y%m%d%H%M%S"),
+                "fired": alert.fired_at.strftime("%Y%m%d%H%M%S"),
+                "end": alert.resolved_at.strftime("%Y%m%d%H%M%S") if alert.resolved_at else None
+            }
+            for alert in alerts_qs[:200]
+        ]
+    }
+    return JsonResponse(response)
+
+
+def format_optional(ts):
+    return ts.strftime("%Y%m%d%H%M%S") if ts else None
+
+
+# ✅ **GET /api/health/?all=1&stale=<seconds>** - Stale or degraded stations, from the health index only
+def fleet_health(request):
+    try:
+        stale_after = int(request.GET.get("stale", settings.HEALTH_STALE_AFTER))
+    except ValueError:
+        return JsonResponse({"error": "Invalid stale: expected seconds"}, status=400)
+
+    checked_at = now()
+    stale_before = checked_at - timedelta(seconds=stale_after)
+    show_all = request.GET.get("all") == "1"
+    if show_all:
+        records = StationHealth.objects.in_bulk()
+        stations = Station.objects.all()
+    else:
+        # Only the flagged health rows (indexed on last_weather_at), then the references of those stations
+        # and of stations that never got a health row
+        records = StationHealth.objects.filter(
+            Q(last_weather_at__lt=stale_before) | Q(last_weather_at=None)
+            | Q(free_heap__lt=settings.HEALTH_MIN_FREE_HEAP)
+            | Q(wifi_strength__lt=settings.HEALTH_MIN_WIFI_STRENGTH)
+            | Q(sync_failures__gte=settings.HEALTH_MAX_SYNC_FAILURES)
+        ).in_bulk()
+        known = list(StationHealth.objects.values_list("pk", flat=True))
+        stations = Station.objects.filter(Q(pk__in=list(records)) | ~Q(pk__in=known))
+
+    rows = []
+    for station in stations.order_by("station_ref").only("station_ref"):
+        record = records.get(station.pk)
+        seen = record.last_weather_at if record else None
+        found = []
+        if seen is None or seen < stale_before:
+            found.append("stale")
+        if record and record.free_heap is not None and record.free_heap < settings.HEALTH_MIN_FREE_HEAP:
+            found.append("low_heap")
+        if record and record.wifi_strength is not None and record.wifi_strength < settings.HEALTH_MIN_WIFI_STRENGTH:
+            found.append("weak_wifi")
+        if record and record.sync_failures >= settings.HEALTH_MAX_SYNC_FAILURES:
+            found.append("sync_failures")
+        if not found and not show_all:
+            continue
+        rows.append({
+            "id": station.station_ref,
+            "seen": format_optional(seen),
+            "ts": format_optional(record.last_reading_at if record else None),
+            "status": format_optional(record.last_status_at if record else None),
+            "mem": record.free_heap if record else None,
+            "wif": record.wifi_strength if record else None,
+            "fail": record.sync_failures if record else 0,
+            "issues": found
+        })
+
+    return JsonResponse({"checked": checked_at.strftime("%Y%m%d%H%M%S"), "stations": rows})
+
+
+# Sub-requests accepted by one batch
+MAX_BATCH_REQUESTS = 32
+
+
+def invalid_batch_request(sub):
+    """ Error message of a malformed batch sub-request, None when it is well-formed """
+    if not isinstance(sub, dict):
+        return "Invalid request: expected an object"
+    if not isinstance(sub.get("id"), str):
+        return "Invalid id: expected a string"
+    params = sub.get("params")
+    if params is not None and not (isinstance(params, dict) and all(isinstance(v, str) for v in params.values())):
+        return "Invalid params: expected an object of strings"
+    return None
+
+
+# ✅ **POST /api/batch/** - Several status / lastreport / history / minmax reads in one round trip
+@csrf_exempt
+def batch(request):
+    if request.method != "POST":
+        return JsonResponse({"error": "Invalid request"}, status=400)
+    try:
+        subs = json.loads(request.body).get("requests")
+    except (json.JSONDecodeError, AttributeError):
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+    if not isinstance(subs, list):
+        return JsonResponse({"error": "Invalid data format. Expected a list of requests."}, status=400)
+    if len(subs) > MAX_BATCH_REQUESTS:
+        return JsonResponse({"error": f"Too many requests: at most {MAX_BATCH_REQUESTS}"}, status=400)
+
+    # ✅ Malformed sub-requests get their own 400, the others are still answered
+    errors = [invalid_batch_request(sub) for sub in subs]
+    valid = [sub for sub, error in zip(subs, errors) if error is None]
+
+    # ✅ One lookup for every station, one "latest readings" read per station shared by lastreport & history
+    stations = {s.station_ref: s for s in Station.objects.filter(station_ref__in={sub["id"] for sub in valid})}
+    latest_wanted = {}
+    for sub in valid:
+        if sub["id"] in stations and sub.get("endpoint") in ("lastreport", "history") and not sub.get("params"):
+            latest_wanted[sub["id"]] = max(latest_wanted.get(sub["id"], 1), 1 if sub["endpoint"] == "lastreport" else HISTORY_LENGTH)
+    storage = get_storage()
+    latest = {ref: storage.latest(stations[ref], n) for ref, n in latest_wanted.items()}
+
+    results = []
+    for sub, error in zip(subs, errors):
+        if error is not None:
+            sub = sub if isinstance(sub, dict) else {}
+            results.append({"endpoint": sub.get("endpoint"), "id": sub.get("id"), "status": 400, "body": {"error": error}})
+            continue
+        endpoint, station_ref, params = sub.get("endpoint"), sub["id"], sub.get("params") or {}
+        station = stations.get(station_ref)
+        code = 200
+        if endpoint not in ("status", "lastreport", "history", "minmax"):
+            body, code = {"error": f"Unknown endpoint: {endpoint}"}, 400
+        elif station is None:
+            body, code = {"error": "Station not found"}, 404
+        elif endpoint == "history" and params:
+            if not params.get("resample"):
+                body, code = {"error": "History params require resample"}, 400
+            else:
+                # Resampled history keeps its own view (validation, range parsing)
+                sub_request = copy.copy(request)
+                sub_request.method, sub_request.GET = "GET", QueryDict(mutable=True)
+                sub_request.GET.update(params)
+                sub_response = resampled_history(sub_request, station_ref)
+                body, code = json.loads(sub_response.content), sub_response.status_code
+        elif endpoint == "status":
+            body = status_payload(station)
+        elif endpoint == "lastreport":
+            body = last_report_payload(station, latest[station_ref])
+        elif endpoint == "history":
+            body = history_payload(station, latest[station_ref])
+        else:
+            body = maxima_payload(station)
+        results.append({"endpoint": endpoint, "id": station_ref, "status": code, "body": body})
+
+    return JsonResponse({"results": results})
+
+
+# ✅ **GET /api/metrics/** - Response cache and single-flight counters of the worker answering
+def worker_metrics(request):
+    return JsonResponse({"pid": os.getpid(), "cache": response_cache.snapshot()})
+
+
 # ✅ **GET /api/lastupdate/<station_ref>/** - Get last update timestamp
 def last_update(request, station_ref):
     try:
@@ -161,58 +782,114 @@ def last_update(request, station_ref):
             return JsonResponse({"error": "IP and ID not coherent"}, status=403)
 
         # Get last recorded weather data timestamp
-        last_entry = WeatherData.objects.filter(station=station).order_by('-timestamp').first()
+        last_entry, _, _ = get_storage().latest(station, 1)
         
-        last_ts = last_entry.timestamp.strftime("%Y%m%d%H%M%S") if last_entry else "19700101 00:00"
+        last_ts = analytics.format_epochs(last_entry)[0] if len(last_entry) else "19700101 00:00"
+
+        # ✅ Server-assigned sync slot, spreading the fleet's syncs over the hour
+        offset, wait = schedule.sync_schedule(station)
 
-        return JsonResponse({"id": station_ref, "ts": last_ts})
+        return JsonResponse({"id": station_ref, "ts": last_ts, "offset": offset, "wait": wait})
 
     except Station.DoesNotExist:
         return JsonResponse({"error": "Station not defined"}, status=404)
 
-# ✅ **PUT /api/weather/upload/** - ESP32 uploads weather data
+STAGED_READING = struct.Struct("<ddd")  # Seconds since STAGED_EPOCH, temperature, humidity
+STAGED_EPOCH = datetime(1970, 1, 1)  # Naive, like parsed upload timestamps
+STAGED_IN_MEMORY_BYTES = 1024 * 1024  # Larger uploads are staged in a temporary file
+
+
+def stage_weather_batches(station, records, batch_size, staged):
+    """ Validate `records` `batch_size` at a time as they are read and append them to the binary file `staged`.
+    Nothing is written to the database yet. Returns (dates, newest). """
+    dates, newest = set(), None
+    records = iter(records)
+    while batch := list(itertools.islice(records, batch_size)):
+        weather_entries = ingest.weather_entries(station, batch)
+        staged.write(b"".join(
+            STAGED_READING.pack((entry.timestamp - STAGED_EPOCH).total_seconds(), entry.temperature, entry.humidity)
+            for entry in weather_entries
+        ))
+        dates.update(entry.timestamp.date() for entry in weather_entries)
+        batch_newest = max(entry.timestamp for entry in weather_entries)
+        newest = batch_newest if newest is None else max(newest, batch_newest)
+    return dates, newest
+
+
+def store_staged_weather(station, staged, batch_size):
+    """ Store the readings of `staged` and evaluate alerts `batch_size` at a time, in one transaction per
+    database. Returns (count, alerts). """
+    saved_count, fired = 0, 0
+    staged.seek(0)
+    with transaction.atomic(using=WeatherData.objects.db):  # Alerts live in the same database
+        while chunk := staged.read(batch_size * STAGED_READING.size):
+            weather_entries = [
+                WeatherData(station_id=station.pk, timestamp=STAGED_EPOCH + timedelta(seconds=seconds), temperature=tmp, humidity=hum)
+                for seconds, tmp, hum in STAGED_READING.iter_unpack(chunk)
+            ]
+            saved_count += ingest.store_weather(station, weather_entries)
+            fired += len(alerts.evaluate(station, [
+                (entry.timestamp, {"temperature": entry.temperature, "humidity": entry.humidity})
+                for entry in weather_entries
+            ]))
+    return saved_count, fired
+
+
+# ✅ **PUT /api/weather/upload/** - ESP32 uploads weather data (optionally `Content-Encoding: gzip|deflate`)
 @csrf_exempt
+@health.tracks_sync_failures
 def receive_weather_data(request):
+    """ The body is decoded as it is read and "data" validated in batches of WEATHER_UPLOAD_BATCH readings,
+    staged in a temporary file so memory does not grow with the size of a backfill ("id" must come before
+    "data" for that). Readings are stored only once the whole body has been decoded without error: no
+    transaction is held open while a slow client sends its body, and a bad upload stores nothing. """
     if request.method == 'PUT':
+        started = time.perf_counter()
         try:
-            data = json.loads(request.body)
-            station_ref = data.get("id")
-            client_ip = get_client_ip(request)
-
-            # ✅ Ensure station exists
-            try:
-                station = Station.objects.get(station_ref=station_ref)
-            except Station.DoesNotExist:
-                return JsonResponse({"error": "Station not defined"}, status=404)
-
-            # ✅ Validate IP address (if `http_address` is set)
-            if station.http_address and not station.http_address.startswith(f"http://{client_ip}"):
-                return JsonResponse({"error": "IP and ID not coherent"}, status=403)
-
-            # ✅ Check for "data" key
-            if "data" not in data or not isinstance(data["data"], list):
-                return JsonResponse({"error": "Invalid data format. Expected a list."}, status=400)
-
-            # ✅ Process data
-            weather_entries = []
-            for record in data["data"]:
-                timestamp = parse_custom_datetime(record["ts"])
-                if not timestamp:
-                    return JsonResponse({"error": f"Invalid timestamp format: {record['ts']}"}, status=400)
-
-                weather_entries.append(
-                    WeatherData(
-                        station=station,
-                        timestamp=timestamp,
-                        temperature=round(record["tmp"], 1),
-                        humidity=round(record["hum"], 1)
-                    )
-                )
-
-            # ✅ Save data & return count
-            saved_entries = WeatherData.objects.bulk_create(weather_entries)
-            return JsonResponse({"msg": "Weather data received", "count": len(saved_entries)}, status=201)
-
+            chunks = streaming.body_chunks(request, settings.WEATHER_UPLOAD_MAX_BYTES)
+            station, pending, staged_data = None, None, None
+            with tempfile.SpooledTemporaryFile(max_size=STAGED_IN_MEMORY_BYTES) as staged:
+                for key, value in streaming.iter_members(chunks):
+                    if key == "id":
+                        # ✅ Ensure station exists
+                        try:
+                            station = Station.objects.get(station_ref=value)
+                        except Station.DoesNotExist:
+                            return JsonResponse({"error": "Station not defined"}, status=404)
+                        request.meteo_station = station  # Later errors count as sync failures
+
+                        # ✅ Validate IP address (if `http_address` is set)
+                        client_ip = get_client_ip(request)
+                        if station.http_address and not station.http_address.startswith(f"http://{client_ip}"):
+                            return JsonResponse({"error": "IP and ID not coherent"}, status=403)
+                    elif key == "data":
+                        # ✅ Check for "data" key
+                        if not streaming.is_stream(value):
+                            return JsonResponse({"error": "Invalid data format. Expected a list."}, status=400)
+                        if station is None:
+                            pending = list(value)  # "id" not read yet: keep the records until it is
+                        else:
+                            # ✅ Validate data (same validation as `manage.py import_weather`)
+                            staged_data = stage_weather_batches(station, value, settings.WEATHER_UPLOAD_BATCH, staged)
+
+                if station is None:
+                    return JsonResponse({"error": "Station not defined"}, status=404)
+                if pending is not None:
+                    staged_data = stage_weather_batches(station, pending, settings.WEATHER_UPLOAD_BATCH, staged)
+                if staged_data is None:
+                    return JsonResponse({"error": "Invalid data format. Expected a list."}, status=400)
+                dates, newest = staged_data
+
+                # ✅ Whole body decoded (closing brace, end of the compressed stream): store it
+                saved_count, fired = store_staged_weather(station, staged, settings.WEATHER_UPLOAD_BATCH)
+
+            # ✅ Refresh derived data & return count
+            ingest.weather_stored(station, dates)
+            health.record_weather(station, [newest] if newest else [], (time.perf_counter() - started) * 1000)
+            return JsonResponse({"msg": "Weather data received", "count": saved_count, "alerts": fired}, status=201)
+
+        except streaming.BodyError as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
         except json.JSONDecodeError:
             return JsonResponse({"error": "Invalid JSON"}, status=400)
         except Exception as e:
@@ -224,10 +901,11 @@ def receive_weather_data(request):
  
 # ✅ **PUT /api/minmax/upload/** - Receive ESP32 min/max data with IP validation
 @csrf_exempt
+@health.tracks_sync_failures
 def receive_minmax_data(request):
     if request.method == 'PUT':
         try:
-            data = json.loads(request.body)
+            data = json.loads(streaming.decoded_body(request))
             station_ref = data.get("id")
             client_ip = get_client_ip(request)
 
@@ -236,6 +914,7 @@ def receive_minmax_data(request):
                 station = Station.objects.get(station_ref=station_ref)
             except Station.DoesNotExist:
                 return JsonResponse({"error": "Station not found"}, status=404)
+            request.meteo_station = station  # Later errors count as sync failures
 
             # ✅ Ensure request comes from the correct IP
             if station.http_address:
@@ -244,7 +923,7 @@ def receive_minmax_data(request):
                     return JsonResponse({"error": "IP and ID not coherent"}, status=403)
 
 
-            minmax_entries = []
+            minmax_entries = {}  # Keyed by date: a resent day within one batch keeps its last value
             for record in data.get("data", []):
                 dt = record["dt"]  # "YYYYMMDD" format
                 try:
@@ -252,33 +931,44 @@ def receive_minmax_data(request):
                 except ValueError:
                     return JsonResponse({"error": f"Invalid date format: {dt}"}, status=400)
 
-                minmax_entries.append(
-                    MinMaxData(
-                        station=station,
-                        date=date_obj,
-                        min_temperature=round(record["tmin"], 1),
-                        max_temperature=round(record["tmax"], 1),
-                        min_humidity=round(record["hmin"], 1),
-                        max_humidity=round(record["hmax"], 1)
-                    )
+                minmax_entries[date_obj] = MinMaxData(
+                    station=station,
+                    date=date_obj,
+                    min_temperature=round(record["tmin"], 1),
+                    max_temperature=round(record["tmax"], 1),
+                    min_humidity=round(record["hmin"], 1),
+                    max_humidity=round(record["hmax"], 1)
                 )
 
-            MinMaxData.objects.bulk_create(minmax_entries)
+            # ✅ Upsert: one row per (station, date), resyncs overwrite instead of duplicating
+            MinMaxData.objects.bulk_create(
+                minmax_entries.values(),
+                update_conflicts=True,
+                unique_fields=["station", "date"],
+                update_fields=["min_temperature", "max_temperature", "min_humidity", "max_humidity"]
+            )
+            mismatches = reconcile_minmax(station, minmax_entries.keys())
+            health.record_sync(station)
 
-            return JsonResponse({"msg": "Min/Max data received", "count": len(minmax_entries)}, status=201)
+            return JsonResponse({"msg": "Min/Max data received", "count": len(minmax_entries), "mismatch": mismatches}, status=201)
 
+        except streaming.BodyError as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
         except json.JSONDecodeError:
             return JsonResponse({"error": "Invalid JSON"}, status=400)
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=400)
 
+    return JsonResponse({"error": "Invalid request"}, status=400)
+
 
 # ✅ **PUT /api/status/upload/** - Handle ESP32 system status update with IP validation
 @csrf_exempt
+@health.tracks_sync_failures
 def receive_status_data(request):
     if request.method == "PUT":
         try:
-            data = json.loads(request.body.decode("utf-8"))
+            data = json.loads(streaming.decoded_body(request))
             station_ref = data.get("id")
             uptime = data.get("upt")
             free_heap = data.get("mem")
@@ -290,6 +980,7 @@ def receive_status_data(request):
                 station = Station.objects.get(station_ref=station_ref)
             except Station.DoesNotExist:
                 return JsonResponse({"error": "Station not defined"}, status=404)
+            request.meteo_station = station  # Later errors count as sync failures
 
             if station.http_address and not station.http_address.startswith(f"http://{client_ip}"):
                 return JsonResponse({"error": "IP and ID not coherent"}, status=403)
@@ -306,10 +997,16 @@ def receive_status_data(request):
                 free_heap=free_heap,
                 wifi_strength=wifi_strength
             )
+            alerts.evaluate(station, [(ts_parsed, {"free_heap": free_heap, "wifi_strength": wifi_strength})])
+            health.record_status(station, free_heap, wifi_strength)
 
             return JsonResponse({"msg": "System status updated"}, status=200)
 
+        except streaming.BodyError as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
         except json.JSONDecodeError:
             return JsonResponse({"error": "Invalid JSON"}, status=400)
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({"error": "Invalid request"}, status=400)
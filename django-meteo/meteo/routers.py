@@ -0,0 +1,63 @@
+"""
+Database routing for the meteo project.
+
+The high-volume time-series tables (weather readings, system status, min/max)
+live in their own database so that ESP32 ingest writes never lock the file
+holding stations, auth and sessions. Everything else stays on `default`.
+"""
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+TIMESERIES_MODELS = {
+    "api.weatherdata",
+    "api.systemstatus",
+    "api.minmaxdata",
+    "api.dailycoverage",
+    "api.dailysketch",
+    "api.packedday",
+    "api.forecaststate",
+    "api.hourlyrollup",
+    "api.stationversion",
+    "api.stationhealth",
+    "api.alert",
+}
+
+
+def timeseries_db():
+    """ Alias of the time-series database (falls back to `default` when not configured) """
+    alias = getattr(settings, "TIMESERIES_DATABASE", DEFAULT_DB_ALIAS)
+    return alias if alias in settings.DATABASES else DEFAULT_DB_ALIAS
+
+
+def is_timeseries_model(model):
+    return model._meta.label_lower in TIMESERIES_MODELS
+
+
+class TimeSeriesRouter:
+    """ Send the time-series models to TIMESERIES_DATABASE, all other models to `default` """
+
+    def _db_for(self, model):
+        return timeseries_db() if is_timeseries_model(model) else DEFAULT_DB_ALIAS
+
+    def db_for_read(self, model, **hints):
+        # Explicit for every model: otherwise `reading.station` would follow the reading's database
+        return self._db_for(model)
+
+    def db_for_write(self, model, **hints):
+        return self._db_for(model)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Readings reference their Station across databases (FKs are declared without DB constraint)
+        known = {DEFAULT_DB_ALIAS, timeseries_db()}
+        if obj1._state.db in known and obj2._state.db in known:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if model_name is None:
+            return None
+        if f"{app_label}.{model_name}" in TIMESERIES_MODELS:
+            return db == timeseries_db()
+        return db == DEFAULT_DB_ALIAS
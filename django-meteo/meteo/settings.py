@@ -41,6 +41,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.profiling.ProfilingMiddleware',  # Opt-in, see PROFILING_* below
+    'api.capture.CaptureMiddleware',  # Opt-in, see CAPTURE_* below
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,9 +80,18 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # WeatherData, SystemStatus and MinMaxData: ingest writes don't lock stations/auth/sessions
+    'timeseries': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'timeseries.sqlite3',
+    },
 }
 
+TIMESERIES_DATABASE = 'timeseries'
+
+DATABASE_ROUTERS = ['meteo.routers.TimeSeriesRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -122,3 +133,97 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Min/Max reconciliation
+# Device-reported daily extremes differing from the WeatherData-derived ones by more
+# than this (°C or %) are flagged as mismatching.
+
+MINMAX_RECONCILE_TOLERANCE = 0.5
+
+
+# Analytics
+# Base temperature (°C) for heating / cooling degree-days
+
+DEGREE_DAY_BASE = 18.0
+
+
+# Alerts
+# Seconds an ingest worker keeps its in-memory index of enabled AlertRules
+# (rules changed in the same process are picked up immediately)
+
+ALERT_RULES_TTL = 60
+
+
+# Raw readings storage
+# "rows": one WeatherData row per reading. "packed": one PackedDay row per station-day
+# (delta-encoded arrays, see api/storage.py and `manage.py benchmark_storage`).
+# Existing rows are converted with `manage.py pack_weather`.
+
+WEATHER_STORAGE = "rows"
+
+
+# Fleet health (`/api/health/`)
+# Stations are listed as stale without an accepted weather upload for HEALTH_STALE_AFTER seconds
+# (they sync every hour), as degraded below these heap / WiFi levels or after this many rejected uploads in a row.
+
+HEALTH_STALE_AFTER = 2 * 3600
+HEALTH_MIN_FREE_HEAP = 20000  # bytes
+HEALTH_MIN_WIFI_STRENGTH = -85  # dBm
+HEALTH_MAX_SYNC_FAILURES = 3
+
+
+# Request profiling (api.profiling.ProfilingMiddleware)
+# Fraction of requests profiled at random (0 = only requests with a signed X-Meteo-Profile header,
+# see `manage.py show_profiles --token`). Profiles go to PROFILING_DIR, the newest PROFILING_KEEP are kept.
+
+PROFILING_SAMPLE_RATE = 0.0
+PROFILING_TOKEN_MAX_AGE = 3600  # seconds
+PROFILING_DIR = BASE_DIR / "profiles"
+PROFILING_KEEP = 200
+
+
+# Response cache of history / min-max history (api.response_cache)
+# Bodies are kept per process in an LRU bounded by entry count and total size. The per-station
+# versions that invalidate them are StationVersion rows of the time-series database, shared by all workers.
+
+RESPONSE_CACHE_MAX_ENTRIES = 1024
+RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+# Sync schedule (api.schedule, returned by /api/lastupdate/<id>/)
+# Stations sync once per SYNC_PERIOD seconds at a server-assigned offset. Offsets are multiples of
+# SYNC_SLOT_SECONDS, spread by the measured ingest cost of each station (SYNC_DEFAULT_COST_MS until measured).
+
+SYNC_PERIOD = 3600
+SYNC_SLOT_SECONDS = 10
+SYNC_DEFAULT_COST_MS = 50.0
+
+
+# Short-term forecast (api.forecast, /api/forecast/<id>/)
+# Holt-Winters smoothing of level, trend and hour-of-day season; the trend is damped by
+# FORECAST_DAMPING per hour. A station's state is seeded from its last FORECAST_SEED_DAYS days.
+
+FORECAST_ALPHA = 0.1
+FORECAST_BETA = 0.01
+FORECAST_GAMMA = 0.4
+FORECAST_DAMPING = 0.9
+FORECAST_SEED_DAYS = 14
+
+
+# Traffic capture (api.capture), replayed with `manage.py replay_traffic`
+# Fraction of /api/ requests appended to CAPTURE_DIR (0 disables; 1.0 keeps the full load shape).
+# Bodies larger than CAPTURE_MAX_BODY bytes are not stored.
+
+CAPTURE_SAMPLE_RATE = 0.0
+CAPTURE_DIR = BASE_DIR / "captures"
+CAPTURE_MAX_BODY = 1024 * 1024
+
+
+# Weather uploads (PUT /api/weather/upload/, optionally gzip / deflate compressed)
+# "data" is decoded and validated while the body is read (staged in a temporary file), then stored
+# WEATHER_UPLOAD_BATCH readings at a time once the body is complete;
+# bodies over WEATHER_UPLOAD_MAX_BYTES once decompressed are refused (413).
+
+WEATHER_UPLOAD_BATCH = 500
+WEATHER_UPLOAD_MAX_BYTES = 64 * 1024 * 1024
@@ -0,0 +1,23 @@
+"""
+Ingest-only profile: workers that only serve the ESP32 endpoints (uploads and lastupdate).
+
+Same databases and options as meteo.settings, without admin, auth, sessions, messages,
+staticfiles and their middleware (the upload views are CSRF-exempt anyway). Views are
+imported on their first request, see meteo/urls_ingest.py. Select it with
+DJANGO_SETTINGS_MODULE=meteo.settings_ingest; compare with `manage.py benchmark_profiles`.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'api',
+]
+
+MIDDLEWARE = [
+    'api.profiling.ProfilingMiddleware',  # Opt-in, costs one comparison when disabled
+    'api.capture.CaptureMiddleware',  # Same
+]
+
+ROOT_URLCONF = 'meteo.urls_ingest'
+
+TEMPLATES = []
@@ -0,0 +1,28 @@
+"""
+URL configuration of the ingest-only profile (meteo.settings_ingest): the ESP32 endpoints only.
+Views are resolved lazily so a worker starts without importing api.views (and NumPy).
+"""
+from django.urls import path
+from django.utils.module_loading import import_string
+
+
+def lazy_view(dotted_path):
+    """ View importing `dotted_path` on its first call """
+    view = None
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(dotted_path)
+        return view(request, *args, **kwargs)
+
+    wrapper.csrf_exempt = True  # No CSRF middleware in this profile; the upload views are exempt anyway
+    return wrapper
+
+
+urlpatterns = [
+    path('api/weather/upload/', lazy_view('api.views.receive_weather_data'), name="receive_weather_data"),
+    path('api/minmax/upload/', lazy_view('api.views.receive_minmax_data'), name="receive_minmax_data"),
+    path('api/status/upload/', lazy_view('api.views.receive_status_data'), name="receive_status_data"),
+    path('api/lastupdate/<str:station_ref>/', lazy_view('api.views.last_update'), name="last_update"),
+]
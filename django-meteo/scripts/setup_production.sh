@@ -26,6 +26,7 @@ python manage.py makemigrations
 echo "🔥 Resetting database..."
 python manage.py flush --no-input  # Clears all data but keeps tables
 rm db.sqlite3 && python manage.py migrate  # Wipes everything (Use with caution)
+rm -f timeseries.sqlite3 && python manage.py migrate --database=timeseries  # Weather, status & min/max tables
 
 # Populate the database with test ESP32 data
 if [ -f "scripts/populate_fake_data.py" ]; then
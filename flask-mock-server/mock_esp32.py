@@ -1,6 +1,11 @@
 from flask import Flask, jsonify, request
+import gzip
+import json
 import requests
 import sys
+import threading
+import time
+import zlib
 
 from datetime import datetime, timedelta
 
@@ -26,6 +31,13 @@ if station_number not in STATIONS:
 STATION_ID = STATIONS[station_number]["station_id"]
 PORT = STATIONS[station_number]["port"]
 
+# ✅ "--auto": sync periodically at the slot assigned by Django (`wait` of /api/lastupdate/)
+AUTO_SYNC = "--auto" in sys.argv
+next_sync_wait = None  # Seconds until the assigned slot, from the last /api/lastupdate/ answer
+
+# ✅ "--gzip" / "--deflate": compress upload bodies (Content-Encoding), like a large backfill after an outage
+COMPRESSION = "gzip" if "--gzip" in sys.argv else "deflate" if "--deflate" in sys.argv else None
+
 print(f"🚀 Starting ESP32 Mock Server: {STATION_ID} on port {PORT}")
 
 # ✅ Helper function to format timestamp in YYYYMMDDHHMISS format
@@ -127,17 +139,26 @@ def fetch_data_from_django(endpoint, station_id):
 def upload_to_django(endpoint, payload):
     try:
         url = f"{DJANGO_API_BASE}/{endpoint}"
-        response = requests.put(url, json=payload)
+        if COMPRESSION:
+            body = json.dumps(payload).encode("utf-8")
+            compressed = gzip.compress(body) if COMPRESSION == "gzip" else zlib.compress(body)
+            headers = {"Content-Type": "application/json", "Content-Encoding": COMPRESSION}
+            print(f"🗜️ {endpoint}: {len(body)} bytes sent as {len(compressed)} ({COMPRESSION})")
+            response = requests.put(url, data=compressed, headers=headers)
+        else:
+            response = requests.put(url, json=payload)
         print(f"📡 {endpoint} upload response: HTTP {response.status_code} {response.text}")
     except Exception as e:
         print(f"❌ Error uploading {endpoint}: {e}")
 
 # ✅ **Helper: Get Last Update Timestamp from Django**
 def get_last_update(station_id):
+    global next_sync_wait
     try:
         url = f"{DJANGO_API_BASE}/lastupdate/{station_id}/"
         response = requests.get(url)
         if response.status_code == 200:
+            next_sync_wait = response.json().get("wait")
             return response.json().get("ts", "19700101000000")
         print(f"❌ Failed to fetch last update timestamp for {station_id}! HTTP {response.status_code}")
         return None
@@ -145,7 +166,20 @@ def get_last_update(station_id):
         print(f"❌ Error fetching last update: {e}")
         return None
 
+# ✅ **Auto sync: wait for the server-assigned slot, sync, repeat**
+def auto_sync_loop(station_id):
+    get_last_update(station_id)  # First contact: Django assigns the slot
+    while True:
+        wait = next_sync_wait if next_sync_wait is not None else 3600
+        print(f"⏳ Next sync of {station_id} in {wait} s (server-assigned slot)")
+        time.sleep(wait)
+        with app.app_context():
+            trigger_sync(station_id)  # Refreshes next_sync_wait through get_last_update
+
+
 # ✅ Run Flask ESP32 Mock Server
 if __name__ == '__main__':
     print(f"🚀 Starting {STATION_ID} on port {PORT}")
-    app.run(host='0.0.0.0', port=PORT, debug=True)
+    if AUTO_SYNC:
+        threading.Thread(target=auto_sync_loop, args=(STATION_ID,), daemon=True).start()
+    app.run(host='0.0.0.0', port=PORT, debug=True, use_reloader=not AUTO_SYNC)